@@ -9,8 +9,21 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from django.core.handlers.asgi import ASGIHandler, ASGIRequest
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
 
-application = get_asgi_application()
+
+class WardrobeASGIRequest(ASGIRequest):
+    # Под ASGI горячие эндпоинты чтения обслуживают async-представления
+    urlconf = 'app.asgi_urls'
+
+
+class WardrobeASGIHandler(ASGIHandler):
+    request_class = WardrobeASGIRequest
+
+
+# То же, что django.core.asgi.get_asgi_application(), но со своим классом запроса
+django.setup(set_prefix=False)
+application = WardrobeASGIHandler()
@@ -0,0 +1,19 @@
+"""
+URL-схема для запросов через ASGI (см. app/asgi.py): асинхронные варианты
+горячих эндпоинтов чтения перекрывают одноимённые адреса роутера DRF.
+"""
+from django.urls import path
+
+from app.urls import urlpatterns as wsgi_urlpatterns
+from wardrobe import async_api
+
+urlpatterns = [
+    path('api/products/', async_api.product_list),
+    path('api/products/stats/', async_api.product_stats),
+    path('api/orders/', async_api.order_list),
+    path('api/orders/stats/', async_api.order_stats),
+    path('api/categories/stats/', async_api.category_stats),
+    path('api/stores/stats/', async_api.store_stats),
+    path('api/customers/stats/', async_api.customer_stats),
+    path('api/userprofile/info/', async_api.user_info),
+] + wsgi_urlpatterns
@@ -39,11 +39,30 @@ CORS_ALLOWED_ORIGINS = [
 
 MEDIA_ROOT = BASE_DIR / "media"
 MEDIA_URL = "/media/"
+# Кто отдаёт байты медиафайлов: None — Django (sendfile, если его умеет WSGI-сервер),
+# 'x-accel-redirect' — nginx по внутреннему адресу MEDIA_ACCEL_PREFIX, 'x-sendfile' — Apache/lighttpd
+MEDIA_SERVE_MODE = None
+MEDIA_ACCEL_PREFIX = "/protected-media/"
+# Файлы фоновых выгрузок (wardrobe.export_jobs): вне MEDIA_ROOT, скачиваются только через API с проверкой прав
+EXPORT_ROOT = BASE_DIR / "exports"
+
+# Метрики запросов /metrics (wardrobe.metrics) отдаются staff-пользователям и по заголовку
+# "Authorization: Bearer <METRICS_TOKEN>" (для Prometheus); None — только staff
+METRICS_TOKEN = None
+# Выборочное профилирование (wardrobe.profiling): доля профилируемых запросов (0 — выключено);
+# в PROFILE_DIR сохраняются профили запросов не короче PROFILE_THRESHOLD_MS.
+# PROFILE_MODE: 'stacks' — свёрнутые стеки раз в PROFILE_INTERVAL_MS, 'cprofile' — cProfile
+PROFILE_SAMPLE_RATE = 0
+PROFILE_THRESHOLD_MS = 500
+PROFILE_MODE = "stacks"
+PROFILE_INTERVAL_MS = 5
+PROFILE_DIR = BASE_DIR / "profiles"
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',   
     ],
+    'DEFAULT_PAGINATION_CLASS': 'wardrobe.pagination.KeysetPagination',
 }
 
 # Application definition
@@ -62,6 +81,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'wardrobe.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -101,6 +121,16 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Транзакция сразу берёт блокировку записи, поэтому параллельные
+            # заказы ждут друг друга, а не падают с "database is locked".
+            'transaction_mode': 'IMMEDIATE',
+        },
+        'TEST': {
+            # Файловая тестовая база: in-memory SQLite с общим кэшем не даёт
+            # потокам писать параллельно, а тесты конкурентности этого требуют.
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
 
@@ -15,13 +15,14 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
+import re
+
+from django.urls import path, include, re_path
 from django.conf import settings
-from django.conf.urls.static import static
 from rest_framework.routers import DefaultRouter
 
 from wardrobe.api import (CategoryViewSet, StoreViewSet, ProductViewSet, CustomerViewSet, OrderViewSet,UserProfileViewSet)
-from wardrobe.views import ShowWardrobeView
+from wardrobe.views import ShowWardrobeView, change_events, prometheus_metrics, serve_media
 
 router = DefaultRouter()
 router.register("categories", CategoryViewSet, basename="category")
@@ -34,6 +35,9 @@ router.register("userprofile", UserProfileViewSet, basename="userprofile")
 urlpatterns = [
     path('', ShowWardrobeView.as_view()),
     path('admin/', admin.site.urls),
+    path('api/events/', change_events, name='events'),
     path('api/', include(router.urls)),
     path('api-auth/', include('rest_framework.urls')),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+    path('metrics', prometheus_metrics, name='metrics'),
+    re_path(r'^%s(?P<path>.+)$' % re.escape(settings.MEDIA_URL.lstrip('/')), serve_media, name='media'),
+]
\ No newline at end of file
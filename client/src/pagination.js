@@ -0,0 +1,12 @@
+import axios from 'axios'
+
+// Все строки списка: API отдаёт страницы по ссылке next, пока она не станет null
+export async function fetchAllPages(url, params = {}) {
+  let { data } = await axios.get(url, { params: { page_size: 500, ...params } })
+  let rows = data.results
+  while (data.next) {
+    data = (await axios.get(data.next)).data
+    rows = rows.concat(data.results)
+  }
+  return rows
+}
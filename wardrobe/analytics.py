@@ -0,0 +1,146 @@
+"""
+Метрики склада и продаж, посчитанные векторно в NumPy.
+
+Товары и заказы читаются колонками через values_list, после чего всё
+считается групповыми суммами (bincount по плотному индексу товара) и
+сортировкой (argsort), без цикла по заказам в Python.
+"""
+import datetime
+from itertools import chain
+
+import numpy as np
+from django.db.models import Case, FloatField, IntegerField, Value, When
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from wardrobe.models import Category, Order, Product
+from wardrobe.orders import HOLDING_STATUSES
+
+SIZES = [size for size, _ in Product.SIZE_CHOICES]
+# Доля выручки нарастающим итогом, до которой товар попадает в класс A и B
+ABC_THRESHOLDS = (0.8, 0.95)
+FETCH_CHUNK_SIZE = 10000
+
+
+def columns(queryset, *fields, dtype=np.float64):
+    """Значения полей queryset массивом формы (len(fields), число строк)."""
+    rows = queryset.values_list(*fields).iterator(chunk_size=FETCH_CHUNK_SIZE)
+    return np.fromiter(chain.from_iterable(rows), dtype=dtype).reshape(-1, len(fields)).T
+
+
+def ratio(numerator, denominator):
+    result = np.full(numerator.shape, np.nan)
+    np.divide(numerator, denominator, out=result, where=denominator > 0)
+    return result
+
+
+def rounded(value, digits=4):
+    return None if np.isnan(value) else round(float(value), digits)
+
+
+class SalesFrame:
+    """
+    Продажи товаров из products за последние days дней (None — за всё время).
+    Продажей считаются заказы, удерживающие товар со склада (HOLDING_STATUSES).
+    """
+
+    def __init__(self, products, days=None, today=None):
+        self.days = days
+        size_code = Case(*[When(size=size, then=Value(code)) for code, size in enumerate(SIZES)],
+                         default=Value(-1), output_field=IntegerField())
+        products = products.order_by('pk').annotate(size_code=size_code)
+        self.product_ids, self.category_ids, self.size_codes, self.stock = columns(
+            products, 'pk', 'category_id', 'size_code', 'quantity', dtype=np.int64)
+
+        orders = Order.objects.filter(status__in=HOLDING_STATUSES, product__in=products.values('pk'))
+        if days:
+            today = today or timezone.localdate()
+            orders = orders.filter(order_date__gt=today - datetime.timedelta(days=days))
+        # Cast в SQL, чтобы не создавать Decimal на каждую строку
+        orders = orders.annotate(revenue=Cast('total_price', FloatField()))
+        product_ids, units, revenue = columns(orders, 'product_id', 'quantity', 'revenue')
+        index = np.searchsorted(self.product_ids, product_ids)
+        # Товар мог появиться между запросами — такие заказы отбрасываем
+        known = index < len(self.product_ids)
+        known[known] = self.product_ids[index[known]] == product_ids[known]
+        self.order_index = index[known]
+        self.order_units = units[known]
+        self.units = np.bincount(self.order_index, weights=self.order_units, minlength=len(self.product_ids))
+        self.revenue = np.bincount(self.order_index, weights=revenue[known], minlength=len(self.product_ids))
+
+    def sell_through(self):
+        return ratio(self.units, self.units + self.stock)
+
+    def days_of_stock(self):
+        # Остаток, делённый на средние продажи в день за окно; без продаж — бесконечность (nan)
+        return ratio(self.stock.astype(np.float64), self.units / self.days)
+
+    def abc_classes(self):
+        order = np.argsort(-self.revenue, kind='stable')
+        total = self.revenue.sum()
+        shares = self.revenue / total if total else np.zeros_like(self.revenue)
+        # Класс определяется долей выручки товаров, стоящих выше в рейтинге
+        before = np.cumsum(shares[order]) - shares[order]
+        classes = np.full(len(order), 'C')
+        classes[order] = np.select([before < ABC_THRESHOLDS[0], before < ABC_THRESHOLDS[1]], ['A', 'B'], 'C')
+        classes[self.revenue <= 0] = 'C'
+        return classes, shares
+
+    def size_curve(self):
+        category_ids, category_index = np.unique(self.category_ids, return_inverse=True)
+        size_codes = self.size_codes[self.order_index]
+        valid = size_codes >= 0
+        keys = category_index[self.order_index][valid] * len(SIZES) + size_codes[valid]
+        units = np.bincount(keys, weights=self.order_units[valid], minlength=len(category_ids) * len(SIZES))
+        units = units.reshape(len(category_ids), len(SIZES))
+        return category_ids, units, ratio(units, units.sum(axis=1, keepdims=True))
+
+
+def product_names(products, ids, limit):
+    # Без limit нужны все названия: дешевле прочитать их одним запросом, чем перечислять id в IN
+    if limit is not None:
+        products = products.filter(pk__in=ids.tolist())
+    return dict(products.values_list('pk', 'name'))
+
+
+def inventory_metrics(products, days, offset=0, limit=None):
+    """Строки товаров по возрастанию id начиная с offset, не больше limit (None — все); count — всего товаров."""
+    frame = SalesFrame(products, days)
+    rows = np.arange(len(frame.product_ids))[offset:None if limit is None else offset + limit]
+    names = product_names(products, frame.product_ids[rows], limit)
+    sell_through = frame.sell_through()
+    days_of_stock = frame.days_of_stock()
+    results = [
+        {'id': int(frame.product_ids[i]), 'name': names.get(int(frame.product_ids[i])), 'stock': int(frame.stock[i]),
+         'units_sold': int(frame.units[i]), 'sell_through': rounded(sell_through[i]), 'days_of_stock': rounded(days_of_stock[i], 1)}
+        for i in rows
+    ]
+    return {'count': len(frame.product_ids), 'results': results}
+
+
+def abc_metrics(products, days=None, offset=0, limit=None):
+    """Товары по убыванию выручки начиная с offset, не больше limit (None — все); summary — по всем товарам."""
+    frame = SalesFrame(products, days)
+    classes, shares = frame.abc_classes()
+    order = np.argsort(-frame.revenue, kind='stable')[offset:None if limit is None else offset + limit]
+    names = product_names(products, frame.product_ids[order], limit)
+    results = [
+        {'id': int(frame.product_ids[i]), 'name': names.get(int(frame.product_ids[i])), 'class': str(classes[i]),
+         'revenue': round(float(frame.revenue[i]), 2), 'share': rounded(shares[i])}
+        for i in order
+    ]
+    summary = {
+        abc_class: {'count': int((classes == abc_class).sum()), 'revenue': round(float(frame.revenue[classes == abc_class].sum()), 2)}
+        for abc_class in 'ABC'
+    }
+    return {'count': len(frame.product_ids), 'summary': summary, 'results': results}
+
+
+def size_curve_metrics(products, days=None):
+    category_ids, units, shares = SalesFrame(products, days).size_curve()
+    names = dict(Category.objects.filter(pk__in=category_ids.tolist()).values_list('pk', 'name'))
+    return [
+        {'category': int(category_id), 'category_name': names.get(int(category_id)), 'units': int(units[i].sum()),
+         'sizes': [{'size': size, 'units': int(units[i, code]), 'share': rounded(shares[i, code])} for code, size in enumerate(SIZES)]}
+        for i, category_id in enumerate(category_ids.tolist())
+    ]
@@ -1,16 +1,33 @@
-import io
+import hashlib
+
 from django.contrib.auth import authenticate, login, logout as django_logout
-from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django.utils.decorators import method_decorator
+from django.utils.http import http_date
 from django.views.decorators.csrf import ensure_csrf_cookie
-from django.db.models import Count, Avg, Sum
-from openpyxl import Workbook
-from rest_framework import permissions, serializers
+from django.db import transaction
+from django.http import FileResponse
+from rest_framework import permissions, serializers, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 from rest_framework.viewsets import ModelViewSet, GenericViewSet
 from rest_framework.permissions import IsAuthenticated
-from wardrobe.models import Category, Store, Product, Order, Customer, UserProfile, User
+from wardrobe import analytics, autocomplete, export_jobs, rollups, search, stats
+from wardrobe.changes import CHANGES_PAGE_SIZE, MAX_CHANGES_PAGE_SIZE, changes_since, touch_updated_at
+from wardrobe.exports import CSV_CONTENT_TYPE, EXPORT_CHUNK_SIZE, XLSX_CONTENT_TYPE, csv_response, iter_rows, xlsx_response
+from wardrobe.imports import Importer, name_lookup, read_rows, user_lookup
+from wardrobe.filters import QueryParamFilter, apply_filter_params, lookup, in_stock, to_date, to_decimal
+from wardrobe.pagination import OffsetPagination
+from wardrobe.orders import (
+    BULK_BATCH_SIZE, bulk_delete_orders, bulk_place_orders, bulk_update_orders,
+    change_status, delete_order, place_order, update_order
+)
+from wardrobe.models import Category, Store, Product, Order, Customer, UserProfile, User, SalesRollup
+from wardrobe.serializers import CachedPrimaryKeyRelatedField, coerce_pk
+from wardrobe.versions import RESOURCES, get_version_info, get_versions, notify_bulk_change
 from wardrobe.serializers import (
     CategorySerializer, StoreSerializer, ProductSerializer,
     CustomerSerializer, OrderSerializer
@@ -63,122 +80,609 @@ class UserProfileViewSet(GenericViewSet):
         return Response({"success": True})
 
 
+class NotModified(Exception):
+    def __init__(self, response):
+        self.response = response
+
+
+def conditional_validators(format, versions, last_modified):
+    """ETag и Last-Modified (timestamp) ответа по версиям ресурсов, от которых он зависит."""
+    source = '|'.join([format, repr(sorted(versions.items()))])
+    etag = '"%s"' % hashlib.sha1(source.encode()).hexdigest()[:20]
+    return etag, int(last_modified.timestamp()) if last_modified else None
+
+
+def set_conditional_headers(response, etag, last_modified):
+    if response.status_code in (200, 304):
+        response.headers['ETag'] = etag
+        if last_modified:
+            response.headers['Last-Modified'] = http_date(last_modified)
+        # Браузер хранит ответ, но перепроверяет его при каждом запросе
+        patch_cache_control(response, private=True, no_cache=True)
+
+
+class ConditionalGetMixin:
+    """
+    ETag и Last-Modified для list, retrieve и действий из action_depends,
+    посчитанные по версиям ресурсов (wardrobe.versions). Если у клиента
+    актуальная версия, отвечаем 304 до выборки данных и сериализации.
+    """
+    version_depends = ()
+    action_depends = {}
+    conditional_validators = None
+
+    def get_version_depends(self):
+        if self.action in ('list', 'retrieve'):
+            return self.version_depends
+        return self.action_depends.get(self.action)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        depends = self.get_version_depends()
+        if request.method not in ('GET', 'HEAD') or not depends:
+            return
+        self.conditional_validators = conditional_validators(request.accepted_renderer.format, *get_version_info(*depends))
+        etag, last_modified = self.conditional_validators
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is not None:
+            raise NotModified(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.conditional_validators:
+            set_conditional_headers(response, *self.conditional_validators)
+        return response
+
+
+class SparseQuerysetMixin:
+    """
+    ?fields=id,name и ?view=summary (поля summary_fields) для list, retrieve
+    и search: сериализатор отдаёт только эти поля, а queryset читает только
+    нужные колонки (only) и присоединяет только нужные таблицы (select_related).
+    field_sources — колонки для полей сериализатора, которые не совпадают
+    с полем модели; остальные поля читаются по своему имени.
+    """
+    sparse_actions = ('list', 'retrieve', 'search')
+    summary_fields = ()
+    field_sources = {}
+
+    def get_sparse_fields(self):
+        if not hasattr(self, '_sparse_fields'):
+            self._sparse_fields = self.parse_sparse_fields()
+        return self._sparse_fields
+
+    def parse_sparse_fields(self):
+        if self.request is None or self.request.method not in ('GET', 'HEAD') or self.action not in self.sparse_actions:
+            return None
+        params = self.request.query_params
+        view = params.get('view') or 'full'
+        if view not in ('full', 'summary'):
+            raise ValidationError({'view': 'Ожидается full или summary'})
+        if view == 'summary':
+            return list(self.summary_fields)
+        if not params.get('fields'):
+            return None
+        fields = list(dict.fromkeys(name.strip() for name in params['fields'].split(',') if name.strip()))
+        unknown = [name for name in fields if name not in self.get_serializer_class()().fields]
+        if unknown or not fields:
+            raise ValidationError({'fields': f"Неизвестные поля: {', '.join(unknown)}" if unknown else 'Не указаны поля'})
+        return fields
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_sparse_fields()
+        if fields is None:
+            return queryset
+        columns = {queryset.model._meta.pk.name}
+        for name in fields:
+            columns.update(self.field_sources.get(name, (name,)))
+        # Курсор следующей страницы берётся из полей сортировки последнего объекта
+        ordering_fields = getattr(self, 'ordering_fields', None) or ()
+        for name in self.request.query_params.get('ordering', '').split(','):
+            if name.lstrip('-') in ordering_fields:
+                columns.add(name.lstrip('-'))
+        relations = set()
+        for column in columns:
+            parts = column.split('__')[:-1]
+            relations.update('__'.join(parts[:i]) for i in range(1, len(parts) + 1))
+        forward = {relation for relation in relations if not queryset.model._meta.get_field(relation.split('__')[0]).auto_created}
+        queryset = queryset.select_related(None)
+        if relations:
+            # select_related() без аргументов присоединил бы все внешние ключи
+            queryset = queryset.select_related(*relations)
+        return queryset.only(*columns, *forward)
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        return super().get_serializer(*args, **kwargs)
+
+
+class ChangesMixin:
+    """
+    GET {prefix}/changes/?since=<токен> — объекты, изменённые после токена
+    (upserts), и id удалённых (deleted), в порядке журнала изменений.
+    Пустой since — полная выгрузка. Клиент сохраняет next и передаёт его в
+    следующий раз; при has_more забирает следующую страницу сразу.
+    """
+    changes_page_size = CHANGES_PAGE_SIZE
+
+    @action(detail=False, methods=['GET'])
+    def changes(self, request):
+        try:
+            since = int(request.query_params.get('since') or 0)
+            limit = min(int(request.query_params.get('page_size') or self.changes_page_size), MAX_CHANGES_PAGE_SIZE)
+        except ValueError:
+            raise ValidationError({'since': 'Некорректный токен'})
+        if since < 0 or limit <= 0:
+            raise ValidationError({'since': 'Некорректный токен'})
+        entries, has_more = changes_since(RESOURCES[self.queryset.model], since, limit)
+        objects = self.get_queryset().in_bulk([pk for _, pk, deleted in entries if not deleted])
+        upserts = [objects[pk] for _, pk, deleted in entries if not deleted and pk in objects]
+        # Объект мог быть удалён после записи в журнал — тоже отдаём как удалённый
+        deleted = [pk for _, pk, deleted in entries if deleted or pk not in objects]
+        return Response({
+            'next': entries[-1][0] if entries else since,
+            'has_more': has_more,
+            'upserts': self.get_serializer(upserts, many=True).data,
+            'deleted': deleted,
+        })
+
+
+class AutocompleteMixin:
+    """
+    GET {prefix}/autocomplete/?q=<префикс>&limit=<n> — до n пар id/name для
+    выпадающих списков из индекса в памяти (wardrobe.autocomplete).
+    """
+    autocomplete_resource = None
+    autocomplete_group_param = None
+
+    @action(detail=False, methods=['GET'])
+    def autocomplete(self, request):
+        try:
+            limit = min(int(request.query_params.get('limit') or autocomplete.AUTOCOMPLETE_LIMIT), autocomplete.MAX_AUTOCOMPLETE_LIMIT)
+            group = request.query_params.get(self.autocomplete_group_param) if self.autocomplete_group_param else None
+            group = int(group) if group else None
+        except ValueError:
+            raise ValidationError({'detail': 'Некорректное значение'})
+        index = autocomplete.INDEXES[self.autocomplete_resource]
+        return Response({'results': index.lookup(request.query_params.get('q', ''), max(limit, 1), group)})
+
+
 class BaseExportMixin:
-    def export_queryset(self, queryset, columns, filename_base):
-        workbook = Workbook()
-        sheet = workbook.active
-        sheet.title = filename_base
-        sheet.append(columns)
-        for row in queryset:
-            sheet.append([row.get(col, "") for col in columns])
-        buffer = io.BytesIO()
-        workbook.save(buffer)
-        buffer.seek(0)
-        return HttpResponse(buffer, content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
-
-
-class CategoryViewSet(ModelViewSet, BaseExportMixin):
-    queryset = Category.objects.all()
+    export_chunk_size = EXPORT_CHUNK_SIZE
+    version_depends = ()
+
+    def export_queryset(self, queryset, columns, filename_base, row):
+        export_type = 'csv' if self.request.query_params.get('type') == 'csv' else 'excel'
+        if self.request.query_params.get('mode') == 'async':
+            versions = get_versions(*self.version_depends)
+            job = export_jobs.submit(queryset, columns, filename_base, row, export_type, versions)
+            return Response(self.export_job_data(job), status=202)
+        rows = iter_rows(queryset, row, self.export_chunk_size)
+        if export_type == 'csv':
+            return csv_response(columns, rows, filename_base)
+        return xlsx_response(columns, rows, filename_base)
+
+    def export_job_data(self, job):
+        data = {'id': job['id'], 'status': job['status'], 'rows': job['rows'], 'total': job['total'], 'url': None}
+        if job['status'] == 'done':
+            data['url'] = self.request.build_absolute_uri(self.reverse_action('export-download', kwargs={'job_id': job['id']}))
+        if job.get('error'):
+            data['error'] = job['error']
+        return data
+
+    @action(detail=False, methods=['GET'], url_path=r'export/(?P<job_id>[0-9a-f]{32})')
+    def export_status(self, request, job_id):
+        job = export_jobs.get_job(job_id)
+        if job is None:
+            return Response({'detail': 'Задача не найдена'}, status=404)
+        return Response(self.export_job_data(job))
+
+    @action(detail=False, methods=['GET'], url_path=r'export/(?P<job_id>[0-9a-f]{32})/download')
+    def export_download(self, request, job_id):
+        path = export_jobs.find_artifact(job_id)
+        if path is None:
+            return Response({'detail': 'Файл выгрузки не найден'}, status=404)
+        content_type = CSV_CONTENT_TYPE if path.suffix == '.csv' else XLSX_CONTENT_TYPE
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=path.name, content_type=content_type)
+
+
+class AtomicWriteMixin:
+    """
+    Запись объекта и то, что пишут её сигналы (счётчики stats, свёртки,
+    журнал изменений, поисковый индекс), — одна транзакция: при сбое
+    посередине откатывается всё вместе.
+    """
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            super().perform_create(serializer)
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            super().perform_update(serializer)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            super().perform_destroy(instance)
+
+
+class BulkMixin:
+    """
+    POST/PATCH/DELETE {prefix}/bulk/ принимают массив объектов (для DELETE —
+    {"ids": [...]}). Элементы проверяются сериализатором в режиме many,
+    связанные объекты подгружаются одним запросом на поле, запись идёт через
+    bulk_create/bulk_update/DELETE ... IN. Ошибки возвращаются по индексу элемента.
+    """
+    bulk_max_items = 10000
+
+    @action(detail=False, methods=['POST', 'PATCH', 'DELETE'], url_path='bulk')
+    def bulk(self, request):
+        if request.method == 'DELETE':
+            return self.bulk_delete(request)
+        items = request.data
+        if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+            raise ValidationError({'detail': 'Ожидается массив объектов'})
+        if len(items) > self.bulk_max_items:
+            raise ValidationError({'detail': f'Не больше {self.bulk_max_items} элементов за запрос'})
+        if request.method == 'POST':
+            return self.bulk_create(items)
+        return self.bulk_update(items)
+
+    def validate_items(self, items, partial=False):
+        serializer = self.get_serializer(data=items, many=True, partial=partial)
+        child = serializer.child
+        serializer.context['related'] = {
+            name: field.get_queryset().in_bulk({pk for item in items if (pk := coerce_pk(item.get(name))) is not None})
+            for name, field in child.fields.items()
+            if isinstance(field, CachedPrimaryKeyRelatedField) and not field.read_only
+        }
+        valid, errors = [], []
+        for index, item in enumerate(items):
+            try:
+                valid.append((index, child.run_validation(item)))
+            except ValidationError as error:
+                errors.append({'index': index, 'errors': error.detail})
+        return valid, errors
+
+    def bulk_response(self, key, done, errors):
+        code = status.HTTP_200_OK if key != 'created' else status.HTTP_201_CREATED
+        if errors:
+            code = status.HTTP_207_MULTI_STATUS if done else status.HTTP_400_BAD_REQUEST
+        return Response({key: done, 'errors': errors}, status=code)
+
+    def bulk_create(self, items):
+        valid, errors = self.validate_items(items)
+        created, failed = self.perform_bulk_create(valid) if valid else ([], [])
+        errors = sorted(errors + failed, key=lambda error: error['index'])
+        return self.bulk_response('created', [{'index': index, 'id': obj.pk} for index, obj in created], errors)
+
+    def bulk_update(self, items):
+        pk_name = self.queryset.model._meta.pk.name
+        instances = self.get_queryset().in_bulk([pk for item in items if (pk := coerce_pk(item.get(pk_name))) is not None])
+        valid, errors = self.validate_items(items, partial=True)
+        pairs = []
+        for index, data in valid:
+            instance = instances.get(coerce_pk(items[index].get(pk_name)))
+            if instance is None:
+                errors.append({'index': index, 'errors': {pk_name: 'Объект не найден'}})
+            else:
+                pairs.append((index, instance, data))
+        updated, failed = self.perform_bulk_update(pairs) if pairs else ([], [])
+        errors = sorted(errors + failed, key=lambda error: error['index'])
+        return self.bulk_response('updated', [{'index': index, 'id': obj.pk} for index, obj in updated], errors)
+
+    def bulk_delete(self, request):
+        ids = request.data.get('ids') if isinstance(request.data, dict) else None
+        if isinstance(ids, list):
+            ids = [coerce_pk(pk) for pk in ids]
+        if not isinstance(ids, list) or None in ids:
+            raise ValidationError({'ids': 'Ожидается массив идентификаторов'})
+        queryset = self.get_queryset().filter(pk__in=ids)
+        deleted = set(self.perform_bulk_delete(queryset))
+        errors = [{'index': index, 'errors': {'id': 'Объект не найден'}} for index, pk in enumerate(ids) if pk not in deleted]
+        return self.bulk_response('deleted', sorted(deleted), errors)
+
+    def perform_bulk_create(self, valid):
+        model = self.queryset.model
+        objs = model.objects.bulk_create([model(**data) for _, data in valid], batch_size=BULK_BATCH_SIZE)
+        notify_bulk_change(model, created=objs)
+        return [(index, obj) for (index, _), obj in zip(valid, objs)], []
+
+    def perform_bulk_update(self, pairs):
+        model = self.queryset.model
+        fields = set()
+        for _, instance, data in pairs:
+            for field, value in data.items():
+                setattr(instance, field, value)
+            fields.update(data)
+        objs = [instance for _, instance, _ in pairs]
+        with transaction.atomic():
+            model.objects.bulk_update(objs, touch_updated_at(objs, sorted(fields)), batch_size=BULK_BATCH_SIZE)
+            notify_bulk_change(model, updated=objs)
+        return [(index, instance) for index, instance, _ in pairs], []
+
+    def perform_bulk_delete(self, queryset):
+        pks = list(queryset.values_list('pk', flat=True))
+        queryset.model.objects.filter(pk__in=pks).delete()
+        return pks
+
+
+class ImportMixin:
+    """
+    POST {prefix}/import/ с файлом в поле file (xlsx или csv, ?type=csv)
+    в том же формате колонок, что отдаёт export. ?dry_run=1 только проверяет
+    файл и возвращает отчёт.
+    """
+    import_columns = {}
+
+    def get_import_lookups(self):
+        return {}
+
+    @action(detail=False, methods=['POST'], url_path='import')
+    def import_file(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValidationError({'file': 'Файл не передан'})
+        file_type = 'csv' if request.query_params.get('type') == 'csv' or upload.name.lower().endswith('.csv') else 'excel'
+        dry_run = request.query_params.get('dry_run') in ('1', 'true')
+        importer = Importer(
+            self.get_serializer(many=True, partial=True), self.import_columns,
+            self.get_import_lookups(), dry_run=dry_run
+        )
+        report = importer.run(read_rows(upload, file_type))
+        return Response(report, status=200 if dry_run or not report['error_count'] else 207)
+
+
+class CategoryViewSet(ConditionalGetMixin, SparseQuerysetMixin, ChangesMixin, ImportMixin, AtomicWriteMixin, ModelViewSet, BaseExportMixin):
+    queryset = Category.objects.select_related('user')
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticated]
+    version_depends = ('category', 'user')
+    action_depends = {'stats': ('category', 'product')}
+    summary_fields = ('id', 'name')
+    import_columns = {'ID': 'id', 'Name': 'name', 'User': 'user'}
+
+    def get_import_lookups(self):
+        return {'user': user_lookup()}
 
     @action(detail=False, methods=['GET'])
     def stats(self, request):
-        top = Category.objects.annotate(c=Count('product')).order_by('-c').first()
-        return Response({'count': self.get_queryset().count(), 'top': top.name if top else None})
+        return Response(stats.category_stats())
 
     @action(detail=False, methods=['GET'])
     def export(self, request):
-        data = [{'ID': c.id, 'Name': c.name, 'User': c.user.username if c.user else ''} for c in self.get_queryset()]
-        return self.export_queryset(data, ['ID', 'Name', 'User'], 'Categories')
+        queryset = self.get_queryset().order_by('id').values('id', 'name', 'user__username')
+        return self.export_queryset(queryset, ['ID', 'Name', 'User'], 'Categories',
+                                    lambda c: [c['id'], c['name'], c['user__username'] or ''])
 
 
-class StoreViewSet(ModelViewSet, BaseExportMixin):
-    queryset = Store.objects.all().order_by('name')
+class StoreViewSet(ConditionalGetMixin, SparseQuerysetMixin, ChangesMixin, AutocompleteMixin, ImportMixin, AtomicWriteMixin, ModelViewSet, BaseExportMixin):
+    queryset = Store.objects.select_related('user').order_by('name')
     serializer_class = StoreSerializer
     permission_classes = [IsAuthenticated]
+    version_depends = ('store', 'user')
+    action_depends = {'stats': ('store', 'product', 'order')}
+    summary_fields = ('id', 'name')
+    autocomplete_resource = 'store'
+    import_columns = {'ID': 'id', 'Name': 'name', 'Address': 'address', 'User': 'user'}
+
+    def get_import_lookups(self):
+        return {'user': user_lookup()}
 
     @action(detail=False, methods=['GET'])
     def stats(self, request):
-        top = Store.objects.annotate(c=Count('product__order')).order_by('-c').first()
-        return Response({'count': self.get_queryset().count(), 'top': top.name if top else None})
+        return Response(stats.store_stats())
 
     @action(detail=False, methods=['GET'])
     def export(self, request):
-        data = [{'ID': s.id, 'Name': s.name, 'Address': s.address, 'User': s.user.username if s.user else ''} for s in self.get_queryset()]
-        return self.export_queryset(data, ['ID', 'Name', 'Address', 'User'], 'Stores')
+        queryset = self.get_queryset().values('id', 'name', 'address', 'user__username')
+        return self.export_queryset(queryset, ['ID', 'Name', 'Address', 'User'], 'Stores',
+                                    lambda s: [s['id'], s['name'], s['address'], s['user__username'] or ''])
 
 
-class ProductViewSet(ModelViewSet, BaseExportMixin):
-    queryset = Product.objects.all()
+class ProductViewSet(ConditionalGetMixin, SparseQuerysetMixin, ChangesMixin, AutocompleteMixin, BulkMixin, ImportMixin, AtomicWriteMixin, ModelViewSet, BaseExportMixin):
+    queryset = Product.objects.select_related('category', 'store')
     serializer_class = ProductSerializer
     permission_classes = [IsAuthenticated]
+    version_depends = ('product', 'category', 'store')
+    action_depends = {'stats': ('product', 'order'), 'search': ('product', 'category', 'store')}
+    summary_fields = ('id', 'name', 'store', 'price', 'quantity')
+    field_sources = {'category_name': ('category__name',), 'store_name': ('store__name',), 'thumbnails': ('image', 'thumbnails_ready')}
+    autocomplete_resource = 'product'
+    autocomplete_group_param = 'store'
+    import_columns = {
+        'ID': 'id', 'Name': 'name', 'Category': 'category', 'Store': 'store',
+        'Size': 'size', 'Price': 'price', 'Color': 'color', 'Available': None,
+    }
+    filter_backends = [QueryParamFilter, SearchFilter, OrderingFilter]
+    filter_params = {
+        'category': lookup('category_id', int),
+        'store': lookup('store_id', int),
+        'size': lookup('size'),
+        'price_min': lookup('price__gte', to_decimal),
+        'price_max': lookup('price__lte', to_decimal),
+        'in_stock': in_stock,
+    }
+    search_fields = ['name']
+    ordering_fields = ['id', 'name', 'price', 'quantity']
+
+    def get_import_lookups(self):
+        return {'category': name_lookup(Category), 'store': name_lookup(Store)}
 
     @action(detail=False, methods=['GET'])
     def stats(self, request):
-        total = self.get_queryset().count()
-        avg_price = self.get_queryset().aggregate(avg_price=Avg('price'))['avg_price'] or 0
-        most_ordered = Order.objects.values('product__id', 'product__name').annotate(order_count=Count('product')).order_by('-order_count').first()
+        return Response(stats.product_stats())
+
+    @action(detail=False, methods=['GET'])
+    def search(self, request):
+        query = request.query_params.get('q', '')
+        paginator = OffsetPagination()
+        limit, offset = paginator.get_limit(request), paginator.get_offset(request)
+        products = apply_filter_params(request, Product.objects.all(), self.filter_params)
+        ids = search.search_ids(query, products, limit, offset)
+        found = self.get_queryset().in_bulk(ids[:limit])
+        url = request.build_absolute_uri()
+        previous = None
+        if offset:
+            previous = replace_query_param(url, 'offset', offset - limit) if offset > limit else remove_query_param(url, 'offset')
         return Response({
-            'count': total,
-            'avg_price': round(avg_price, 2),
-            'most_ordered': most_ordered
+            'next': replace_query_param(url, 'offset', offset + limit) if len(ids) > limit else None,
+            'previous': previous,
+            'results': self.get_serializer([found[pk] for pk in ids[:limit] if pk in found], many=True).data,
         })
 
+    def analytics_params(self, default_days=None):
+        days = self.request.query_params.get('days') or default_days
+        try:
+            days = int(days) if days else None
+        except ValueError:
+            days = 0
+        if days is not None and days <= 0:
+            raise ValidationError({'days': 'Некорректное значение'})
+        return self.filter_queryset(Product.objects.all()), days
+
+    def paginated_metrics(self, metrics, default_days=None):
+        """Метрики по товарам страницами ?limit=&offset= (OffsetPagination): полный список бывает на весь каталог."""
+        products, days = self.analytics_params(default_days)
+        paginator = OffsetPagination()
+        limit, offset = paginator.get_limit(self.request), paginator.get_offset(self.request)
+        data = metrics(products, days, offset, limit)
+        url = self.request.build_absolute_uri()
+        previous = None
+        if offset:
+            previous = replace_query_param(url, 'offset', offset - limit) if offset > limit else remove_query_param(url, 'offset')
+        return Response({
+            'days': days,
+            'next': replace_query_param(url, 'offset', offset + limit) if offset + limit < data['count'] else None,
+            'previous': previous,
+            **data,
+        })
+
+    @action(detail=False, methods=['GET'])
+    def inventory(self, request):
+        return self.paginated_metrics(analytics.inventory_metrics, default_days=30)
+
+    @action(detail=False, methods=['GET'])
+    def abc(self, request):
+        return self.paginated_metrics(analytics.abc_metrics)
+
+    @action(detail=False, methods=['GET'], url_path='size-curve')
+    def size_curve(self, request):
+        products, days = self.analytics_params()
+        return Response({'days': days, 'results': analytics.size_curve_metrics(products, days)})
+
     @action(detail=False, methods=['GET'])
     def export(self, request):
-        data = [{
-            'ID': p.id,
-            'Name': p.name,
-            'Category': p.category.name if p.category else '',
-            'Store': p.store.name if p.store else '',
-            'Size': p.size,
-            'Price': p.price,
-            'Color': p.color or '',
-            'Available': 'Yes' if p.is_available() else 'No'
-        } for p in self.get_queryset()]
-        return self.export_queryset(data, ['ID', 'Name', 'Category', 'Store', 'Size', 'Price', 'Color', 'Available'], 'Products')
-
-
-class OrderViewSet(ModelViewSet, BaseExportMixin):
-    queryset = Order.objects.select_related('product', 'customer', 'user')
+        queryset = self.get_queryset().order_by('id').values(
+            'id', 'name', 'category__name', 'store__name', 'size', 'price', 'color', 'quantity'
+        )
+        return self.export_queryset(
+            queryset, ['ID', 'Name', 'Category', 'Store', 'Size', 'Price', 'Color', 'Available'], 'Products',
+            lambda p: [
+                p['id'], p['name'], p['category__name'] or '', p['store__name'] or '', p['size'], p['price'],
+                p['color'] or '', 'Yes' if p['quantity'] > 0 else 'No'
+            ]
+        )
+
+
+class OrderViewSet(ConditionalGetMixin, SparseQuerysetMixin, ChangesMixin, BulkMixin, ModelViewSet, BaseExportMixin):
+    queryset = Order.objects.select_related('product__store', 'customer', 'user')
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated]
+    version_depends = ('order', 'product', 'customer', 'store')
+    action_depends = {'stats': ('order', 'customer'), 'analytics': ('sales', 'store', 'category')}
+    summary_fields = ('order_id', 'product_name', 'customer_name', 'quantity', 'total_price', 'status', 'order_date')
+    field_sources = {
+        'product_name': ('product__name',),
+        'customer_name': ('customer__first_name',),
+        'store_name': ('product__store__name',),
+    }
+    filter_backends = [QueryParamFilter, OrderingFilter]
+    filter_params = {
+        'status': lookup('status'),
+        'date_from': lookup('order_date__gte', to_date),
+        'date_to': lookup('order_date__lte', to_date),
+        'customer': lookup('customer_id', int),
+        'store': lookup('product__store_id', int),
+    }
+    ordering_fields = ['order_id', 'order_date', 'total_price', 'quantity']
+
+    def perform_create(self, serializer):
+        serializer.instance = place_order(**serializer.validated_data)
+
+    def perform_update(self, serializer):
+        serializer.instance = update_order(serializer.instance, **serializer.validated_data)
+
+    def perform_destroy(self, instance):
+        delete_order(instance)
+
+    def perform_bulk_create(self, valid):
+        return bulk_place_orders(valid)
+
+    def perform_bulk_update(self, pairs):
+        return bulk_update_orders(pairs)
+
+    def perform_bulk_delete(self, queryset):
+        return bulk_delete_orders(queryset)
+
+    @action(detail=True, methods=['POST'], url_path='status')
+    def set_status(self, request, pk=None):
+        status = request.data.get('status')
+        if status not in dict(Order.STATUS_CHOICES):
+            return Response({'status': 'Неизвестный статус'}, status=400)
+        order = change_status(self.get_object(), status)
+        return Response(self.get_serializer(order).data)
 
     @action(detail=False, methods=['GET'])
     def stats(self, request):
-        total = self.get_queryset().count()
-        total_sum = self.get_queryset().aggregate(total=Sum('total_price'))['total'] or 0
-        top_customer = self.get_queryset().values('customer__first_name').annotate(order_count=Count('order_id')).order_by('-order_count').first()
-        return Response({'count': total, 'total_sum': total_sum, 'topCustomer': top_customer})
+        return Response(stats.order_stats())
+
+    @action(detail=False, methods=['GET'])
+    def analytics(self, request):
+        period = request.query_params.get('period') or 'month'
+        group_by = [group for group in request.query_params.get('group_by', '').split(',') if group]
+        queryset = apply_filter_params(request, SalesRollup.objects.all(), rollups.ANALYTICS_FILTERS)
+        return Response({'period': period, 'group_by': group_by,
+                         'results': rollups.sales_analytics(queryset, period, group_by)})
 
     @action(detail=False, methods=['GET'])
     def export(self, request):
-        data = [{
-            'ID': o.order_id,
-            'Product': o.product.name if o.product else '',
-            'Customer': f"{o.customer.first_name} {o.customer.last_name or ''}" if o.customer else '',
-            'Quantity': o.quantity,
-            'Total Price': o.total_price,
-            'Status': o.get_status_display(),
-            'Order Date': o.order_date,
-            'Delivery Date': o.delivery_date or 'Not delivered',
-            'User': o.user.username if o.user else ''
-        } for o in self.get_queryset()]
-        return self.export_queryset(data, ['ID', 'Product', 'Customer', 'Quantity', 'Total Price', 'Status', 'Order Date', 'Delivery Date', 'User'], 'Orders')
-
-
-class CustomerViewSet(ModelViewSet, BaseExportMixin):
-    queryset = User.objects.all()
+        statuses = dict(Order.STATUS_CHOICES)
+        queryset = self.get_queryset().order_by('order_id').values(
+            'order_id', 'product__name', 'customer__first_name', 'customer__last_name', 'quantity',
+            'total_price', 'status', 'order_date', 'delivery_date', 'user__username'
+        )
+        return self.export_queryset(
+            queryset, ['ID', 'Product', 'Customer', 'Quantity', 'Total Price', 'Status', 'Order Date', 'Delivery Date', 'User'], 'Orders',
+            lambda o: [
+                o['order_id'], o['product__name'] or '', f"{o['customer__first_name']} {o['customer__last_name'] or ''}",
+                o['quantity'], o['total_price'], statuses.get(o['status'], o['status']), o['order_date'],
+                o['delivery_date'] or 'Not delivered', o['user__username'] or ''
+            ]
+        )
+
+
+class CustomerViewSet(ConditionalGetMixin, SparseQuerysetMixin, ChangesMixin, AutocompleteMixin, AtomicWriteMixin, ModelViewSet, BaseExportMixin):
+    queryset = User.objects.select_related('profile')
     serializer_class = CustomerSerializer
     permission_classes = [IsAuthenticated]
+    version_depends = ('user',)
+    action_depends = {'stats': ('user',)}
+    summary_fields = ('id', 'username', 'first_name', 'last_name')
+    field_sources = {'age': ('profile__age',)}
+    autocomplete_resource = 'customer'
 
     @action(detail=False, methods=['GET'])
     def stats(self, request):
-        qs = self.get_queryset()
-        total_users = qs.count()
-        total_admins = qs.filter(is_superuser=True).count()
-        return Response({'count': total_users, 'count_admins': total_admins, 'count_users': total_users - total_admins})
+        return Response(stats.customer_stats())
 
     def create(self, request, *args, **kwargs):
         data = request.data
@@ -203,14 +707,11 @@ class CustomerViewSet(ModelViewSet, BaseExportMixin):
 
     @action(detail=False, methods=['GET'])
     def export(self, request):
-        data = []
-        for u in self.get_queryset():
-            profile = getattr(u, 'userprofile', None)
-            data.append({
-                'ID': u.id,
-                'Username': u.username,
-                'Email': u.email,
-                'Age': profile.age if profile else '',
-                'Role': 'Администратор' if u.is_superuser else 'Покупатель'
-            })
-        return self.export_queryset(data, ['ID', 'Username', 'Email', 'Age', 'Role'], 'Customers')
+        queryset = self.get_queryset().order_by('id').values('id', 'username', 'email', 'profile__age', 'is_superuser')
+        return self.export_queryset(
+            queryset, ['ID', 'Username', 'Email', 'Age', 'Role'], 'Customers',
+            lambda u: [
+                u['id'], u['username'], u['email'], u['profile__age'] if u['profile__age'] is not None else '',
+                'Администратор' if u['is_superuser'] else 'Покупатель'
+            ]
+        )
@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class WardrobeConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'wardrobe'
+
+    def ready(self):
+        import wardrobe.versions  # noqa: F401
+        import wardrobe.snapshots  # noqa: F401
+        import wardrobe.stats  # noqa: F401
+        import wardrobe.rollups  # noqa: F401
+        import wardrobe.changes  # noqa: F401
+        import wardrobe.search  # noqa: F401
+        import wardrobe.autocomplete  # noqa: F401
+        import wardrobe.thumbnails  # noqa: F401
+        import wardrobe.media  # noqa: F401
+        import wardrobe.metrics  # noqa: F401
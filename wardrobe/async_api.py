@@ -0,0 +1,111 @@
+"""
+Асинхронные варианты горячих эндпоинтов чтения для запуска под ASGI.
+
+app/asgi.py направляет запросы в app.asgi_urls, где эти представления стоят
+перед роутером DRF на тех же адресах. Обычный GET с ответом в JSON они
+обслуживают через async ORM, не занимая поток сервера на время запроса;
+запись, браузерный API, ?offset=/?limit= и ошибки в параметрах передаются
+обычному представлению DRF, поэтому ответы обоих путей совпадают.
+"""
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException, NotAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from wardrobe import stats
+from wardrobe.api import (
+    CategoryViewSet, CustomerViewSet, OrderViewSet, ProductViewSet, StoreViewSet, UserProfileViewSet,
+    conditional_validators, set_conditional_headers,
+)
+from wardrobe.versions import aget_version_info
+
+
+def json_response(data, status=200):
+    return HttpResponse(JSONRenderer().render(data), status=status, content_type='application/json')
+
+
+def wants_json(request):
+    return request.GET.get('format', 'json') == 'json' and 'text/html' not in request.headers.get('Accept', '')
+
+
+async def conditional(request, depends, respond):
+    """Ответ respond() с ETag/Last-Modified; 304, если у клиента актуальная версия."""
+    etag, last_modified = conditional_validators('json', *await aget_version_info(*depends))
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = await respond()
+        if response is None:
+            return None
+    set_conditional_headers(response, etag, last_modified)
+    return response
+
+
+def async_read(viewset, actions, handler, authenticated=True):
+    """
+    Асинхронное представление для GET: handler(request, viewset) возвращает
+    ответ или None, если запрос должен обработать DRF.
+    """
+    fallback = sync_to_async(viewset.as_view(actions))
+
+    @csrf_exempt
+    async def view(request, *args, **kwargs):
+        if request.method != 'GET' or not wants_json(request):
+            return await fallback(request, *args, **kwargs)
+        if authenticated and not (await request.auser()).is_authenticated:
+            return json_response({'detail': NotAuthenticated.default_detail}, status=403)
+        response = await handler(request, viewset)
+        if response is None:
+            return await fallback(request, *args, **kwargs)
+        return response
+
+    return view
+
+
+async def list_page(request, viewset):
+    drf_request = Request(request)
+    view = viewset(request=drf_request, format_kwarg=None, action='list', args=(), kwargs={})
+    paginator = view.paginator
+    if paginator.use_offset(drf_request):
+        return None
+
+    async def respond():
+        try:
+            queryset = view.filter_queryset(view.get_queryset())
+            page = await paginator.apaginate_queryset(queryset, drf_request, view)
+        except APIException:
+            return None
+        data = view.get_serializer(page, many=True).data
+        return json_response(paginator.get_paginated_response(data).data)
+
+    return await conditional(request, viewset.version_depends, respond)
+
+
+def stats_handler(compute):
+    async def handler(request, viewset):
+        async def respond():
+            return json_response(await compute())
+        return await conditional(request, viewset.action_depends['stats'], respond)
+    return handler
+
+
+async def info_handler(request, viewset):
+    user = await request.auser()
+    return json_response({
+        'id': user.id,
+        'username': user.username if user.is_authenticated else '',
+        'is_authenticated': user.is_authenticated,
+        'is_superuser': user.is_superuser if user.is_authenticated else False,
+    })
+
+
+product_list = async_read(ProductViewSet, {'get': 'list', 'post': 'create'}, list_page)
+order_list = async_read(OrderViewSet, {'get': 'list', 'post': 'create'}, list_page)
+category_stats = async_read(CategoryViewSet, {'get': 'stats'}, stats_handler(stats.acategory_stats))
+store_stats = async_read(StoreViewSet, {'get': 'stats'}, stats_handler(stats.astore_stats))
+product_stats = async_read(ProductViewSet, {'get': 'stats'}, stats_handler(stats.aproduct_stats))
+order_stats = async_read(OrderViewSet, {'get': 'stats'}, stats_handler(stats.aorder_stats))
+customer_stats = async_read(CustomerViewSet, {'get': 'stats'}, stats_handler(stats.acustomer_stats))
+user_info = async_read(UserProfileViewSet, {'get': 'info'}, info_handler, authenticated=False)
@@ -0,0 +1,167 @@
+"""
+Подсказки по префиксу для выпадающих списков (/api/<ресурс>/autocomplete/?q=).
+
+Индекс — отсортированный список ключей в памяти процесса: для каждого слова
+названия ключ — остаток названия с этого слова, поэтому «Ботинки зимние»
+находятся и по «бот», и по «зим», и по «ботинки зи». Поиск — bisect и проход
+по соседним ключам, без запросов к базе.
+
+Индекс строится лениво при первом запросе. Изменение названий в этом процессе
+сбрасывает его после коммита; другие процессы узнают об изменении по версии
+autocomplete.<ресурс> (wardrobe.versions), которую проверяют не чаще раза
+в VERSION_CHECK_SECONDS.
+"""
+import bisect
+import re
+import threading
+import time
+from array import array
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from wardrobe.models import Product, Store
+from wardrobe.search import normalize
+from wardrobe.snapshots import previous, track
+from wardrobe.versions import bulk_changed, bump_version, find_pending, get_version_info
+
+AUTOCOMPLETE_LIMIT = 10
+MAX_AUTOCOMPLETE_LIMIT = 50
+VERSION_CHECK_SECONDS = 1.0
+# Сколько ключей просмотреть при фильтре (товары магазина), прежде чем сдаться
+MAX_SCAN = 10000
+
+
+def words(text):
+    return re.findall(r'\w+', normalize(text or ''))
+
+
+class PrefixIndex:
+    def __init__(self, rows):
+        """rows — (id, подпись, текст для поиска, группа для фильтра или None)."""
+        self.ids, self.labels, self.groups = array('q'), [], array('q')
+        entries = []
+        for position, (pk, label, text, group) in enumerate(rows):
+            self.ids.append(pk)
+            self.labels.append(label)
+            self.groups.append(group or 0)
+            tokens = words(text)
+            entries += [(' '.join(tokens[start:]), position) for start in range(len(tokens))]
+        entries.sort()
+        self.keys = [key for key, _ in entries]
+        self.positions = array('q', [position for _, position in entries])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def lookup(self, query, limit=AUTOCOMPLETE_LIMIT, group=None):
+        prefix = ' '.join(words(query))
+        if not prefix:
+            return []
+        found, seen = [], set()
+        start = bisect.bisect_left(self.keys, prefix)
+        end = min(len(self.keys), start + MAX_SCAN) if group is not None else len(self.keys)
+        for i in range(start, end):
+            if not self.keys[i].startswith(prefix):
+                break
+            position = self.positions[i]
+            if position in seen or (group is not None and self.groups[position] != group):
+                continue
+            seen.add(position)
+            found.append({'id': self.ids[position], 'name': self.labels[position]})
+            if len(found) >= limit:
+                break
+        return found
+
+
+class Autocomplete:
+    def __init__(self, resource, rows):
+        self.version_name = f'autocomplete.{resource}'
+        self.rows = rows
+        self.lock = threading.Lock()
+        self.index = None
+        self.version = None
+        self.checked_at = 0
+
+    def invalidate(self):
+        self.index = None
+
+    def get_index(self):
+        index = self.index
+        if index is not None and time.monotonic() - self.checked_at < VERSION_CHECK_SECONDS:
+            return index
+        with self.lock:
+            # Версию читаем до построения: изменение во время сборки даст пересборку в следующий раз
+            versions, last_modified = get_version_info(self.version_name)
+            version = (versions[self.version_name], last_modified)
+            if self.index is None or version != self.version:
+                self.index = PrefixIndex(self.rows())
+                self.version = version
+            self.checked_at = time.monotonic()
+            return self.index
+
+    def lookup(self, query, limit=AUTOCOMPLETE_LIMIT, group=None):
+        return self.get_index().lookup(query, limit, group)
+
+
+INDEXES = {
+    'product': Autocomplete('product', lambda: (
+        (pk, name, name, store_id)
+        for pk, name, store_id in Product.objects.order_by('pk').values_list('pk', 'name', 'store_id').iterator(chunk_size=10000))),
+    'store': Autocomplete('store', lambda: (
+        (pk, name, name, None) for pk, name in Store.objects.order_by('pk').values_list('pk', 'name'))),
+    'customer': Autocomplete('customer', lambda: (
+        (pk, username, f'{username} {first_name} {last_name}', None)
+        for pk, username, first_name, last_name in User.objects.order_by('pk').values_list('pk', 'username', 'first_name', 'last_name'))),
+}
+# Поля, от которых зависит индекс
+INDEXED_FIELDS = {
+    Product: ('product', ('name', 'store_id')),
+    Store: ('store', ('name',)),
+    User: ('customer', ('username', 'first_name', 'last_name')),
+}
+for model, (_, fields) in INDEXED_FIELDS.items():
+    track(model, *fields)
+
+
+class PendingInvalidate:
+    done = False
+
+    def __init__(self, index):
+        self.index = index
+
+    def __call__(self):
+        self.done = True
+        self.index.invalidate()
+
+
+def names_changed(resource):
+    index = INDEXES[resource]
+    bump_version(index.version_name)
+    if not find_pending(lambda callback: isinstance(callback, PendingInvalidate) and callback.index is index):
+        transaction.on_commit(PendingInvalidate(index))
+
+
+def touches_names(sender, update_fields):
+    # Например, вход пользователя сохраняет только last_login
+    _, fields = INDEXED_FIELDS[sender]
+    return update_fields is None or bool({field.removesuffix('_id') for field in fields} & {field.removesuffix('_id') for field in update_fields})
+
+
+@receiver(post_save)
+def name_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if sender not in INDEXED_FIELDS or not (created or touches_names(sender, update_fields)):
+        return
+    resource, fields = INDEXED_FIELDS[sender]
+    old = previous(instance)
+    if created or raw or old is None or any(old[field] != getattr(instance, field) for field in fields):
+        names_changed(resource)
+
+
+@receiver(post_delete)
+@receiver(bulk_changed)
+def names_bulk_changed(sender, **kwargs):
+    if sender in INDEXED_FIELDS:
+        names_changed(INDEXED_FIELDS[sender][0])
@@ -0,0 +1,90 @@
+"""
+Бенчмарк API: pytest wardrobe/benchmarks --benchmark
+
+Перед замерами тестовая база один раз заполняется generate_data с постоянным
+seed (объём — --benchmark-scale). Для каждого эндпоинта измеряются p50/p95
+времени ответа, число SQL-запросов и пик памяти на запрос; тест падает, если
+запросов больше, чем в baselines.json, или время и память вышли за базовые
+значения с допуском. Без --benchmark тесты пропускаются.
+
+Число запросов от машины не зависит, а время — зависит: baselines.json
+записан на машине разработчика. На другой машине сначала запишите свои
+базовые значения и не коммитьте их, если это не общая машина CI:
+
+    pytest wardrobe/benchmarks --benchmark-update
+    pytest wardrobe/benchmarks --benchmark
+
+Допуск по времени задаёт --benchmark-latency-tolerance (p95 не больше
+базового, умноженного на допуск); 0 отключает проверку времени, оставляя
+проверки запросов и памяти — так бенчмарк гоняют на чужих базовых значениях.
+"""
+import io
+import json
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+
+BENCHMARK_DIR = Path(__file__).parent
+BASELINES = BENCHMARK_DIR / 'baselines.json'
+# Объём данных при --benchmark-scale 1
+VOLUMES = {'users': 20, 'categories': 40, 'stores': 50, 'products': 5000, 'customers': 2000, 'orders': 50000}
+SEED = 2025
+
+results = {}
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('benchmark')
+    group.addoption('--benchmark', action='store_true', help='Запустить бенчмарк API')
+    group.addoption('--benchmark-update', action='store_true', help='Записать результаты как базовые значения')
+    group.addoption('--benchmark-scale', type=float, default=1.0, help='Множитель объёма данных')
+    group.addoption('--benchmark-rounds', type=int, default=20, help='Замеров на эндпоинт')
+    group.addoption('--benchmark-latency-tolerance', type=float, default=1.5,
+                    help='Допустимый рост p95 относительно baselines.json; 0 — не проверять время')
+
+
+def option(config, name, default=None):
+    # Параметры регистрируются, только если conftest загружен при старте (путь передан в командной строке)
+    return config.getoption(name, default=default)
+
+
+def pytest_collection_modifyitems(config, items):
+    if option(config, 'benchmark') or option(config, 'benchmark_update'):
+        return
+    skip = pytest.mark.skip(reason='бенчмарк запускается с --benchmark')
+    # Хук видит все собранные тесты сессии, а пропускать нужно только бенчмарк
+    for item in items:
+        if BENCHMARK_DIR in item.path.parents:
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope='session')
+def benchmark_data(django_db_setup, django_db_blocker, request):
+    scale = option(request.config, 'benchmark_scale', 1.0)
+    volumes = {name: max(1, int(count * scale)) for name, count in VOLUMES.items()}
+    with django_db_blocker.unblock():
+        call_command('generate_data', seed=SEED, stdout=io.StringIO(), **volumes)
+    return volumes
+
+
+@pytest.fixture(scope='session')
+def baselines():
+    return json.loads(BASELINES.read_text()) if BASELINES.exists() else {}
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not results:
+        return
+    write = terminalreporter.write_line
+    terminalreporter.section('API benchmark')
+    write(f"{'Эндпоинт':<28}{'p50, мс':>10}{'p95, мс':>10}{'запросов':>10}{'пик, КБ':>10}")
+    for name, result in sorted(results.items()):
+        write(f"{name:<28}{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}{result['queries']:>10}{result['peak_kb']:>10}")
+
+
+def pytest_sessionfinish(session):
+    if results and option(session.config, 'benchmark_update'):
+        stored = json.loads(BASELINES.read_text()) if BASELINES.exists() else {}
+        stored.update(results)
+        BASELINES.write_text(json.dumps(dict(sorted(stored.items())), indent=2, ensure_ascii=False) + '\n')
@@ -0,0 +1,103 @@
+import statistics
+import time
+import tracemalloc
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from wardrobe.benchmarks.conftest import results
+from wardrobe.management.commands.generate_data import PASSWORD
+from wardrobe.models import Category, Order, Product, Store
+
+# Допуск к базовым значениям: время на общей машине шумит (множитель — --benchmark-latency-tolerance), память — меньше
+LATENCY_SLACK_MS = 5
+MEMORY_TOLERANCE = 1.25
+WARMUP = 2
+
+# (название, метод, адрес, данные, замеров — None: --benchmark-rounds)
+CASES = [
+    *[(f'{prefix}.{action}', 'get', f'/api/{prefix}/{suffix}', None, rounds)
+      for prefix in ('categories', 'stores', 'products', 'customers', 'orders')
+      for action, suffix, rounds in (('list', '', None), ('detail', '{id}/', None), ('stats', 'stats/', None),
+                                     ('export', 'export/?type=csv', 3))],
+    ('products.list_summary', 'get', '/api/products/?view=summary&page_size=500', None, None),
+    ('products.search', 'get', '/api/products/search/?q=куртки', None, None),
+    ('products.autocomplete', 'get', '/api/products/autocomplete/?q=ба', None, None),
+    ('orders.list_page_10', 'get', '/api/orders/?offset=450&limit=50', None, None),
+    ('orders.analytics', 'get', '/api/orders/analytics/?period=month&group_by=store', None, None),
+    ('userprofile.info', 'get', '/api/userprofile/info/', None, None),
+    # Проверка пароля (PBKDF2) занимает сотни миллисекунд
+    ('userprofile.login', 'post', '/api/userprofile/login/', 'login', 3),
+]
+MODELS = {'categories': Category, 'stores': Store, 'products': Product, 'customers': User, 'orders': Order}
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+def measure(client, method, url, data, rounds):
+    call = getattr(client, method)
+
+    def request():
+        response = call(url, data, format='json') if data else call(url)
+        assert response.status_code in (200, 201), (url, response.status_code, getattr(response, 'content', b'')[:200])
+        # Потоковые ответы (экспорт) дочитываем: иначе время генерации не попадёт в замер
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return response
+
+    for _ in range(WARMUP):
+        request()
+    with CaptureQueriesContext(connection) as queries:
+        request()
+    # captured_queries — срез журнала соединения, а следующий запрос очищает журнал (сигнал request_started)
+    query_count = len(queries.captured_queries)
+    tracemalloc.start()
+    request()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        request()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        'p50_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(percentile(timings, 0.95), 2),
+        'queries': query_count,
+        'peak_kb': peak // 1024,
+    }
+
+
+@pytest.fixture
+def api_client(benchmark_data):
+    client = APIClient()
+    client.force_authenticate(User.objects.filter(is_superuser=True).order_by('pk').first())
+    return client
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('name, method, url, data, rounds', CASES, ids=[case[0] for case in CASES])
+def test_endpoint_budget(api_client, baselines, request, name, method, url, data, rounds):
+    if '{id}' in url:
+        url = url.format(id=MODELS[url.split('/')[2]].objects.order_by('pk').values_list('pk', flat=True)[0])
+    if data == 'login':
+        api_client.force_authenticate(None)
+        data = {'username': User.objects.order_by('pk').values_list('username', flat=True)[0], 'password': PASSWORD}
+    result = measure(api_client, method, url, data, rounds or request.config.getoption('benchmark_rounds', default=20))
+    results[name] = result
+    if request.config.getoption('benchmark_update', default=False):
+        return
+    baseline = baselines.get(name)
+    assert baseline, f'Нет базовых значений для {name}: запустите с --benchmark-update'
+    assert result['queries'] <= baseline['queries'], f"{name}: {result['queries']} SQL-запросов, бюджет {baseline['queries']}"
+    tolerance = request.config.getoption('benchmark_latency_tolerance', default=1.5)
+    if tolerance:
+        budget = baseline['p95_ms'] * tolerance + LATENCY_SLACK_MS
+        assert result['p95_ms'] <= budget, f"{name}: p95 {result['p95_ms']} мс, бюджет {budget:.1f} мс"
+    memory_budget = baseline['peak_kb'] * MEMORY_TOLERANCE + 64
+    assert result['peak_kb'] <= memory_budget, f"{name}: пик памяти {result['peak_kb']} КБ, бюджет {memory_budget:.0f} КБ"
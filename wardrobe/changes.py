@@ -0,0 +1,76 @@
+"""
+Журнал изменений (ChangeLog) для дельта-синхронизации клиента.
+
+Каждое изменение объекта добавляет в журнал новую запись и удаляет прежние
+записи того же объекта, поэтому в журнале остаётся по одной записи на объект
+— последняя, с пометкой об удалении, если объект удалён. id записи растёт
+монотонно (AUTOINCREMENT), SQLite выполняет пишущие транзакции по одной,
+так что клиент, запомнивший последний полученный id, получит все изменения,
+закоммиченные после него.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from wardrobe.events import queue_event
+from wardrobe.models import ChangeLog, UserProfile
+from wardrobe.versions import RESOURCES, bulk_changed
+
+CHANGES_PAGE_SIZE = 500
+MAX_CHANGES_PAGE_SIZE = 5000
+
+
+def object_id(instance):
+    # Профиль отдаётся в составе пользователя
+    return instance.user_id if isinstance(instance, UserProfile) else instance.pk
+
+
+def record_changes(resource, object_ids, deleted=False, created=False):
+    object_ids = list(dict.fromkeys(object_ids))
+    if not object_ids:
+        return
+    entries = ChangeLog.objects.bulk_create([ChangeLog(resource=resource, object_id=pk, deleted=deleted) for pk in object_ids])
+    if not created:
+        ChangeLog.objects.filter(resource=resource, object_id__in=object_ids, id__lt=min(entry.id for entry in entries)).delete()
+    queue_event(resource, object_ids, deleted=deleted)
+
+
+def touch_updated_at(objs, fields):
+    """Для bulk_update: auto_now не срабатывает, время изменения ставим сами."""
+    objs = list(objs)
+    if objs and any(field.name == 'updated_at' for field in objs[0]._meta.concrete_fields):
+        now = timezone.now()
+        for obj in objs:
+            obj.updated_at = now
+        fields = [*fields, 'updated_at']
+    return fields
+
+
+def changes_since(resource, since, limit):
+    """Записи журнала после since: (записи, есть ли ещё)."""
+    entries = list(ChangeLog.objects.filter(resource=resource, id__gt=since).order_by('id')
+                   .values_list('id', 'object_id', 'deleted')[:limit + 1])
+    return entries[:limit], len(entries) > limit
+
+
+@receiver(post_save)
+def record_save(sender, instance, created, raw=False, **kwargs):
+    resource = RESOURCES.get(sender)
+    if resource and not raw:
+        record_changes(resource, [object_id(instance)], created=created and sender is not UserProfile)
+
+
+@receiver(post_delete)
+def record_delete(sender, instance, **kwargs):
+    resource = RESOURCES.get(sender)
+    if resource:
+        # Удаление профиля — изменение пользователя, а не его удаление
+        record_changes(resource, [object_id(instance)], deleted=sender is not UserProfile)
+
+
+@receiver(bulk_changed)
+def record_bulk_change(sender, created=(), updated=(), **kwargs):
+    resource = RESOURCES.get(sender)
+    if resource:
+        record_changes(resource, [object_id(instance) for instance in created], created=sender is not UserProfile)
+        record_changes(resource, [object_id(instance) for instance in updated])
@@ -0,0 +1,134 @@
+"""
+Внутрипроцессная шина событий об изменениях для SSE (/api/events/).
+
+Изменения транзакции копятся и после коммита публикуются подписчикам. У
+каждого подписчика своя ограниченная asyncio.Queue в его цикле событий;
+публикация из любого потока идёт через call_soon_threadsafe — по одному
+вызову на цикл, а не на подписчика. Если клиент не успевает читать и
+очередь заполнена, она очищается и подписчик получает одно событие resync:
+клиенту нужно перечитать данные (например, через /changes/).
+
+Подписчики живут в одном процессе: при нескольких процессах сервера
+каждый видит только изменения, сделанные в нём самом.
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from django.db import transaction
+
+from wardrobe.versions import find_pending
+
+EVENT_RESOURCES = ('order', 'product', 'stock', 'category', 'store', 'customer', 'user')
+QUEUE_SIZE = 100
+HEARTBEAT_SECONDS = 15
+RETRY_MILLISECONDS = 5000
+
+
+class Subscriber:
+    def __init__(self, resources, loop, queue_size=QUEUE_SIZE):
+        self.resources = frozenset(resources)
+        self.loop = loop
+        self.queue = asyncio.Queue(queue_size)
+
+    def offer(self, event):
+        # Выполняется в цикле событий подписчика
+        if event['resource'] not in self.resources:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({'type': 'resync'})
+
+
+class Broker:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.loops = defaultdict(set)
+
+    def subscribe(self, resources=EVENT_RESOURCES, queue_size=QUEUE_SIZE):
+        subscriber = Subscriber(resources, asyncio.get_running_loop(), queue_size)
+        with self.lock:
+            self.loops[subscriber.loop].add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            subscribers = self.loops.get(subscriber.loop)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self.loops[subscriber.loop]
+
+    def count(self):
+        with self.lock:
+            return sum(len(subscribers) for subscribers in self.loops.values())
+
+    def publish(self, event):
+        with self.lock:
+            targets = [(loop, list(subscribers)) for loop, subscribers in self.loops.items()]
+        for loop, subscribers in targets:
+            try:
+                loop.call_soon_threadsafe(deliver, subscribers, event)
+            except RuntimeError:
+                # Цикл уже закрыт — его подписчики больше не читают
+                with self.lock:
+                    self.loops.pop(loop, None)
+
+
+def deliver(subscribers, event):
+    for subscriber in subscribers:
+        subscriber.offer(event)
+
+
+broker = Broker()
+
+
+class PendingEvents(dict):
+    """События текущей транзакции: ресурс → (изменённые id, удалённые id)."""
+
+    done = False
+
+    def add(self, resource, ids, deleted):
+        changed, removed = self.setdefault(resource, (set(), set()))
+        (removed if deleted else changed).update(ids)
+
+    def __call__(self):
+        self.done = True
+        for resource, (changed, removed) in self.items():
+            broker.publish({'type': 'change', 'resource': resource, 'ids': sorted(changed - removed), 'deleted': sorted(removed)})
+
+
+def queue_event(resource, ids, deleted=False):
+    ids = list(ids)
+    if not ids:
+        return
+    pending = find_pending(lambda callback: isinstance(callback, PendingEvents))
+    if pending is not None:
+        pending.add(resource, ids, deleted)
+        return
+    pending = PendingEvents()
+    pending.add(resource, ids, deleted)
+    transaction.on_commit(pending)
+
+
+def format_event(event):
+    return f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+async def stream(subscriber, heartbeat=HEARTBEAT_SECONDS):
+    try:
+        yield f'retry: {RETRY_MILLISECONDS}\n\n'
+        while True:
+            try:
+                event = await asyncio.wait_for(subscriber.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                # Комментарий SSE: держит соединение через прокси и выявляет отключившихся
+                yield ': ping\n\n'
+                continue
+            yield format_event(event)
+    finally:
+        broker.unsubscribe(subscriber)
@@ -0,0 +1,123 @@
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+
+from wardrobe.exports import iter_rows, stream_csv, write_xlsx
+
+EXTENSIONS = {'csv': 'csv', 'excel': 'xlsx'}
+# Сколько секунд завершённая задача хранится в памяти; готовый файл и после
+# этого находится на диске по id
+JOB_TTL = 3600
+
+executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='export')
+jobs = {}
+jobs_lock = threading.Lock()
+
+
+def export_root():
+    # Не в MEDIA_ROOT: выгрузки с персональными данными отдаёт только
+    # представление export_download после проверки прав
+    return Path(settings.EXPORT_ROOT)
+
+
+def job_key(queryset, filename_base, export_type, versions):
+    # Запрос и версии зависимых таблиц входят в ключ: пока данные не менялись,
+    # одинаковые запросы получают один и тот же файл.
+    source = '|'.join([filename_base, export_type, str(queryset.query), repr(sorted(versions.items()))])
+    return hashlib.sha256(source.encode()).hexdigest()[:32]
+
+
+def artifact_path(job_id, filename_base, export_type):
+    return export_root() / f'{filename_base}-{job_id}.{EXTENSIONS[export_type]}'
+
+
+def find_artifact(job_id):
+    for extension in EXTENSIONS.values():
+        for path in export_root().glob(f'*-{job_id}.{extension}'):
+            return path
+    return None
+
+
+def remove_stale_artifacts(path, filename_base):
+    # Файлы прежних версий той же выгрузки больше не понадобятся
+    for stale in export_root().glob(f'{filename_base}-*{path.suffix}'):
+        if stale != path:
+            stale.unlink(missing_ok=True)
+
+
+def prune_jobs():
+    """Убирает из памяти задачи, завершённые больше JOB_TTL назад; вызывается под jobs_lock."""
+    expired = time.monotonic() - JOB_TTL
+    for job_id in [job_id for job_id, job in jobs.items() if job.get('finished', float('inf')) < expired]:
+        del jobs[job_id]
+
+
+def get_job(job_id):
+    with jobs_lock:
+        prune_jobs()
+        job = jobs.get(job_id)
+        if job is not None and (job['status'] != 'done' or find_artifact(job_id)):
+            return dict(job)
+        jobs.pop(job_id, None)
+    path = find_artifact(job_id)
+    if path is None:
+        return None
+    return {'id': job_id, 'status': 'done', 'rows': None, 'total': None}
+
+
+def update_job(job_id, **fields):
+    with jobs_lock:
+        jobs[job_id].update(fields)
+
+
+def submit(queryset, columns, filename_base, row, export_type, versions):
+    job_id = job_key(queryset, filename_base, export_type, versions)
+    with jobs_lock:
+        prune_jobs()
+        job = jobs.get(job_id)
+        if job is not None and job['status'] in ('queued', 'running'):
+            return dict(job)
+        path = artifact_path(job_id, filename_base, export_type)
+        if path.exists():
+            jobs[job_id] = {'id': job_id, 'status': 'done', 'rows': None, 'total': None, 'finished': time.monotonic()}
+        else:
+            jobs[job_id] = {'id': job_id, 'status': 'queued', 'rows': 0, 'total': None}
+            executor.submit(run_job, job_id, path, queryset, columns, filename_base, row, export_type)
+        return dict(jobs[job_id])
+
+
+def counted(job_id, rows, step=1000):
+    written = 0
+    for values in rows:
+        yield values
+        written += 1
+        if written % step == 0:
+            update_job(job_id, rows=written)
+    update_job(job_id, rows=written)
+
+
+def run_job(job_id, path, queryset, columns, filename_base, row, export_type):
+    try:
+        update_job(job_id, status='running', total=queryset.count())
+        rows = counted(job_id, iter_rows(queryset, row))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(f'{path.name}.part')
+        if export_type == 'csv':
+            with open(partial, 'w', encoding='utf-8', newline='') as output:
+                output.writelines(stream_csv(columns, rows))
+        else:
+            with open(partial, 'wb') as output:
+                write_xlsx(output, filename_base, columns, rows)
+        os.replace(partial, path)
+        remove_stale_artifacts(path, filename_base)
+        update_job(job_id, status='done', finished=time.monotonic())
+    except Exception as error:
+        update_job(job_id, status='failed', error=str(error), finished=time.monotonic())
+    finally:
+        connections.close_all()
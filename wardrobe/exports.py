@@ -0,0 +1,56 @@
+import csv
+import tempfile
+
+import xlsxwriter
+from django.http import FileResponse, StreamingHttpResponse
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+CSV_CONTENT_TYPE = "text/csv; charset=utf-8"
+EXPORT_CHUNK_SIZE = 2000
+
+
+class Echo:
+    """Псевдо-файл для csv.writer: writerow возвращает строку вместо записи."""
+
+    def write(self, value):
+        return value
+
+
+def iter_rows(queryset, row, chunk_size=EXPORT_CHUNK_SIZE):
+    for record in queryset.iterator(chunk_size=chunk_size):
+        yield row(record)
+
+
+def stream_csv(columns, rows):
+    writer = csv.writer(Echo())
+    # BOM, чтобы Excel открыл кириллицу в UTF-8
+    yield "\ufeff" + writer.writerow(columns)
+    for values in rows:
+        yield writer.writerow(values)
+
+
+def write_xlsx(output, sheet_name, columns, rows):
+    # constant_memory сбрасывает каждую строку на диск и пишет строки inline,
+    # поэтому память не растёт с количеством строк.
+    workbook = xlsxwriter.Workbook(output, {
+        "constant_memory": True,
+        "default_date_format": "yyyy-mm-dd",
+    })
+    sheet = workbook.add_worksheet(sheet_name)
+    sheet.write_row(0, 0, columns)
+    for index, values in enumerate(rows, start=1):
+        sheet.write_row(index, 0, values)
+    workbook.close()
+
+
+def csv_response(columns, rows, filename_base):
+    response = StreamingHttpResponse(stream_csv(columns, rows), content_type=CSV_CONTENT_TYPE)
+    response["Content-Disposition"] = f'attachment; filename="{filename_base}.csv"'
+    return response
+
+
+def xlsx_response(columns, rows, filename_base):
+    output = tempfile.TemporaryFile()
+    write_xlsx(output, filename_base, columns, rows)
+    output.seek(0)
+    return FileResponse(output, as_attachment=True, filename=f"{filename_base}.xlsx", content_type=XLSX_CONTENT_TYPE)
@@ -0,0 +1,60 @@
+import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+FALSE_VALUES = ('0', 'false', 'no', 'off')
+
+
+def to_bool(value):
+    value = value.lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise ValueError(value)
+
+
+def to_decimal(value):
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        raise ValueError(value)
+
+
+def to_date(value):
+    return datetime.date.fromisoformat(value)
+
+
+def lookup(field, cast=str):
+    return lambda value: Q(**{field: cast(value)})
+
+
+def in_stock(value):
+    return Q(quantity__gt=0) if to_bool(value) else Q(quantity=0)
+
+
+def apply_filter_params(request, queryset, filter_params):
+    conditions = Q()
+    for param, build in filter_params.items():
+        value = request.query_params.get(param)
+        if value in (None, ''):
+            continue
+        try:
+            conditions &= build(value)
+        except (TypeError, ValueError):
+            raise ValidationError({param: 'Некорректное значение'})
+    return queryset.filter(conditions)
+
+
+class QueryParamFilter(BaseFilterBackend):
+    """
+    Фильтры из строки запроса: view.filter_params сопоставляет имени
+    параметра функцию, которая строит Q из его значения.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        return apply_filter_params(request, queryset, getattr(view, 'filter_params', {}))
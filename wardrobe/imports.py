@@ -0,0 +1,140 @@
+import csv
+import io
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from openpyxl import load_workbook
+from rest_framework.exceptions import ValidationError
+
+from wardrobe.changes import touch_updated_at
+from wardrobe.versions import notify_bulk_change
+
+IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+
+def read_rows(upload, file_type):
+    """Построчно читает загруженный файл, не загружая его целиком. Отдаёт (номер строки, значения)."""
+    workbook = None
+    if file_type == 'csv':
+        rows = csv.reader(io.TextIOWrapper(upload, encoding='utf-8-sig', newline=''))
+    else:
+        workbook = load_workbook(upload, read_only=True, data_only=True)
+        rows = workbook.active.iter_rows(values_only=True)
+    try:
+        for line, values in enumerate(rows, start=1):
+            if any(value not in (None, '') for value in values):
+                yield line, values
+    finally:
+        # Книга в режиме read_only держит файл открытым до close()
+        if workbook is not None:
+            workbook.close()
+
+
+def name_lookup(model, field='name'):
+    # При совпадающих названиях побеждает запись с меньшим id
+    return {name: pk for pk, name in model.objects.order_by('-pk').values_list('pk', field)}
+
+
+def user_lookup():
+    return name_lookup(User, 'username')
+
+
+class Importer:
+    """
+    Импорт в формате колонок экспорта. columns сопоставляет заголовок колонки
+    полю сериализатора (None — колонка игнорируется), lookups — полю словарь
+    «название → id», по которому названия превращаются в внешние ключи.
+    Строки с существующим ID обновляются, остальные создаются; запись идёт
+    пачками через bulk_update/bulk_create, каждая пачка — в своей транзакции:
+    блокировка записи не держится весь импорт, но при сбое посреди файла уже
+    записанные пачки остаются.
+    """
+
+    def __init__(self, serializer, columns, lookups=None, dry_run=False, batch_size=IMPORT_BATCH_SIZE):
+        self.child = serializer.child
+        self.model = self.child.Meta.model
+        self.columns = columns
+        self.lookups = lookups or {}
+        self.dry_run = dry_run
+        self.batch_size = batch_size
+        self.report = {'rows': 0, 'created': 0, 'updated': 0, 'error_count': 0, 'errors': [], 'dry_run': dry_run}
+
+    def error(self, line, errors):
+        self.report['error_count'] += 1
+        if len(self.report['errors']) < MAX_REPORTED_ERRORS:
+            self.report['errors'].append({'row': line, 'errors': errors})
+
+    def read_header(self, header):
+        header = [str(title).strip() if title is not None else '' for title in header]
+        missing = [title for title, field in self.columns.items() if field not in (None, 'id') and title not in header]
+        if missing:
+            raise ValidationError({'file': f'Нет колонок: {", ".join(missing)}'})
+        return [(index, self.columns[title]) for index, title in enumerate(header) if self.columns.get(title)]
+
+    def parse(self, line, values, fields):
+        data = {field: values[index] if index < len(values) else None for index, field in fields}
+        pk = data.pop('id', None)
+        related = {}
+        errors = {}
+        for field, names in self.lookups.items():
+            name = data.pop(field, None)
+            if name in (None, ''):
+                if not self.model._meta.get_field(field).null:
+                    errors[field] = 'Обязательное поле'
+                related[f'{field}_id'] = None
+            elif str(name) in names:
+                related[f'{field}_id'] = names[str(name)]
+            else:
+                errors[field] = f'Не найдено: {name}'
+        if pk not in (None, ''):
+            try:
+                pk = int(pk)
+            except (TypeError, ValueError):
+                errors['id'] = 'Некорректный ID'
+        else:
+            pk = None
+        try:
+            validated = self.child.run_validation(data)
+        except ValidationError as error:
+            errors.update(error.detail)
+        if errors:
+            self.error(line, errors)
+            return None
+        validated.update(related)
+        return pk, validated
+
+    def flush(self, batch):
+        existing = set(self.model.objects.filter(pk__in=[pk for pk, _ in batch if pk]).values_list('pk', flat=True))
+        updates = [self.model(pk=pk, **data) for pk, data in batch if pk in existing]
+        creates = [self.model(**data) for pk, data in batch if pk not in existing]
+        self.report['updated'] += len(updates)
+        self.report['created'] += len(creates)
+        if self.dry_run:
+            return
+        with transaction.atomic():
+            if updates:
+                self.model.objects.bulk_update(updates, touch_updated_at(updates, list(batch[0][1])), batch_size=self.batch_size)
+            if creates:
+                creates = self.model.objects.bulk_create(creates, batch_size=self.batch_size)
+            notify_bulk_change(self.model, created=creates, updated=updates)
+
+    def run(self, rows):
+        rows = iter(rows)
+        header = next(rows, None)
+        if header is None:
+            raise ValidationError({'file': 'Файл пуст'})
+        fields = self.read_header(header[1])
+        batch = []
+        for line, values in rows:
+            self.report['rows'] += 1
+            parsed = self.parse(line, values, fields)
+            if parsed is None:
+                continue
+            batch.append(parsed)
+            if len(batch) >= self.batch_size:
+                self.flush(batch)
+                batch = []
+        if batch:
+            self.flush(batch)
+        return self.report
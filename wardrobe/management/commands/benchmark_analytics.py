@@ -0,0 +1,127 @@
+import datetime
+import time
+from collections import defaultdict
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from wardrobe import analytics
+from wardrobe.models import Category, Customer, Order, Product, Store
+from wardrobe.orders import HOLDING_STATUSES
+
+BATCH_SIZE = 10000
+
+
+def naive_metrics(days, today):
+    """Те же метрики обычным циклом по заказам через ORM — для сравнения."""
+    since = today - datetime.timedelta(days=days)
+    products = {product.pk: product for product in Product.objects.all()}
+    recent_units, units, revenue = defaultdict(int), defaultdict(int), defaultdict(float)
+    for order in Order.objects.select_related('product'):
+        if order.status not in HOLDING_STATUSES:
+            continue
+        units[order.product_id] += order.quantity
+        revenue[order.product_id] += float(order.total_price)
+        if order.order_date > since:
+            recent_units[order.product_id] += order.quantity
+
+    inventory = {}
+    for pk, product in products.items():
+        sold = recent_units[pk]
+        inventory[pk] = (
+            sold / (sold + product.quantity) if sold + product.quantity else None,
+            product.quantity / (sold / days) if sold else None,
+        )
+
+    total = sum(revenue.values())
+    classes, before = {}, 0
+    for pk in sorted(products, key=lambda pk: -revenue[pk]):
+        share = revenue[pk] / total if total else 0
+        classes[pk] = 'A' if before < 0.8 and revenue[pk] > 0 else 'B' if before < 0.95 and revenue[pk] > 0 else 'C'
+        before += share
+
+    curve = defaultdict(lambda: defaultdict(int))
+    for pk, product in products.items():
+        curve[product.category_id][product.size] += units[pk]
+    return inventory, classes, curve
+
+
+class Command(BaseCommand):
+    help = 'Сравнение векторных метрик (NumPy) с циклом по ORM на синтетических данных'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=1_000_000, help='Количество заказов')
+        parser.add_argument('--products', type=int, default=5000, help='Количество товаров')
+        parser.add_argument('--days', type=int, default=30, help='Окно для sell-through и дней запаса')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def timed(self, label, func):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f'{label}: {elapsed:.2f} c')
+        return result, elapsed
+
+    def generate(self, orders, products, rng, today):
+        categories = Category.objects.bulk_create([Category(name=f'Категория {i}') for i in range(20)])
+        store = Store.objects.create(name='Бенчмарк', address='—')
+        customer = Customer.objects.create(first_name='Бенчмарк', store=store)
+        sizes = [size for size, _ in Product.SIZE_CHOICES]
+        prices = rng.integers(100, 10000, products) / 100
+        created = Product.objects.bulk_create([
+            Product(name=f'Товар {i}', category=categories[rng.integers(len(categories))], store=store,
+                    size=sizes[rng.integers(len(sizes))], price=round(float(prices[i]), 2), quantity=int(rng.integers(0, 50)))
+            for i in range(products)
+        ], batch_size=BATCH_SIZE)
+        product_ids = np.array([product.pk for product in created])
+        statuses = [status for status, _ in Order.STATUS_CHOICES]
+        for start in range(0, orders, BATCH_SIZE):
+            size = min(BATCH_SIZE, orders - start)
+            index = rng.integers(0, products, size)
+            quantity = rng.integers(1, 5, size)
+            age = rng.integers(0, 365, size)
+            status = rng.integers(0, len(statuses), size)
+            Order.objects.bulk_create([
+                Order(product_id=int(product_ids[index[i]]), customer=customer, quantity=int(quantity[i]),
+                      total_price=round(float(prices[index[i]]) * int(quantity[i]), 2), status=statuses[status[i]],
+                      order_date=today - datetime.timedelta(days=int(age[i])))
+                for i in range(size)
+            ], batch_size=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options['seed'])
+        today = timezone.localdate()
+        days = options['days']
+        # Всё выполняется в транзакции, которая откатывается: база не меняется
+        with transaction.atomic():
+            self.timed('Генерация данных', lambda: self.generate(options['orders'], options['products'], rng, today))
+            products = Product.objects.all()
+            vectorized, numpy_time = self.timed('NumPy', lambda: (
+                analytics.inventory_metrics(products, days),
+                analytics.abc_metrics(products),
+                analytics.size_curve_metrics(products),
+            ))
+            naive, naive_time = self.timed('Цикл по ORM', lambda: naive_metrics(days, today))
+            self.compare(vectorized, naive)
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS(f'Результаты совпадают, NumPy быстрее в {naive_time / numpy_time:.1f} раз'))
+
+    def compare(self, vectorized, naive):
+        inventory, abc, curve = vectorized
+        naive_inventory, naive_classes, naive_curve = naive
+
+        def close(a, b):
+            return (a is None and b is None) or (a is not None and b is not None and abs(a - b) < 0.06)
+
+        for row in inventory['results']:
+            sell_through, days_of_stock = naive_inventory[row['id']]
+            if not close(row['sell_through'], sell_through) or not close(row['days_of_stock'], days_of_stock):
+                raise CommandError(f'Расхождение в запасах товара {row["id"]}')
+        for row in abc['results']:
+            if row['class'] != naive_classes[row['id']]:
+                raise CommandError(f'Расхождение в ABC-классе товара {row["id"]}')
+        for row in curve:
+            for size in row['sizes']:
+                if size['units'] != naive_curve[row['category']][size['size']]:
+                    raise CommandError(f'Расхождение в размерной сетке категории {row["category"]}')
@@ -0,0 +1,143 @@
+import asyncio
+import multiprocessing
+import socket
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Модели импортируются внутри методов: процесс сервера (spawn) импортирует этот
+# модуль до django.setup()
+
+ENDPOINTS = [
+    '/api/products/',
+    '/api/orders/',
+    '/api/products/stats/',
+    '/api/orders/stats/',
+    '/api/userprofile/info/',
+]
+
+
+def serve(interface, port, threads):
+    """Сервер в отдельном процессе: один и тот же uvicorn, меняется только интерфейс."""
+    import uvicorn
+    if interface == 'wsgi':
+        from django.core.wsgi import get_wsgi_application
+        from uvicorn.middleware.wsgi import WSGIMiddleware
+        # Как gunicorn с --threads: запрос занимает поток из пула на всё время обработки
+        app = WSGIMiddleware(get_wsgi_application(), workers=threads)
+    else:
+        from app.asgi import application as app
+    uvicorn.run(app, host='127.0.0.1', port=port, log_level='warning', access_log=False)
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise CommandError(f'Сервер на порту {port} не запустился')
+
+
+async def fetch(reader, writer, request):
+    """Один запрос по keep-alive соединению: (статус, секунды)."""
+    started = time.perf_counter()
+    writer.write(request)
+    await writer.drain()
+    head = await reader.readuntil(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    length = 0
+    for line in head.split(b'\r\n')[1:]:
+        name, _, value = line.partition(b':')
+        if name.strip().lower() == b'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return status, time.perf_counter() - started
+
+
+async def load(port, path, cookie, requests, concurrency):
+    request = (f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nAccept: application/json\r\n'
+               f'Cookie: {cookie}\r\n\r\n').encode()
+    remaining = requests
+    latencies, errors = [], 0
+
+    async def client():
+        nonlocal remaining, errors
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        try:
+            while remaining > 0:
+                remaining -= 1
+                status, seconds = await fetch(reader, writer, request)
+                latencies.append(seconds)
+                errors += status != 200
+        finally:
+            writer.close()
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*[client() for _ in range(concurrency)], return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    errors += sum(isinstance(result, Exception) for result in results)
+    return len(latencies) / elapsed, np.array(latencies) * 1000, errors
+
+
+class Command(BaseCommand):
+    help = 'Нагрузочный тест эндпоинтов чтения: один сервер через WSGI (пул потоков) и через ASGI'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=3000, help='Запросов на эндпоинт')
+        parser.add_argument('--concurrency', type=int, default=200, help='Одновременных соединений')
+        parser.add_argument('--threads', type=int, default=10, help='Потоков WSGI-сервера')
+        parser.add_argument('--port', type=int, default=8790)
+        parser.add_argument('--username', help='Пользователь, от имени которого идут запросы (по умолчанию — первый)')
+        parser.add_argument('--endpoint', action='append', dest='endpoints', help='Адрес эндпоинта (можно несколько раз)')
+
+    def session_cookie(self, username):
+        from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+        from django.contrib.auth.models import User
+        from django.contrib.sessions.backends.db import SessionStore
+
+        users = User.objects.order_by('pk')
+        user = users.filter(username=username).first() if username else users.first()
+        if user is None:
+            raise CommandError('Нет пользователя для запросов: создайте его или заполните базу generate_data')
+        session = SessionStore()
+        session.update({SESSION_KEY: str(user.pk), BACKEND_SESSION_KEY: 'django.contrib.auth.backends.ModelBackend',
+                        HASH_SESSION_KEY: user.get_session_auth_hash()})
+        session.create()
+        return session
+
+    def handle(self, *args, **options):
+        session = self.session_cookie(options['username'])
+        cookie = f'{settings.SESSION_COOKIE_NAME}={session.session_key}'
+        endpoints = options['endpoints'] or ENDPOINTS
+        context = multiprocessing.get_context('spawn')
+        results = {}
+        try:
+            for interface in ('wsgi', 'asgi'):
+                server = context.Process(target=serve, args=(interface, options['port'], options['threads']), daemon=True)
+                server.start()
+                try:
+                    wait_for_port(options['port'])
+                    for path in endpoints:
+                        # Прогрев: соединения с базой, импорты, кэши
+                        asyncio.run(load(options['port'], path, cookie, 50, 10))
+                        results[interface, path] = asyncio.run(
+                            load(options['port'], path, cookie, options['requests'], options['concurrency']))
+                finally:
+                    server.terminate()
+                    server.join()
+        finally:
+            session.delete()
+
+        self.stdout.write(f"{options['requests']} запросов на эндпоинт, {options['concurrency']} соединений, "
+                          f"WSGI: {options['threads']} потоков")
+        self.stdout.write(f"{'Эндпоинт':<26}{'Сервер':<8}{'запр/с':>10}{'p50, мс':>10}{'p99, мс':>10}{'ошибок':>8}")
+        for path in endpoints:
+            for interface in ('wsgi', 'asgi'):
+                rps, latencies, errors = results[interface, path]
+                p50, p99 = np.percentile(latencies, [50, 99]) if len(latencies) else (float('nan'),) * 2
+                self.stdout.write(f'{path:<26}{interface.upper():<8}{rps:>10.0f}{p50:>10.1f}{p99:>10.1f}{errors:>8}')
@@ -0,0 +1,54 @@
+from django.core.files import File
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from wardrobe import media
+from wardrobe.changes import touch_updated_at
+from wardrobe.storage import blob_storage, is_blob
+from wardrobe.thumbnails import IMAGE_FIELDS, delete_thumbnails
+from wardrobe.versions import notify_bulk_change
+
+
+class Command(BaseCommand):
+    help = 'Сверка ссылок на фото и удаление файлов без ссылок (запускать по расписанию)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rehash', action='store_true',
+                            help='Перенести файлы, загруженные до хранилища по содержимому, в blobs/ (одинаковые станут одним файлом)')
+        parser.add_argument('--grace', type=int, default=media.GC_GRACE_SECONDS,
+                            help='Не удалять файлы, изменённые меньше стольких секунд назад')
+        parser.add_argument('--dry-run', action='store_true', help='Только показать, что будет удалено')
+
+    def handle(self, *args, **options):
+        if options['rehash']:
+            self.stdout.write(f'Перенесено файлов: {self.rehash()}')
+        self.stdout.write(f"Исправлено счётчиков ссылок: {media.reconcile()}")
+        if options['dry_run']:
+            unused = media.MediaBlob.objects.filter(refs__lte=0).values_list('name', flat=True)
+            for name in [*unused, *media.orphan_files(options['grace'])]:
+                self.stdout.write(name)
+            return
+        removed = media.collect(grace=options['grace'])
+        orphans = list(media.orphan_files(options['grace']))
+        for name in orphans:
+            blob_storage.delete(name)
+            delete_thumbnails(name)
+        self.stdout.write(self.style.SUCCESS(f'Удалено файлов: {removed + len(orphans)}'))
+
+    def rehash(self):
+        moved = 0
+        for name in media.count_references():
+            if is_blob(name) or not blob_storage.exists(name):
+                continue
+            with blob_storage.open(name) as source:
+                blob = blob_storage.save(name, File(source))
+            for model, field in IMAGE_FIELDS.items():
+                objs = list(model.objects.filter(**{field: name}))
+                for obj in objs:
+                    setattr(obj, field, blob)
+                with transaction.atomic():
+                    model.objects.bulk_update(objs, touch_updated_at(objs, [field]))
+                    notify_bulk_change(model, updated=objs)
+            # Ссылки на старое имя обнулит пересчёт, а файл удалит collect
+            media.MediaBlob.objects.get_or_create(name=name)
+            moved += 1
+        return moved
@@ -1,70 +1,199 @@
+import datetime
+import itertools
+import random
+import time
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
 from faker import Faker
-from django.contrib.auth.models import User
-from wardrobe.models import Brand, Category, Item, Store, Purchase
-import random
+from wardrobe import rollups, search, stats
+from wardrobe.autocomplete import INDEXES
+from wardrobe.models import Category, ChangeLog, Customer, Order, Product, Store, UserProfile
+from wardrobe.versions import RESOURCES, flush_version
+
+CATEGORIES = [
+    'Куртки', 'Пальто', 'Пуховики', 'Плащи', 'Пиджаки', 'Костюмы', 'Рубашки', 'Футболки', 'Поло', 'Свитеры',
+    'Худи', 'Кардиганы', 'Платья', 'Юбки', 'Брюки', 'Джинсы', 'Шорты', 'Комбинезоны', 'Блузки', 'Топы',
+    'Бельё', 'Носки', 'Пижамы', 'Купальники', 'Спортивная одежда', 'Кроссовки', 'Ботинки', 'Туфли', 'Сандалии', 'Сапоги',
+    'Шапки', 'Шарфы', 'Перчатки', 'Ремни', 'Сумки', 'Рюкзаки', 'Очки', 'Часы', 'Украшения', 'Галстуки',
+]
+ADJECTIVES = ['Базовый', 'Классический', 'Оверсайз', 'Приталенный', 'Утеплённый', 'Лёгкий', 'Льняной', 'Шерстяной',
+              'Хлопковый', 'Кожаный', 'Спортивный', 'Вечерний', 'Повседневный', 'Летний', 'Зимний', 'Винтажный']
+COLORS = ['чёрный', 'белый', 'серый', 'синий', 'голубой', 'красный', 'бордовый', 'зелёный', 'хаки', 'бежевый',
+          'коричневый', 'жёлтый', 'розовый', 'фиолетовый', 'оранжевый', 'молочный']
+SIZES = [size for size, _ in Product.SIZE_CHOICES]
+# Доля продаж по месяцам: пик в ноябре–декабре (распродажи и праздники), провал летом
+SEASONALITY = {1: 0.8, 2: 0.75, 3: 0.9, 4: 0.95, 5: 0.9, 6: 0.75, 7: 0.7, 8: 0.85, 9: 1.0, 10: 1.05, 11: 1.4, 12: 1.6}
+WEEKDAYS = [0.9, 0.9, 0.95, 1.0, 1.15, 1.3, 1.1]
+STATUSES = [('sold', 0.72), ('returned', 0.07), ('cancelled', 0.11), ('pending', 0.10)]
+# Заказы старше стольких дней уже не ждут: ожидающие становятся проданными
+PENDING_DAYS = 14
+PASSWORD = 'password123'
+
+
+def zipf_weights(count, exponent, rng):
+    """Накопленные веса со степенным распределением по случайному порядку: немного «хитов» и длинный хвост."""
+    weights = [1 / (rank ** exponent) for rank in range(1, count + 1)]
+    rng.shuffle(weights)
+    return list(itertools.accumulate(weights))
+
+
+def day_weights(days, today):
+    dates = [today - datetime.timedelta(days=offset) for offset in range(days)]
+    # Бизнес растёт: свежие дни немного нагруженнее старых
+    weights = [SEASONALITY[day.month] * WEEKDAYS[day.weekday()] * (1 + (days - offset) / days)
+               for offset, day in enumerate(dates)]
+    return dates, list(itertools.accumulate(weights))
+
 
 class Command(BaseCommand):
-    help = 'Генерация случайных данных для моделей'
+    help = 'Генерация большого объёма реалистичных данных для нагрузочного тестирования'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--categories', type=int, default=len(CATEGORIES))
+        parser.add_argument('--stores', type=int, default=50)
+        parser.add_argument('--products', type=int, default=10000)
+        parser.add_argument('--customers', type=int, default=5000)
+        parser.add_argument('--orders', type=int, default=100000)
+        parser.add_argument('--days', type=int, default=730, help='За сколько последних дней генерировать заказы')
+        parser.add_argument('--seed', type=int, default=42, help='Одинаковый seed на одинаковой базе даёт одинаковые данные')
+        parser.add_argument('--batch-size', type=int, default=5000)
 
     def handle(self, *args, **options):
-        fake = Faker(['ru_RU'])
-
-        # Создаем пользователей
-        users = [User.objects.create_user(username=fake.user_name(), password='password123') for _ in range(10)]
-
-        # Генерация Brands
-        for _ in range(1000):
-            user = random.choice(users)
-            Brand.objects.create(
-                name=fake.company(),
-                description=fake.text(),
-                user=user
-            )
-
-        # Генерация Categories
-        for _ in range(1000):
-            user = random.choice(users)
-            Category.objects.create(
-                name=fake.word(),
-                user=user
-            )
-
-        # Генерация Items
-        for _ in range(1000):
-            user = random.choice(users)
-            brand = random.choice(Brand.objects.all())
-            category = random.choice(Category.objects.all())
-            Item.objects.create(
-                name=fake.word(),
-                color=fake.color_name(),
-                brand=brand,
-                category=category,
-                user=user
-            )
-
-        # Генерация Stores
-        for _ in range(1000):
-            user = random.choice(users)
-            Store.objects.create(
-                name=fake.company(),
-                address=fake.address(),
-                user=user
-            )
-
-        # Генерация Purchases
-        for _ in range(1000):
-            user = random.choice(users)
-            item = random.choice(Item.objects.all())
-            store = random.choice(Store.objects.all())
-            amount = random.randint(1, 10)
-            date = fake.date_this_decade()
-            Purchase.objects.create(
-                item=item,
-                store=store,
-                amount=amount,
-                date=date,
-                user=user
-            )
-
-        self.stdout.write(self.style.SUCCESS('Данные успешно сгенерированы!'))
+        self.rng = random.Random(options['seed'])
+        self.fake = Faker(['ru_RU'])
+        self.fake.seed_instance(options['seed'])
+        self.batch_size = options['batch_size']
+        self.started = time.monotonic()
+
+        users = self.create_users(options['users'])
+        categories = self.create_categories(options['categories'], users)
+        stores = self.create_stores(options['stores'], users)
+        products = self.create_products(options['products'], categories, stores, users)
+        customers = self.create_customers(options['customers'], stores, users)
+        self.create_orders(options['orders'], options['days'], products, customers, users)
+        self.rebuild_derived()
+        self.stdout.write(self.style.SUCCESS(f'Данные успешно сгенерированы за {time.monotonic() - self.started:.1f} с'))
+
+    def log(self, message):
+        self.stdout.write(f'[{time.monotonic() - self.started:7.1f} с] {message}')
+
+    def insert(self, model, objs):
+        """
+        bulk_create пачками из итератора (в памяти не больше пачки объектов);
+        возвращает id созданных объектов. Журнал изменений пишется сразу, как при обычном создании.
+        """
+        ids = []
+        objs = iter(objs)
+        while batch := list(itertools.islice(objs, self.batch_size)):
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+                ChangeLog.objects.bulk_create([ChangeLog(resource=RESOURCES[model], object_id=obj.pk) for obj in batch])
+            ids += [obj.pk for obj in batch]
+        self.log(f'{model._meta.verbose_name_plural}: {len(ids)}')
+        return ids
+
+    def create_users(self, count):
+        # Хэш пароля считается один раз: PBKDF2 на каждого пользователя занял бы минуты
+        password = make_password(PASSWORD)
+        start = User.objects.count()
+        users = (User(username=f'{self.fake.user_name()}{start + i}', password=password, email=self.fake.email(),
+                      first_name=self.fake.first_name(), last_name=self.fake.last_name(), is_superuser=i == 0,
+                      is_staff=i == 0)
+                 for i in range(count))
+        ids = self.insert(User, users)
+        # Профиль обычно создаёт сигнал post_save, которого у bulk_create нет
+        UserProfile.objects.bulk_create([UserProfile(user_id=pk, age=self.rng.randint(18, 70)) for pk in ids],
+                                        batch_size=self.batch_size)
+        return ids
+
+    def create_categories(self, count, users):
+        names = [CATEGORIES[i] if i < len(CATEGORIES) else f'{CATEGORIES[i % len(CATEGORIES)]} {i // len(CATEGORIES) + 1}'
+                 for i in range(count)]
+        return self.insert(Category, (Category(name=name, user_id=self.rng.choice(users)) for name in names))
+
+    def create_stores(self, count, users):
+        return self.insert(Store, (
+            Store(name=f'{self.fake.company()} ({self.fake.city_name()})', address=self.fake.address(), user_id=self.rng.choice(users))
+            for _ in range(count)
+        ))
+
+    def create_products(self, count, categories, stores, users):
+        rng = self.rng
+        prices = []
+
+        def products():
+            for _ in range(count):
+                category = rng.randrange(len(categories))
+                # Цены лог-нормальные: много недорогих вещей и редкие дорогие
+                prices.append(Decimal(min(round(rng.lognormvariate(7.8, 0.7), -1), 99990)).quantize(Decimal('0.01')))
+                yield Product(
+                    name=f'{rng.choice(ADJECTIVES)} {CATEGORIES[category % len(CATEGORIES)].lower()} {rng.choice(COLORS)}',
+                    category_id=categories[category], store_id=rng.choice(stores), size=rng.choice(SIZES),
+                    price=prices[-1], color=rng.choice(COLORS), description=self.fake.sentence(nb_words=12),
+                    quantity=0 if rng.random() < 0.1 else rng.randint(1, 200),
+                )
+
+        ids = self.insert(Product, products())
+        self.prices = dict(zip(ids, prices))
+        return ids
+
+    def create_customers(self, count, stores, users):
+        fake, rng = self.fake, self.rng
+        return self.insert(Customer, (
+            Customer(first_name=fake.first_name(), last_name=fake.last_name(), phone=fake.phone_number(),
+                     email=fake.email(), store_id=rng.choice(stores), user_id=rng.choice(users) if rng.random() < 0.3 else None)
+            for _ in range(count)
+        ))
+
+    def create_orders(self, count, days, products, customers, users):
+        if not count or not products or not customers:
+            return
+        rng = self.rng
+        today = timezone.localdate()
+        dates, date_weights = day_weights(days, today)
+        # Популярность товаров и покупателей сильно неравномерна
+        product_weights = zipf_weights(len(products), 1.1, rng)
+        customer_weights = zipf_weights(len(customers), 0.8, rng)
+        statuses, status_weights = zip(*STATUSES)
+        created = 0
+        for start in range(0, count, self.batch_size):
+            size = min(self.batch_size, count - start)
+            batch_products = rng.choices(products, cum_weights=product_weights, k=size)
+            batch_customers = rng.choices(customers, cum_weights=customer_weights, k=size)
+            batch_dates = rng.choices(dates, cum_weights=date_weights, k=size)
+            batch_statuses = rng.choices(statuses, weights=status_weights, k=size)
+            orders = []
+            for product, customer, order_date, status in zip(batch_products, batch_customers, batch_dates, batch_statuses):
+                if status == 'pending' and (today - order_date).days > PENDING_DAYS:
+                    status = 'sold'
+                quantity = 1 if rng.random() < 0.8 else rng.randint(2, 5)
+                delivered = status in ('sold', 'returned')
+                orders.append(Order(
+                    product_id=product, customer_id=customer, order_date=order_date, status=status, quantity=quantity,
+                    total_price=self.prices[product] * quantity, user_id=rng.choice(users) if users else None,
+                    delivery_date=order_date + datetime.timedelta(days=rng.randint(1, 7)) if delivered else None,
+                ))
+            with transaction.atomic():
+                Order.objects.bulk_create(orders)
+                ChangeLog.objects.bulk_create([ChangeLog(resource='order', object_id=order.pk) for order in orders])
+            created += size
+            if created % (self.batch_size * 20) == 0 or created == count:
+                self.log(f'Заказы: {created} из {count}')
+
+    def rebuild_derived(self):
+        # bulk_create не отправляет сигналов: производные данные пересчитываются один раз в конце
+        with transaction.atomic():
+            search.rebuild_index()
+        self.log('Поисковый индекс перестроен')
+        rollups.rebuild_all()
+        self.log('Продажи по дням пересчитаны')
+        stats.reconcile()
+        self.log('Статистика пересчитана')
+        for resource in {*RESOURCES.values(), *(index.version_name for index in INDEXES.values())}:
+            flush_version(resource)
@@ -0,0 +1,44 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from wardrobe.thumbnails import IMAGE_FIELDS, flush_thumbnail_versions, is_ready, make_thumbnails, mark_ready
+
+MARK_BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = 'Построение уменьшенных копий для уже загруженных фото товаров и покупателей'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Перестроить и готовые копии')
+        parser.add_argument('--workers', type=int, default=4, help='Потоков обработки')
+
+    def handle(self, *args, **options):
+        names = set()
+        for model, field in IMAGE_FIELDS.items():
+            names.update(model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+                         .values_list(field, flat=True).distinct().iterator())
+        ready = set() if options['force'] else {name for name in names if is_ready(name)}
+        names -= ready
+
+        def build(name):
+            try:
+                make_thumbnails(name)
+            except Exception as error:
+                return name, error
+            return name, None
+
+        done = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            for name, error in executor.map(build, sorted(names)):
+                if error is None:
+                    done += 1
+                    ready.add(name)
+                else:
+                    self.stderr.write(f'{name}: {error}')
+        # Флаги ставятся и для копий, готовых ещё до появления thumbnails_ready
+        ready = sorted(ready)
+        marked = sum(mark_ready(ready[start:start + MARK_BATCH_SIZE]) for start in range(0, len(ready), MARK_BATCH_SIZE))
+        if done or marked:
+            flush_thumbnail_versions()
+        self.stdout.write(self.style.SUCCESS(f'Готово копий: {done} из {len(names)}'))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from wardrobe.rollups import rebuild_all
+
+
+class Command(BaseCommand):
+    help = 'Полный пересчёт продаж по дням (SalesRollup) из заказов'
+
+    def handle(self, *args, **options):
+        rebuild_all()
+        self.stdout.write(self.style.SUCCESS('Продажи по дням пересчитаны!'))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from wardrobe.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Перестроение полнотекстового индекса товаров'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'Проиндексировано товаров: {count}'))
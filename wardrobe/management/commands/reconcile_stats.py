@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from wardrobe.stats import FAMILIES, reconcile
+
+
+class Command(BaseCommand):
+    help = 'Полный пересчёт счётчиков статистики (запускать по расписанию)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('families', nargs='*', choices=list(FAMILIES), help='Какие счётчики пересчитать; по умолчанию все')
+
+    def handle(self, *args, **options):
+        reconcile(*options['families'])
+        self.stdout.write(self.style.SUCCESS('Статистика пересчитана!'))
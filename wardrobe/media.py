@@ -0,0 +1,141 @@
+"""
+Учёт ссылок на файлы фотографий (MediaBlob) и удаление файлов без ссылок.
+
+Сохранение товара или покупателя с новым фото добавляет ссылку на новый файл
+и снимает ссылку со старого, удаление — снимает ссылку. Файлы, на которые
+больше никто не ссылается, удаляются вместе с уменьшенными копиями после
+коммита. Файл, изменённый последние GC_GRACE_SECONDS, не трогаем: это
+может быть повторная загрузка того же содержимого, ссылка на которую ещё не
+сохранена. Такие файлы и ссылки после массовых изменений доводит до порядка
+команда collect_media.
+"""
+import os
+import time
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from wardrobe.models import MediaBlob
+from wardrobe.storage import BLOB_DIR, blob_storage
+from wardrobe.thumbnails import IMAGE_FIELDS, delete_thumbnails, previous_image
+from wardrobe.versions import bulk_changed, find_pending
+
+GC_GRACE_SECONDS = 3600
+
+
+def add_reference(name, count=1):
+    if name:
+        MediaBlob.objects.get_or_create(name=name)
+        MediaBlob.objects.filter(name=name).update(refs=F('refs') + count)
+
+
+class PendingCollect:
+    done = False
+
+    def __init__(self):
+        self.names = set()
+
+    def __call__(self):
+        self.done = True
+        collect(self.names)
+
+
+def release(name):
+    if not name:
+        return
+    MediaBlob.objects.filter(name=name).update(refs=F('refs') - 1)
+    pending = find_pending(lambda callback: isinstance(callback, PendingCollect))
+    if pending is not None:
+        pending.names.add(name)
+    else:
+        pending = PendingCollect()
+        pending.names.add(name)
+        transaction.on_commit(pending)
+
+
+def recently_modified(name, grace):
+    try:
+        return time.time() - os.path.getmtime(blob_storage.path(name)) < grace
+    except FileNotFoundError:
+        return False
+
+
+def collect(names=None, grace=None):
+    """Удаляет файлы без ссылок (все или только из names); возвращает их число."""
+    grace = GC_GRACE_SECONDS if grace is None else grace
+    unused = MediaBlob.objects.filter(refs__lte=0)
+    if names is not None:
+        unused = unused.filter(name__in=names)
+    removed = 0
+    for name in list(unused.values_list('name', flat=True)):
+        if recently_modified(name, grace):
+            continue
+        # Файл удаляется внутри транзакции: параллельное сохранение ссылки
+        # на него либо дождётся её, либо будет раньше и сохранит строку
+        with transaction.atomic():
+            if MediaBlob.objects.filter(name=name, refs__lte=0).delete()[0]:
+                blob_storage.delete(name)
+                delete_thumbnails(name)
+                removed += 1
+    return removed
+
+
+def count_references():
+    refs = Counter()
+    for model, field in IMAGE_FIELDS.items():
+        refs.update(name for name in model.objects.exclude(**{field: ''}).values_list(field, flat=True).iterator() if name)
+    return refs
+
+
+def reconcile():
+    """Пересчитывает ссылки по таблицам; возвращает число исправленных строк."""
+    refs = count_references()
+    fixed = 0
+    with transaction.atomic():
+        stored = dict(MediaBlob.objects.values_list('name', 'refs'))
+        for name, count in refs.items():
+            if stored.get(name) != count:
+                MediaBlob.objects.update_or_create(name=name, defaults={'refs': count})
+                fixed += 1
+        fixed += MediaBlob.objects.filter(refs__gt=0).exclude(name__in=list(refs)).update(refs=0)
+    return fixed
+
+
+def orphan_files(grace=None):
+    """Файлы хранилища, для которых нет строки MediaBlob (например, после отката транзакции)."""
+    grace = GC_GRACE_SECONDS if grace is None else grace
+    known = set(MediaBlob.objects.values_list('name', flat=True))
+    root = blob_storage.path(BLOB_DIR)
+    for directory, _, files in os.walk(root):
+        for file in files:
+            name = os.path.relpath(os.path.join(directory, file), blob_storage.location).replace(os.sep, '/')
+            if name not in known and not recently_modified(name, grace):
+                yield name
+
+
+@receiver(post_save)
+def image_saved(sender, instance, created, update_fields=None, **kwargs):
+    field = IMAGE_FIELDS.get(sender)
+    if not field or not (update_fields is None or field in update_fields):
+        return
+    name, old = getattr(instance, field).name or '', previous_image(instance, field)
+    if name != old:
+        add_reference(name)
+        release(old)
+
+
+@receiver(post_delete)
+def image_deleted(sender, instance, **kwargs):
+    if sender in IMAGE_FIELDS:
+        release(getattr(instance, IMAGE_FIELDS[sender]).name)
+
+
+@receiver(bulk_changed)
+def images_bulk_created(sender, created=(), **kwargs):
+    # Прежние имена при массовом изменении неизвестны: их сверяет collect_media
+    if sender in IMAGE_FIELDS:
+        for name, count in Counter(getattr(obj, IMAGE_FIELDS[sender]).name for obj in created).items():
+            add_reference(name, count)
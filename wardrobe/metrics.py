@@ -0,0 +1,192 @@
+"""
+Метрики запросов в памяти процесса и их выдача в текстовом формате Prometheus (/metrics).
+
+RequestMetricsMiddleware (wardrobe.middleware) собирает для каждого запроса
+RequestStats: число SQL-запросов и время в базе, время сериализации
+(to_representation сериализаторов ресурсов без SQL, который в ней
+выполнился), время отрисовки ответа (JSON-рендерер DRF, шаблон) и размер
+ответа, и записывает их в гистограммы с меткой представления. Остаток
+времени — прочий Python-код: фильтры, выгрузки Excel, аналитика.
+
+SQL считает обёртка execute_wrapper, которую получает каждое новое
+соединение с базой (сигнал connection_created): так учитываются и запросы
+async ORM из потоков sync_to_async, и запросы при отдаче потокового экспорта.
+Запрос, к которому относится SQL, берётся из contextvar.
+
+Метрики свои у каждого процесса: при нескольких воркерах gunicorn Prometheus
+собирает их с каждого воркера отдельно или суммирует по меткам.
+"""
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = tuple(256 * 4 ** power for power in range(10))  # 256 Б … 64 МБ
+
+current = ContextVar('request_stats', default=None)
+registry = []
+
+
+def escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def format_labels(names, values, extra=''):
+    pairs = [f'{name}="{escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{%s}' % ','.join(pairs) if pairs else ''
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.series = {}
+        self.lock = threading.Lock()
+        registry.append(self)
+
+    def clear(self):
+        with self.lock:
+            self.series.clear()
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type}']
+        with self.lock:
+            series = sorted((labels, value[:] if isinstance(value, list) else value) for labels, value in self.series.items())
+        for labels, value in series:
+            lines.extend(self.render_series(labels, value))
+        return lines
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, *labels, amount=1):
+        with self.lock:
+            self.series[labels] = self.series.get(labels, 0) + amount
+
+    def render_series(self, labels, value):
+        yield f'{self.name}{format_labels(self.labels, labels)} {format_value(value)}'
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=TIME_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        # Счётчики по корзинам хранятся без накопления: [корзина…, +Inf, сумма]
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [0] * (len(self.buckets) + 1) + [0]
+            series[index] += 1
+            series[-1] += value
+
+    def render_series(self, labels, value):
+        total = 0
+        for bound, count in zip((*self.buckets, '+Inf'), value[:-1]):
+            total += count
+            bucket = 'le="%s"' % bound
+            yield f'{self.name}_bucket{format_labels(self.labels, labels, bucket)} {total}'
+        yield f'{self.name}_sum{format_labels(self.labels, labels)} {format_value(value[-1])}'
+        yield f'{self.name}_count{format_labels(self.labels, labels)} {total}'
+
+
+REQUESTS = Counter('wardrobe_http_requests_total', 'Запросы по представлению, методу и коду ответа.', ('view', 'method', 'status'))
+DURATION = Histogram('wardrobe_http_request_duration_seconds', 'Время обработки запроса вместе с отдачей потокового ответа.',
+                     ('view', 'method'))
+SQL_TIME = Histogram('wardrobe_http_request_sql_seconds', 'Суммарное время SQL-запросов за запрос.', ('view',))
+QUERIES = Histogram('wardrobe_http_request_queries', 'Число SQL-запросов за запрос.', ('view',), QUERY_BUCKETS)
+SERIALIZE_TIME = Histogram('wardrobe_http_response_serialize_seconds', 'Время сериализации данных ответа без SQL.', ('view',))
+RENDER_TIME = Histogram('wardrobe_http_response_render_seconds', 'Время отрисовки ответа (рендерер DRF, шаблон).', ('view',))
+RESPONSE_SIZE = Histogram('wardrobe_http_response_size_bytes', 'Размер тела ответа.', ('view',), SIZE_BUCKETS)
+PROFILES = Counter('wardrobe_profiles_saved_total', 'Сохранённые профили медленных запросов.', ('view',))
+
+
+def render():
+    return '\n'.join(line for metric in registry for line in metric.render()) + '\n'
+
+
+def view_label(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.view_name or match.route
+
+
+class RequestStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_time = 0.0
+        self.serialize_time = 0.0
+        self.render_time = 0.0
+        self.render_started = None
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def rendered(self, response):
+        if self.render_started is not None:
+            self.render_time += time.perf_counter() - self.render_started
+            self.render_started = None
+
+    def record(self, request, response, size=None):
+        view = view_label(request)
+        REQUESTS.inc(view, request.method, response.status_code)
+        DURATION.observe(self.elapsed(), view, request.method)
+        SQL_TIME.observe(self.sql_time, view)
+        QUERIES.observe(self.queries, view)
+        SERIALIZE_TIME.observe(self.serialize_time, view)
+        RENDER_TIME.observe(self.render_time, view)
+        if size is not None:
+            RESPONSE_SIZE.observe(size, view)
+
+
+def timed_serialization(function, *args):
+    """Вызов function с учётом его времени как сериализации; SQL внутри вызова остаётся в sql_time."""
+    stats = current.get()
+    if stats is None:
+        return function(*args)
+    started, sql_time = time.perf_counter(), stats.sql_time
+    try:
+        return function(*args)
+    finally:
+        stats.serialize_time += time.perf_counter() - started - (stats.sql_time - sql_time)
+
+
+def sql_timer(execute, sql, params, many, context):
+    stats = current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.sql_time += time.perf_counter() - started
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    # В начало списка: connection.execute_wrapper() снимает последнюю обёртку при выходе
+    if sql_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, sql_timer)
@@ -0,0 +1,82 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from wardrobe import profiling
+from wardrobe.metrics import RequestStats, current
+
+
+class RequestMetricsMiddleware:
+    """
+    Время, SQL-запросы, время сериализации и отрисовки и размер ответа каждого запроса
+    в метриках wardrobe.metrics (/metrics) и выборочные профили медленных
+    запросов (wardrobe.profiling). Стоит первым в MIDDLEWARE, чтобы учитывать
+    и работу остальных middleware (сессии, аутентификация).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = current.set(stats)
+        recorder = profiling.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            current.reset(token)
+            if recorder is not None:
+                profiling.finish(recorder, request, stats.elapsed())
+        return self.finish(request, response, stats)
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = current.set(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current.reset(token)
+        return self.finish(request, response, stats)
+
+    def process_template_response(self, request, response):
+        # Ответы DRF и TemplateResponse отрисовываются после этого вызова
+        stats = current.get()
+        if stats is not None:
+            stats.render_started = time.perf_counter()
+            response.add_post_render_callback(stats.rendered)
+        return response
+
+    def finish(self, request, response, stats):
+        if not response.streaming:
+            stats.record(request, response, len(response.content))
+        elif response.is_async or getattr(response, 'file_to_stream', None) is not None or response.has_header('Content-Length'):
+            # Файлы сервер отдаёт сам (sendfile), а поток событий не заканчивается:
+            # время — до заголовков, размер — из Content-Length, если он есть
+            size = response.get('Content-Length')
+            stats.record(request, response, int(size) if size else None)
+        else:
+            response.streaming_content = self.measure_stream(request, response, response.streaming_content, stats)
+        return response
+
+    def measure_stream(self, request, response, content, stats):
+        """Тело потокового ответа (экспорт CSV) со счётом байт; метрики пишутся, когда оно отдано."""
+        token = current.set(stats)
+        size = 0
+        try:
+            for chunk in content:
+                size += len(chunk)
+                yield chunk
+        finally:
+            try:
+                current.reset(token)
+            except ValueError:
+                # Генератор закрыт из другого контекста (сборщиком мусора)
+                pass
+            stats.record(request, response, size)
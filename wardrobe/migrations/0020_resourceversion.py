@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wardrobe', '0019_product_order_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResourceVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True, verbose_name='Ресурс')),
+                ('version', models.PositiveBigIntegerField(default=0, verbose_name='Версия')),
+                ('updated_at', models.DateTimeField(blank=True, null=True, verbose_name='Изменён')),
+            ],
+            options={
+                'verbose_name': 'Версия ресурса',
+                'verbose_name_plural': 'Версии ресурсов',
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wardrobe', '0020_resourceversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, verbose_name='Показатель')),
+                ('key', models.CharField(blank=True, default='', max_length=255, verbose_name='Группа')),
+                ('value', models.DecimalField(decimal_places=2, default=0, max_digits=20, verbose_name='Значение')),
+            ],
+            options={
+                'verbose_name': 'Счётчик статистики',
+                'verbose_name_plural': 'Счётчики статистики',
+                'indexes': [models.Index(fields=['name', 'value'], name='statcounter_top_idx')],
+                'constraints': [models.UniqueConstraint(fields=('name', 'key'), name='statcounter_name_key_uniq')],
+            },
+        ),
+    ]
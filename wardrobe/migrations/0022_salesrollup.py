@@ -0,0 +1,45 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_rollups(apps, schema_editor):
+    Order = apps.get_model('wardrobe', 'Order')
+    SalesRollup = apps.get_model('wardrobe', 'SalesRollup')
+    rows = Order.objects.values('order_date', 'product__store_id', 'product__category_id', 'status').annotate(
+        orders=Count('pk'), units=Sum('quantity'), revenue=Sum('total_price')).order_by()
+    SalesRollup.objects.bulk_create([
+        SalesRollup(day=row['order_date'], store_id=row['product__store_id'], category_id=row['product__category_id'],
+                    status=row['status'], orders=row['orders'], units=row['units'], revenue=row['revenue'])
+        for row in rows.iterator()
+    ], batch_size=1000)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wardrobe', '0021_statcounter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='День')),
+                ('status', models.CharField(choices=[('pending', 'Ожидает'), ('sold', 'Продано'), ('returned', 'Возвращено'), ('cancelled', 'Отменено')], max_length=20, verbose_name='Статус')),
+                ('orders', models.PositiveIntegerField(default=0, verbose_name='Заказов')),
+                ('units', models.PositiveBigIntegerField(default=0, verbose_name='Единиц товара')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Выручка')),
+                ('category', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, to='wardrobe.category', verbose_name='Категория')),
+                ('store', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, to='wardrobe.store', verbose_name='Магазин')),
+            ],
+            options={
+                'verbose_name': 'Продажи за день',
+                'verbose_name_plural': 'Продажи по дням',
+                'constraints': [models.UniqueConstraint(fields=('day', 'store', 'category', 'status'), name='salesrollup_day_uniq')],
+            },
+        ),
+        migrations.RunPython(fill_rollups, migrations.RunPython.noop),
+    ]
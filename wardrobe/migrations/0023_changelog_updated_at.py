@@ -0,0 +1,70 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:18
+
+from django.db import migrations, models
+
+CHANGE_RESOURCES = [
+    ('wardrobe', 'Category', 'category'),
+    ('wardrobe', 'Store', 'store'),
+    ('wardrobe', 'Product', 'product'),
+    ('wardrobe', 'Customer', 'customer'),
+    ('wardrobe', 'Order', 'order'),
+    ('auth', 'User', 'user'),
+]
+
+
+def fill_changelog(apps, schema_editor):
+    ChangeLog = apps.get_model('wardrobe', 'ChangeLog')
+    for app_label, model_name, resource in CHANGE_RESOURCES:
+        pks = apps.get_model(app_label, model_name).objects.order_by('pk').values_list('pk', flat=True)
+        ChangeLog.objects.bulk_create((ChangeLog(resource=resource, object_id=pk) for pk in pks.iterator()), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('wardrobe', '0022_salesrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Изменено'),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Изменено'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Изменено'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Изменено'),
+        ),
+        migrations.AddField(
+            model_name='store',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Изменено'),
+        ),
+        migrations.CreateModel(
+            name='ChangeLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resource', models.CharField(max_length=50, verbose_name='Ресурс')),
+                ('object_id', models.BigIntegerField(verbose_name='ID объекта')),
+                ('deleted', models.BooleanField(default=False, verbose_name='Удалён')),
+            ],
+            options={
+                'verbose_name': 'Изменение',
+                'verbose_name_plural': 'Журнал изменений',
+                'indexes': [models.Index(fields=['resource', 'id'], name='changelog_resource_seq_idx'), models.Index(fields=['resource', 'object_id'], name='changelog_object_idx')],
+            },
+        ),
+        migrations.RunPython(fill_changelog, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+from django.db import migrations
+
+CREATE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS wardrobe_productsearch USING fts5("
+    "name, description, color, category, store, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+# ё индексируется как е, как и в wardrobe.search
+YO = "REPLACE(REPLACE({}, 'ё', 'е'), 'Ё', 'Е')"
+FILL_SQL = (
+    "INSERT INTO wardrobe_productsearch (rowid, name, description, color, category, store) "
+    f"SELECT p.id, {', '.join(YO.format(column) for column in ['p.name', 'p.description', 'p.color', 'c.name', 's.name'])} "
+    "FROM wardrobe_product p "
+    "LEFT JOIN wardrobe_category c ON c.id = p.category_id "
+    "LEFT JOIN wardrobe_store s ON s.id = p.store_id"
+)
+
+
+def create_index(apps, schema_editor):
+    # Виртуальная таблица FTS5 есть только в SQLite; на других СУБД поиск работает без индекса
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_SQL)
+    schema_editor.execute(FILL_SQL)
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS wardrobe_productsearch')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wardrobe', '0023_changelog_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
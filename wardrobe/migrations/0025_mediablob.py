@@ -0,0 +1,50 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:54
+
+import wardrobe.storage
+from collections import Counter
+
+from django.db import migrations, models
+
+
+def count_references(apps, schema_editor):
+    # Уже загруженные файлы учитываются под старыми именами; перенести их
+    # в хранилище по содержимому можно командой collect_media --rehash
+    MediaBlob = apps.get_model('wardrobe', 'MediaBlob')
+    refs = Counter()
+    for model, field in (('Product', 'image'), ('Customer', 'photo')):
+        values = apps.get_model('wardrobe', model).objects.exclude(**{field: ''}).values_list(field, flat=True)
+        refs.update(name for name in values if name)
+    MediaBlob.objects.bulk_create([MediaBlob(name=name, refs=count) for name, count in refs.items()])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wardrobe', '0024_productsearch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Имя файла')),
+                ('refs', models.IntegerField(default=0, verbose_name='Ссылок')),
+            ],
+            options={
+                'verbose_name': 'Файл',
+                'verbose_name_plural': 'Файлы',
+            },
+        ),
+        migrations.AlterField(
+            model_name='customer',
+            name='photo',
+            field=models.ImageField(blank=True, null=True, storage=wardrobe.storage.ContentAddressedStorage(), upload_to='customers', verbose_name='Фото'),
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=wardrobe.storage.ContentAddressedStorage(), upload_to='products', verbose_name='Фото товара'),
+        ),
+        migrations.RunPython(count_references, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:58
+
+from django.db import migrations, models
+
+from wardrobe.thumbnails import is_ready
+
+
+def mark_ready(apps, schema_editor):
+    # Копии, построенные до появления флага, проверяются в хранилище один раз
+    for model, field in (('Product', 'image'), ('Customer', 'photo')):
+        objects = apps.get_model('wardrobe', model).objects
+        names = set(objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True}).values_list(field, flat=True))
+        ready = [name for name in names if is_ready(name)]
+        for start in range(0, len(ready), 500):
+            objects.filter(**{f'{field}__in': ready[start:start + 500]}).update(thumbnails_ready=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wardrobe', '0025_mediablob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='thumbnails_ready',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Копии фото готовы'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='thumbnails_ready',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Копии фото готовы'),
+        ),
+        migrations.RunPython(mark_ready, migrations.RunPython.noop),
+    ]
@@ -4,10 +4,13 @@ from django.dispatch import receiver
 from django.db.models.signals import post_save
 import pyotp
 
+from wardrobe.storage import blob_storage
+
 
 class Category(models.Model):
     name = models.TextField("Категория")
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, verbose_name="Пользователь")
+    updated_at = models.DateTimeField("Изменено", auto_now=True)
     
     class Meta:
         verbose_name = "Категория"
@@ -21,6 +24,7 @@ class Store(models.Model):
     name = models.TextField("Название магазина")
     address = models.TextField("Адрес")
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, verbose_name="Пользователь")
+    updated_at = models.DateTimeField("Изменено", auto_now=True)
 
     class Meta:
         verbose_name = "Магазин"
@@ -46,13 +50,22 @@ class Product(models.Model):
     size = models.CharField("Размер", max_length=3, choices=SIZE_CHOICES, default='M')
     price = models.DecimalField("Цена", max_digits=10, decimal_places=2, default=0.00)
     color = models.CharField("Цвет", max_length=50, null=True, blank=True)
-    image = models.ImageField("Фото товара", upload_to="products", null=True, blank=True)
+    image = models.ImageField("Фото товара", upload_to="products", null=True, blank=True, storage=blob_storage)
+    thumbnails_ready = models.BooleanField("Копии фото готовы", default=False, editable=False)
     description = models.TextField("Описание", null=True, blank=True)
     quantity = models.PositiveIntegerField("Количество", default=0)
+    updated_at = models.DateTimeField("Изменено", auto_now=True)
 
     class Meta:
         verbose_name = "Товар"
         verbose_name_plural = "Товары"
+        indexes = [
+            models.Index(fields=["category", "id"], name="product_category_idx"),
+            models.Index(fields=["store", "id"], name="product_store_idx"),
+            models.Index(fields=["size", "id"], name="product_size_idx"),
+            models.Index(fields=["price", "id"], name="product_price_idx"),
+            models.Index(fields=["id"], condition=models.Q(quantity__gt=0), name="product_in_stock_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.name} ({self.size})"
@@ -67,8 +80,10 @@ class Customer(models.Model):
     phone = models.CharField("Телефон", max_length=20, null=True, blank=True)
     email = models.EmailField("Email", null=True, blank=True)
     store = models.ForeignKey(Store, on_delete=models.CASCADE, verbose_name="Магазин")
-    photo = models.ImageField("Фото", upload_to="customers", null=True, blank=True)
+    photo = models.ImageField("Фото", upload_to="customers", null=True, blank=True, storage=blob_storage)
+    thumbnails_ready = models.BooleanField("Копии фото готовы", default=False, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, verbose_name="Пользователь")
+    updated_at = models.DateTimeField("Изменено", auto_now=True)
 
     class Meta:
         verbose_name = "Покупатель"
@@ -95,19 +110,105 @@ class Order(models.Model):
     total_price = models.DecimalField("Общая сумма", max_digits=10, decimal_places=2, default=0.00)
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, verbose_name="Пользователь")
     order_id = models.AutoField(primary_key=True)
+    updated_at = models.DateTimeField("Изменено", auto_now=True)
 
     class Meta:
         verbose_name = "Заказ"
         verbose_name_plural = "Заказы"
+        indexes = [
+            models.Index(fields=["status", "order_id"], name="order_status_idx"),
+            models.Index(fields=["order_date", "order_id"], name="order_date_idx"),
+            models.Index(fields=["customer", "order_id"], name="order_customer_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.product} → {self.customer} ({self.status})"
-    
-    def save(self, *args, **kwargs):
-        if self._state.adding and not self.order_id:
-            last_order = Order.objects.order_by('-order_id').first()
-            self.order_id = (last_order.order_id + 1) if last_order else 1
-        super().save(*args, **kwargs)
+
+
+class ResourceVersion(models.Model):
+    name = models.CharField("Ресурс", max_length=50, unique=True)
+    version = models.PositiveBigIntegerField("Версия", default=0)
+    updated_at = models.DateTimeField("Изменён", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Версия ресурса"
+        verbose_name_plural = "Версии ресурсов"
+
+    def __str__(self) -> str:
+        return f"{self.name} v{self.version}"
+
+
+class StatCounter(models.Model):
+    name = models.CharField("Показатель", max_length=50)
+    key = models.CharField("Группа", max_length=255, default="", blank=True)
+    value = models.DecimalField("Значение", max_digits=20, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name = "Счётчик статистики"
+        verbose_name_plural = "Счётчики статистики"
+        constraints = [
+            models.UniqueConstraint(fields=["name", "key"], name="statcounter_name_key_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["name", "value"], name="statcounter_top_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.name}[{self.key}] = {self.value}"
+
+
+class SalesRollup(models.Model):
+    day = models.DateField("День")
+    store = models.ForeignKey(Store, on_delete=models.DO_NOTHING, db_constraint=False, verbose_name="Магазин")
+    category = models.ForeignKey(Category, on_delete=models.DO_NOTHING, db_constraint=False, verbose_name="Категория")
+    status = models.CharField("Статус", max_length=20, choices=Order.STATUS_CHOICES)
+    orders = models.PositiveIntegerField("Заказов", default=0)
+    units = models.PositiveBigIntegerField("Единиц товара", default=0)
+    revenue = models.DecimalField("Выручка", max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name = "Продажи за день"
+        verbose_name_plural = "Продажи по дням"
+        constraints = [
+            models.UniqueConstraint(fields=["day", "store", "category", "status"], name="salesrollup_day_uniq"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.day} {self.store_id}/{self.category_id} {self.status}: {self.revenue}"
+
+
+class ChangeLog(models.Model):
+    """
+    Журнал изменений для синхронизации клиента: по записи на последнее
+    изменение каждого объекта. id растёт монотонно и служит токеном синхронизации.
+    """
+    resource = models.CharField("Ресурс", max_length=50)
+    object_id = models.BigIntegerField("ID объекта")
+    deleted = models.BooleanField("Удалён", default=False)
+
+    class Meta:
+        verbose_name = "Изменение"
+        verbose_name_plural = "Журнал изменений"
+        indexes = [
+            models.Index(fields=["resource", "id"], name="changelog_resource_seq_idx"),
+            models.Index(fields=["resource", "object_id"], name="changelog_object_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"#{self.id} {self.resource}:{self.object_id}{' (удалён)' if self.deleted else ''}"
+
+
+class MediaBlob(models.Model):
+    """Файл хранилища по содержимому (wardrobe.storage) и число ссылок на него."""
+    name = models.CharField("Имя файла", max_length=255, unique=True)
+    refs = models.IntegerField("Ссылок", default=0)
+
+    class Meta:
+        verbose_name = "Файл"
+        verbose_name_plural = "Файлы"
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.refs})"
 
 
 class UserProfile(models.Model):
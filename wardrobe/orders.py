@@ -0,0 +1,218 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from wardrobe.changes import record_changes, touch_updated_at
+from wardrobe.events import queue_event
+from wardrobe.models import Order, Product
+from wardrobe.rollups import touch_days
+from wardrobe.versions import bump_version, notify_bulk_change
+
+BULK_BATCH_SIZE = 1000
+
+TRANSITIONS = {
+    'pending': ('sold', 'returned', 'cancelled'),
+    'sold': ('returned',),
+    'returned': (),
+    'cancelled': (),
+}
+# Заказы в этих статусах удерживают товар со склада
+HOLDING_STATUSES = ('pending', 'sold')
+
+
+def reserve_stock(product_id, quantity):
+    # Условный UPDATE: проверка остатка и списание одним запросом,
+    # блокируется только строка товара.
+    reserved = Product.objects.filter(pk=product_id, quantity__gte=quantity).update(
+        quantity=F('quantity') - quantity, updated_at=timezone.now())
+    if not reserved:
+        raise ValidationError({'quantity': 'Недостаточно товара на складе'})
+    stock_changed([product_id])
+
+
+def release_stock(product_id, quantity):
+    Product.objects.filter(pk=product_id).update(quantity=F('quantity') + quantity, updated_at=timezone.now())
+    stock_changed([product_id])
+
+
+def stock_changed(product_ids):
+    # UPDATE по queryset не отправляет сигналов
+    bump_version('product')
+    record_changes('product', product_ids)
+    queue_event('stock', product_ids)
+
+
+def check_transition(current, status):
+    if status != current and status not in TRANSITIONS.get(current, ()):
+        raise ValidationError({'status': f'Недопустимый переход статуса: {current} → {status}'})
+
+
+@transaction.atomic
+def place_order(product, quantity=1, status='pending', **fields):
+    if status not in HOLDING_STATUSES:
+        raise ValidationError({'status': 'Новый заказ может быть только в статусе pending или sold'})
+    reserve_stock(product.pk, quantity)
+    return Order.objects.create(
+        product=product, quantity=quantity, status=status, total_price=product.price * quantity, **fields
+    )
+
+
+@transaction.atomic
+def update_order(order, **fields):
+    order = Order.objects.select_for_update().select_related('product').get(pk=order.pk)
+    product = fields.pop('product', order.product)
+    quantity = fields.pop('quantity', order.quantity)
+    status = fields.pop('status', order.status)
+    check_transition(order.status, status)
+
+    held = order.status in HOLDING_STATUSES
+    holds = status in HOLDING_STATUSES
+    same_line = product.pk == order.product_id and quantity == order.quantity
+    if not (held and holds and same_line):
+        if held:
+            release_stock(order.product_id, order.quantity)
+        if holds:
+            reserve_stock(product.pk, quantity)
+
+    for field, value in fields.items():
+        setattr(order, field, value)
+    if not same_line:
+        order.product = product
+        order.quantity = quantity
+        order.total_price = product.price * quantity
+    order.status = status
+    order.save()
+    return order
+
+
+def change_status(order, status):
+    return update_order(order, status=status)
+
+
+@transaction.atomic
+def delete_order(order):
+    # Удаление ожидающего заказа возвращает резерв; проданный товар на склад не возвращается
+    order = Order.objects.select_for_update().get(pk=order.pk)
+    if order.status == 'pending':
+        release_stock(order.product_id, order.quantity)
+    order.delete()
+
+
+class StockLedger:
+    """
+    Остатки товаров для массовых операций: строки товаров блокируются одним
+    SELECT ... FOR UPDATE, резервы считаются в памяти, а итоговые изменения
+    записываются одним UPDATE с CASE.
+    """
+
+    def __init__(self, product_ids):
+        products = Product.objects.select_for_update().filter(pk__in=set(product_ids))
+        self.stock = dict(products.values_list('pk', 'quantity'))
+        self.deltas = defaultdict(int)
+
+    def move(self, release=None, reserve=None):
+        changes = defaultdict(int)
+        if release:
+            changes[release[0]] += release[1]
+        if reserve:
+            product_id, quantity = reserve
+            if self.stock.get(product_id, 0) + changes[product_id] < quantity:
+                raise ValidationError({'quantity': 'Недостаточно товара на складе'})
+            changes[product_id] -= quantity
+        for product_id, delta in changes.items():
+            self.stock[product_id] = self.stock.get(product_id, 0) + delta
+            self.deltas[product_id] += delta
+
+    def commit(self):
+        deltas = {product_id: delta for product_id, delta in self.deltas.items() if delta}
+        if not deltas:
+            return
+        change = Case(*[When(pk=product_id, then=Value(delta)) for product_id, delta in deltas.items()],
+                      output_field=IntegerField())
+        Product.objects.filter(pk__in=deltas).update(quantity=F('quantity') + change, updated_at=timezone.now())
+        stock_changed(deltas)
+
+
+@transaction.atomic
+def bulk_place_orders(items):
+    """items — пары (индекс, validated_data). Возвращает созданные заказы с индексами и ошибки."""
+    ledger = StockLedger(data['product'].pk for _, data in items)
+    accepted, errors = [], []
+    for index, data in items:
+        data = dict(data)
+        data.setdefault('quantity', 1)
+        data.setdefault('status', 'pending')
+        try:
+            if data['status'] not in HOLDING_STATUSES:
+                raise ValidationError({'status': 'Новый заказ может быть только в статусе pending или sold'})
+            ledger.move(reserve=(data['product'].pk, data['quantity']))
+        except ValidationError as error:
+            errors.append({'index': index, 'errors': error.detail})
+            continue
+        data['total_price'] = data['product'].price * data['quantity']
+        accepted.append((index, Order(**data)))
+    ledger.commit()
+    orders = Order.objects.bulk_create([order for _, order in accepted], batch_size=BULK_BATCH_SIZE)
+    notify_bulk_change(Order, created=orders)
+    return [(index, order) for (index, _), order in zip(accepted, orders)], errors
+
+
+@transaction.atomic
+def bulk_update_orders(items):
+    """items — тройки (индекс, заказ, validated_data)."""
+    orders = Order.objects.select_for_update().select_related('product').in_bulk([order.pk for _, order, _ in items])
+    product_ids = [order.product_id for order in orders.values()]
+    product_ids += [data['product'].pk for _, _, data in items if 'product' in data]
+    ledger = StockLedger(product_ids)
+    touch_days(order.order_date for order in orders.values())
+    updated, errors, fields = [], [], set()
+    for index, order, data in items:
+        order = orders[order.pk]
+        data = dict(data)
+        product = data.pop('product', None) or order.product
+        quantity = data.pop('quantity', order.quantity)
+        status = data.pop('status', order.status)
+        held = order.status in HOLDING_STATUSES
+        holds = status in HOLDING_STATUSES
+        same_line = product.pk == order.product_id and quantity == order.quantity
+        try:
+            check_transition(order.status, status)
+            if not (held and holds and same_line):
+                ledger.move(release=(order.product_id, order.quantity) if held else None,
+                            reserve=(product.pk, quantity) if holds else None)
+        except ValidationError as error:
+            errors.append({'index': index, 'errors': error.detail})
+            continue
+        for field, value in data.items():
+            setattr(order, field, value)
+        fields.update(data)
+        if not same_line:
+            order.product = product
+            order.quantity = quantity
+            order.total_price = product.price * quantity
+            fields.update(['product', 'quantity', 'total_price'])
+        order.status = status
+        fields.add('status')
+        updated.append((index, order))
+    ledger.commit()
+    if updated:
+        orders = [order for _, order in updated]
+        Order.objects.bulk_update(orders, touch_updated_at(orders, sorted(fields)), batch_size=BULK_BATCH_SIZE)
+        notify_bulk_change(Order, updated=orders)
+    return updated, errors
+
+
+@transaction.atomic
+def bulk_delete_orders(queryset):
+    orders = list(queryset.select_for_update())
+    ledger = StockLedger(order.product_id for order in orders)
+    for order in orders:
+        if order.status == 'pending':
+            ledger.move(release=(order.product_id, order.quantity))
+    ledger.commit()
+    pks = [order.pk for order in orders]
+    Order.objects.filter(pk__in=pks).delete()
+    return pks
@@ -0,0 +1,77 @@
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+
+
+class OffsetPagination(LimitOffsetPagination):
+    default_limit = 50
+    max_limit = 500
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Курсорная пагинация по первичному ключу (order_id у Order, id у остальных):
+    WHERE pk > курсор ORDER BY pk LIMIT n, поэтому глубина страницы не влияет
+    на время ответа. Передача ?offset= или ?limit= включает старый режим
+    LIMIT/OFFSET с полем count.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = 'pk'
+    offset_query_params = ('offset', 'limit')
+
+    def __init__(self):
+        self.offset_paginator = None
+
+    def use_offset(self, request):
+        return any(param in request.query_params for param in self.offset_query_params)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_offset(request):
+            if not queryset.ordered:
+                queryset = queryset.order_by('pk')
+            self.offset_paginator = OffsetPagination()
+            return self.offset_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.offset_paginator is not None:
+            return self.offset_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        То же, что paginate_queryset в курсорном режиме, но страница читается
+        через async ORM. Повторяет CursorPagination.paginate_queryset: в DRF
+        выборка страницы встроена в метод и не переопределяется отдельно.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        offset, reverse, current_position = self.cursor or (0, False, None)
+
+        ordering = [order[1:] if order.startswith('-') else '-' + order for order in self.ordering] if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if current_position is not None:
+            order = self.ordering[0]
+            lookup = '__lt' if self.cursor.reverse != order.startswith('-') else '__gt'
+            queryset = queryset.filter(**{order.lstrip('-') + lookup: current_position})
+
+        results = [obj async for obj in queryset[offset:offset + self.page_size + 1]]
+        self.page = results[:self.page_size]
+        has_following_position = len(results) > len(self.page)
+        following_position = self._get_position_from_instance(results[-1], self.ordering) if has_following_position else None
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = current_position is not None or offset > 0
+            self.has_previous = has_following_position
+            self.next_position = current_position
+            self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None or offset > 0
+            self.next_position = following_position
+            self.previous_position = current_position
+        return self.page
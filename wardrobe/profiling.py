@@ -0,0 +1,124 @@
+"""
+Выборочное профилирование запросов (см. RequestMetricsMiddleware).
+
+Доля PROFILE_SAMPLE_RATE запросов выполняется под профилировщиком (0 —
+выключено); профиль сохраняется в PROFILE_DIR, только если запрос шёл не
+меньше PROFILE_THRESHOLD_MS. Режимы PROFILE_MODE:
+
+- 'stacks' — отдельный поток раз в PROFILE_INTERVAL_MS снимает стек потока
+  запроса. Файл .folded в формате свёрнутых стеков, как у
+  `py-spy record --format raw`: его открывают speedscope и flamegraph.pl.
+  Накладные расходы малы, поэтому режим годится для рабочего трафика.
+- 'cprofile' — детерминированный cProfile, файл .prof для pstats и snakeviz.
+  Точные числа вызовов, но запрос под ним заметно медленнее.
+
+Профилируются синхронные запросы от начала до возврата ответа: отдача
+потокового тела и async-представления (их код делит поток цикла событий
+с другими запросами) в профиль не попадают.
+"""
+import cProfile
+import os
+import random
+import re
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+
+from django.conf import settings
+
+from wardrobe.metrics import PROFILES, view_label
+
+# Одновременно cProfile может работать только в одном потоке (Python 3.12+)
+cprofile_lock = threading.Lock()
+
+
+def frame_label(frame):
+    code = frame.f_code
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})'
+
+
+def fold(frame):
+    """Стек от корня к текущей функции через «;», как в свёрнутых стеках py-spy."""
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+class StackSampler:
+    extension = 'folded'
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.thread_id = threading.get_ident()
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='profile-sampler', daemon=True)
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[fold(frame)] += 1
+
+    def start(self):
+        self.thread.start()
+        return True
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as file:
+            for stack, count in self.stacks.most_common():
+                file.write(f'{stack} {count}\n')
+
+
+class CProfileRecorder:
+    extension = 'prof'
+
+    def __init__(self, interval):
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        if not cprofile_lock.acquire(blocking=False):
+            return False
+        self.profile.enable()
+        return True
+
+    def stop(self):
+        self.profile.disable()
+        cprofile_lock.release()
+
+    def save(self, path):
+        self.profile.dump_stats(path)
+
+
+RECORDERS = {'stacks': StackSampler, 'cprofile': CProfileRecorder}
+
+
+def start():
+    """Профилировщик для этого запроса или None, если запрос не попал в выборку."""
+    rate = settings.PROFILE_SAMPLE_RATE
+    if not rate or random.random() >= rate:
+        return None
+    recorder = RECORDERS[settings.PROFILE_MODE](settings.PROFILE_INTERVAL_MS / 1000)
+    return recorder if recorder.start() else None
+
+
+def finish(recorder, request, elapsed):
+    """Останавливает профилировщик; возвращает путь сохранённого профиля или None."""
+    recorder.stop()
+    if elapsed * 1000 < settings.PROFILE_THRESHOLD_MS:
+        return None
+    view = view_label(request)
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    name = '%s-%s-%dms.%s' % (datetime.now().strftime('%Y%m%d-%H%M%S-%f'), re.sub(r'[^\w.-]', '-', view),
+                               elapsed * 1000, recorder.extension)
+    path = os.path.join(settings.PROFILE_DIR, name)
+    recorder.save(path)
+    PROFILES.inc(view)
+    return path
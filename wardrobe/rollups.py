@@ -0,0 +1,147 @@
+"""
+Продажи по дням в разрезе магазина, категории и статуса (SalesRollup).
+
+Изменения заказов и товаров отмечают затронутые даты заказов; после коммита
+транзакции эти даты пересчитываются из Order целиком, остальные строки
+SalesRollup не трогаются. Аналитика читает только SalesRollup.
+"""
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncMonth, TruncWeek, TruncYear
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.exceptions import ValidationError
+
+from wardrobe.filters import lookup, to_date
+from wardrobe.models import Order, Product, SalesRollup
+from wardrobe.snapshots import previous, track
+from wardrobe.versions import bulk_changed, find_pending, flush_version
+
+ROLLUP_BATCH_SIZE = 1000
+# Не больше стольких дат в одном IN (...)
+DAYS_PER_QUERY = 500
+
+PERIODS = {
+    'day': F('day'),
+    'week': TruncWeek('day'),
+    'month': TruncMonth('day'),
+    'year': TruncYear('day'),
+}
+# Ключ ответа → поле SalesRollup
+GROUPS = {
+    'store': {'store': 'store_id', 'store_name': 'store__name'},
+    'category': {'category': 'category_id', 'category_name': 'category__name'},
+    'status': {'status': 'status'},
+}
+ANALYTICS_FILTERS = {
+    'date_from': lookup('day__gte', to_date),
+    'date_to': lookup('day__lte', to_date),
+    'store': lookup('store_id', int),
+    'category': lookup('category_id', int),
+    'status': lookup('status'),
+}
+
+
+def rollup_rows(orders):
+    rows = orders.values('order_date', 'product__store_id', 'product__category_id', 'status').annotate(
+        orders=Count('pk'), units=Sum('quantity'), revenue=Sum('total_price')).order_by()
+    for row in rows.iterator():
+        yield SalesRollup(day=row['order_date'], store_id=row['product__store_id'], category_id=row['product__category_id'],
+                          status=row['status'], orders=row['orders'], units=row['units'], revenue=row['revenue'])
+
+
+def rebuild_days(days):
+    days = sorted(days, key=str)
+    for start in range(0, len(days), DAYS_PER_QUERY):
+        chunk = days[start:start + DAYS_PER_QUERY]
+        with transaction.atomic():
+            SalesRollup.objects.filter(day__in=chunk).delete()
+            SalesRollup.objects.bulk_create(rollup_rows(Order.objects.filter(order_date__in=chunk)), batch_size=ROLLUP_BATCH_SIZE)
+            flush_version('sales')
+
+
+@transaction.atomic
+def rebuild_all():
+    SalesRollup.objects.all().delete()
+    SalesRollup.objects.bulk_create(rollup_rows(Order.objects.all()), batch_size=ROLLUP_BATCH_SIZE)
+    flush_version('sales')
+
+
+class PendingDays(set):
+    """Даты, которые пересчитываются после коммита текущей транзакции."""
+
+    done = False
+
+    def __call__(self):
+        self.done = True
+        rebuild_days(self)
+
+
+def touch_days(days):
+    days = {day for day in days if day}
+    if not days:
+        return
+    # Даты копятся в одном отложенном пересчёте на транзакцию
+    pending = find_pending(lambda callback: isinstance(callback, PendingDays))
+    if pending is not None:
+        pending.update(days)
+    else:
+        transaction.on_commit(PendingDays(days))
+
+
+def touch_products(product_ids):
+    touch_days(Order.objects.filter(product_id__in=product_ids).values_list('order_date', flat=True).distinct())
+
+
+def sales_analytics(queryset, period='month', group_by=()):
+    if period not in PERIODS:
+        raise ValidationError({'period': f'Допустимые значения: {", ".join(PERIODS)}'})
+    unknown = [group for group in group_by if group not in GROUPS]
+    if unknown:
+        raise ValidationError({'group_by': f'Допустимые значения: {", ".join(GROUPS)}'})
+    keys = {key: field for group in group_by for key, field in GROUPS[group].items()}
+    rows = queryset.annotate(period=PERIODS[period]).values('period', *keys.values()).annotate(
+        orders=Sum('orders'), units=Sum('units'), revenue=Sum('revenue')).order_by('period', *keys.values())
+    return [
+        {'period': row['period'], **{key: row[field] for key, field in keys.items()},
+         'orders': row['orders'], 'units': row['units'], 'revenue': row['revenue']}
+        for row in rows
+    ]
+
+
+track(Order, 'order_date')
+track(Product, 'store_id', 'category_id')
+
+
+@receiver(post_save, sender=Order)
+def order_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    old = previous(instance) or {}
+    touch_days([instance.order_date, old.get('order_date')])
+
+
+@receiver(post_delete, sender=Order)
+def order_deleted(sender, instance, **kwargs):
+    touch_days([instance.order_date])
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, created, raw=False, **kwargs):
+    old = previous(instance)
+    if created or raw or old is None:
+        return
+    if (old['store_id'], old['category_id']) != (instance.store_id, instance.category_id):
+        touch_products([instance.pk])
+
+
+@receiver(bulk_changed, sender=Order)
+def orders_bulk_changed(sender, created=(), updated=(), **kwargs):
+    # Прежние даты изменённых заказов отмечает bulk_update_orders до записи
+    touch_days(order.order_date for order in [*created, *updated])
+
+
+@receiver(bulk_changed, sender=Product)
+def products_bulk_changed(sender, updated=(), **kwargs):
+    if updated:
+        touch_products([product.pk for product in updated])
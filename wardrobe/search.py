@@ -0,0 +1,171 @@
+"""
+Полнотекстовый поиск товаров (/api/products/search/?q=).
+
+В SQLite индекс — виртуальная таблица FTS5 wardrobe_productsearch
+(rowid = id товара) с названием, описанием, цветом и названиями категории
+и магазина. Сигналы обновляют её в той же транзакции, что и сам товар;
+переименование категории или магазина переписывает строки их товаров.
+Токенизатор unicode61 приводит регистр кириллицы и латиницы и убирает
+диакритику латиницы, ё заменяется на е при индексации и в запросе. Каждое
+слово запроса ищется по префиксу, результаты упорядочены по bm25 с весами
+колонок среди MAX_RESULTS самых новых совпадений. Префиксные индексы на
+2–3 символа делают короткие префиксы такими же быстрыми, как целые слова.
+
+На других СУБД таблицы нет: поиск идёт через icontains по тем же полям,
+совпадение в названии выше остальных.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, TextField, Value, When
+from django.db.models.functions import Replace
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from wardrobe.models import Category, Product, Store
+from wardrobe.versions import bulk_changed
+
+TABLE = 'wardrobe_productsearch'
+COLUMNS = ('name', 'description', 'color', 'category', 'store')
+# Вес совпадения в колонке для bm25, в порядке COLUMNS
+WEIGHTS = (10.0, 1.0, 2.0, 3.0, 2.0)
+INDEXED_FIELDS = {'name', 'description', 'color', 'category', 'category_id', 'store', 'store_id'}
+MAX_TERMS = 8
+# Сколько результатов можно пролистать; дальше нужно уточнить запрос
+MAX_RESULTS = 1000
+INDEX_BATCH_SIZE = 1000
+
+
+def enabled():
+    return connection.vendor == 'sqlite'
+
+
+def terms(query):
+    return re.findall(r'\w+', normalize(query))[:MAX_TERMS]
+
+
+def match_expression(words):
+    # Каждое слово в кавычках (операторы FTS5 в запросе не работают) и по префиксу
+    return ' '.join('"%s"*' % word for word in words)
+
+
+def normalize(text):
+    return text.lower().replace('ё', 'е')
+
+
+def indexed_values(products):
+    """Колонки индекса: unicode61 не сводит ё к е, делаем это сами и в запросе."""
+    fields = ['name', 'description', 'color', 'category__name', 'store__name']
+    columns = {
+        f'search_{i}': Replace(Replace(field, Value('ё'), Value('е')), Value('Ё'), Value('Е'), output_field=TextField())
+        for i, field in enumerate(fields)
+    }
+    return products.annotate(**columns).values_list('pk', *columns)
+
+
+def index_rows(product_ids):
+    return list(indexed_values(Product.objects.filter(pk__in=product_ids)).iterator(chunk_size=INDEX_BATCH_SIZE))
+
+
+def index_products(product_ids):
+    product_ids = list(product_ids)
+    if not enabled() or not product_ids:
+        return
+    with connection.cursor() as cursor:
+        for start in range(0, len(product_ids), INDEX_BATCH_SIZE):
+            batch = product_ids[start:start + INDEX_BATCH_SIZE]
+            cursor.execute(f"DELETE FROM {TABLE} WHERE rowid IN ({', '.join(['%s'] * len(batch))})", batch)
+            cursor.executemany(
+                f"INSERT INTO {TABLE} (rowid, {', '.join(COLUMNS)}) VALUES (%s, %s, %s, %s, %s, %s)", index_rows(batch))
+
+
+def unindex_products(product_ids):
+    product_ids = list(product_ids)
+    if enabled() and product_ids:
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {TABLE} WHERE rowid IN ({', '.join(['%s'] * len(product_ids))})", product_ids)
+
+
+def rebuild_index():
+    if not enabled():
+        return 0
+    sql, params = indexed_values(Product.objects.order_by('pk')).query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE}')
+        # NULL в колонках FTS5 допустим и просто не индексируется
+        cursor.execute(f"INSERT INTO {TABLE} (rowid, {', '.join(COLUMNS)}) {sql}", params)
+        cursor.execute(f"INSERT INTO {TABLE} ({TABLE}) VALUES ('optimize')")
+        cursor.execute(f'SELECT count(*) FROM {TABLE}')
+        return cursor.fetchone()[0]
+
+
+def search_ids(query, products=None, limit=50, offset=0):
+    """
+    id товаров, подходящих под query, по убыванию релевантности. products —
+    queryset с дополнительными фильтрами (None — все товары). Возвращает на
+    один id больше limit, если есть следующая страница.
+    """
+    words = terms(query)
+    limit = min(limit, MAX_RESULTS - offset)
+    if not words or limit <= 0:
+        return []
+    if not enabled():
+        return fallback_ids(words, products, limit, offset)
+    sql = f"SELECT rowid, bm25({TABLE}, {', '.join(map(str, WEIGHTS))}) AS score FROM {TABLE} WHERE {TABLE} MATCH %s"
+    params = [match_expression(words)]
+    if products is not None and products.query.where:
+        subquery, subquery_params = products.values('pk').query.sql_with_params()
+        sql += f' AND rowid IN ({subquery})'
+        params += subquery_params
+    # bm25 считается только для MAX_RESULTS самых новых совпадений: ранжирование
+    # всех совпадений короткого префикса на миллионе товаров заняло бы секунды
+    sql = f'SELECT rowid FROM ({sql} ORDER BY rowid DESC LIMIT %s) ORDER BY score, rowid DESC LIMIT %s OFFSET %s'
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params + [MAX_RESULTS, limit + 1, offset])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def fallback_ids(words, products, limit, offset):
+    products = Product.objects.all() if products is None else products
+    for word in words:
+        products = products.filter(
+            Q(name__icontains=word) | Q(description__icontains=word) | Q(color__icontains=word)
+            | Q(category__name__icontains=word) | Q(store__name__icontains=word))
+    in_name = Case(*[When(name__icontains=word, then=Value(1)) for word in words], default=Value(0), output_field=IntegerField())
+    products = products.annotate(in_name=in_name).order_by('-in_name', 'pk')
+    return list(products.values_list('pk', flat=True)[offset:offset + limit + 1])
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or INDEXED_FIELDS & set(update_fields):
+        index_products([instance.pk])
+
+
+@receiver(post_delete, sender=Product)
+def product_deleted(sender, instance, **kwargs):
+    unindex_products([instance.pk])
+
+
+@receiver(bulk_changed, sender=Product)
+def products_bulk_changed(sender, created=(), updated=(), **kwargs):
+    index_products([product.pk for product in [*created, *updated]])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Store)
+def owner_saved(sender, instance, created, **kwargs):
+    if created or not enabled():
+        return
+    column = 'category' if sender is Category else 'store'
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {TABLE} SET {column} = %s WHERE rowid IN (SELECT id FROM {Product._meta.db_table} WHERE {column}_id = %s) AND {column} != %s",
+            [instance.name, instance.pk, instance.name])
+
+
+@receiver(bulk_changed, sender=Category)
+@receiver(bulk_changed, sender=Store)
+def owners_bulk_changed(sender, updated=(), **kwargs):
+    field = 'category_id__in' if sender is Category else 'store_id__in'
+    index_products(Product.objects.filter(**{field: [owner.pk for owner in updated]}).values_list('pk', flat=True))
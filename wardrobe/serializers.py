@@ -1,29 +1,101 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from .models import Category, Store, Product, Customer, Order, UserProfile
+from .metrics import timed_serialization
+from .thumbnails import IMAGE_FIELDS, thumbnail_urls
 
-class CategorySerializer(serializers.ModelSerializer):
+
+def coerce_pk(value):
+    """Целый pk из значения, которое принял бы PrimaryKeyRelatedField (1 или "1"); None — не pk."""
+    if isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class CachedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Для массовых операций: если в context['related'][имя поля] заранее
+    загружены объекты по pk, берёт их оттуда вместо запроса на каждый элемент.
+    """
+
+    def to_internal_value(self, data):
+        cache = self.context.get('related', {}).get(self.field_name)
+        if cache is None:
+            return super().to_internal_value(data)
+        pk = coerce_pk(data)
+        if pk is None:
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if pk not in cache:
+            self.fail('does_not_exist', pk_value=data)
+        return cache[pk]
+
+
+class SparseFieldsMixin:
+    """fields — список полей, которые нужно оставить (None — все поля)."""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class TimedRepresentationMixin:
+    """
+    Время to_representation идёт в метрику сериализации запроса (wardrobe.metrics).
+    ListSerializer вызывает его для каждого элемента, поэтому учитываются и списки.
+    """
+
+    def to_representation(self, instance):
+        return timed_serialization(super().to_representation, instance)
+
+
+class ThumbnailsField(serializers.Field):
+    """URL уменьшенных копий фото по размерам (wardrobe.thumbnails), None — пока не готовы."""
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        kwargs['source'] = '*'
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        image = getattr(instance, IMAGE_FIELDS[type(instance)])
+        if not image or not instance.thumbnails_ready:
+            return None
+        urls = thumbnail_urls(image.name)
+        request = self.context.get('request')
+        if urls and request is not None:
+            urls = {size: request.build_absolute_uri(url) for size, url in urls.items()}
+        return urls
+
+
+class CategorySerializer(SparseFieldsMixin, TimedRepresentationMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
-        fields = ['id', 'name', 'user']
+        fields = ['id', 'name', 'user', 'updated_at']
         read_only_fields = ['user']
 
-class StoreSerializer(serializers.ModelSerializer):
+class StoreSerializer(SparseFieldsMixin, TimedRepresentationMixin, serializers.ModelSerializer):
     class Meta:
         model = Store
-        fields = ['id', 'name', 'address', 'user']
+        fields = ['id', 'name', 'address', 'user', 'updated_at']
         read_only_fields = ['user']
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(SparseFieldsMixin, TimedRepresentationMixin, serializers.ModelSerializer):
+    serializer_related_field = CachedPrimaryKeyRelatedField
     category_name = serializers.StringRelatedField(source='category', read_only=True)
     store_name = serializers.StringRelatedField(source='store', read_only=True)
+    thumbnails = ThumbnailsField()
 
     class Meta:
         model = Product
         fields = ['id', 'name', 'category', 'category_name', 'store', 'store_name', 
-                  'size', 'price', 'color', 'image', 'description', 'quantity']
+                  'size', 'price', 'color', 'image', 'thumbnails', 'description', 'quantity', 'updated_at']
 
-class CustomerSerializer(serializers.ModelSerializer):
+class CustomerSerializer(SparseFieldsMixin, TimedRepresentationMixin, serializers.ModelSerializer):
     age = serializers.SerializerMethodField()
 
     class Meta:
@@ -32,10 +104,11 @@ class CustomerSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
     def get_age(self, obj):
-        profile = UserProfile.objects.filter(user=obj).first()
+        profile = getattr(obj, 'profile', None)
         return profile.age if profile else None
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(SparseFieldsMixin, TimedRepresentationMixin, serializers.ModelSerializer):
+    serializer_related_field = CachedPrimaryKeyRelatedField
     customer_name = serializers.CharField(source='customer.first_name', read_only=True)
     product_name = serializers.CharField(source='product.name', read_only=True)
     store_name = serializers.CharField(source='product.store.name', read_only=True)
@@ -43,10 +116,10 @@ class OrderSerializer(serializers.ModelSerializer):
     class Meta:
         model = Order
         fields = ['order_id', 'product', 'product_name', 'customer', 'customer_name',
-                  'store_name', 'quantity', 'order_date', 'status', 'total_price']
+                  'store_name', 'quantity', 'order_date', 'status', 'total_price', 'updated_at']
         read_only_fields = ['order_id', 'total_price']
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     username = serializers.CharField(source='user.username', read_only=True)
     email = serializers.EmailField(source='user.email', read_only=True)
 
@@ -0,0 +1,163 @@
+"""
+Отдача файлов из MEDIA_ROOT (см. views.serve_media).
+
+Файлы хранилища по содержимому (blobs/, wardrobe.storage) не меняются под
+тем же именем: их ETag — хэш из имени, а кэшировать их можно навсегда.
+Остальные файлы браузер перепроверяет по ETag (время изменения и размер)
+и Last-Modified. Поддерживается один диапазон Range (с If-Range);
+несколько диапазонов отдаются файлом целиком, как разрешает RFC 9110.
+
+Django отдаёт файл через FileResponse: WSGI-сервер с wsgi.file_wrapper
+(gunicorn) передаёт его через sendfile без копирования, в том числе для
+диапазона. В режимах MEDIA_SERVE_MODE = 'x-accel-redirect' и 'x-sendfile'
+Django только проверяет путь и условные заголовки, а байты отдаёт прокси.
+"""
+import mimetypes
+import os
+from pathlib import PurePosixPath
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+from wardrobe.storage import is_blob
+
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE = 'no-cache'
+
+
+def resolve(path):
+    """Абсолютный путь файла в MEDIA_ROOT; скрытые файлы и выход за пределы каталога — 404."""
+    if any(part.startswith('.') for part in PurePosixPath(path).parts):
+        raise Http404
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    return full_path
+
+
+def validators(path, stat):
+    """ETag, Last-Modified и Cache-Control файла."""
+    if is_blob(path):
+        return '"%s"' % PurePosixPath(path).stem, int(stat.st_mtime), IMMUTABLE_CACHE
+    return 'W/"%x-%x"' % (stat.st_mtime_ns, stat.st_size), int(stat.st_mtime), REVALIDATE_CACHE
+
+
+def parse_range(header, size):
+    """
+    (начало, конец) включительно для заголовка Range с одним диапазоном;
+    None — отдать файл целиком, False — диапазон за пределами файла (416).
+    """
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec:
+        return None
+    start, separator, end = spec.strip().partition('-')
+    if not separator:
+        return None
+    try:
+        if not start:
+            suffix = int(end)
+            if suffix <= 0 or not size:
+                return False
+            return max(size - suffix, 0), size - 1
+        start, end = int(start), int(end) if end else size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        return False
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def if_range_matches(request, etag, last_modified):
+    value = request.headers.get('If-Range')
+    if value is None:
+        return True
+    if value.startswith('"'):
+        # Для диапазонов подходит только сильный ETag
+        return value == etag
+    return parse_http_date_safe(value) == last_modified
+
+
+class RangeFile:
+    """
+    Не больше length байт файла с текущей позиции. fileno() позволяет
+    серверу отдать диапазон через sendfile: длину он берёт из Content-Length.
+    """
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        size = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        data = self.file.read(size) if size else b''
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def accel_response(full_path, path):
+    response = HttpResponse()
+    if settings.MEDIA_SERVE_MODE == 'x-accel-redirect':
+        response.headers['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX + quote(path)
+    else:
+        response.headers['X-Sendfile'] = full_path
+    return response
+
+
+def file_response(request, full_path, stat, etag, last_modified):
+    size = stat.st_size
+    byte_range = parse_range(request.headers.get('Range', ''), size) if if_range_matches(request, etag, last_modified) else None
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response.headers['Content-Range'] = f'bytes */{size}'
+        return response
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1 if size else 0
+    if request.method == 'HEAD':
+        response = HttpResponse(status=206 if byte_range else 200)
+    else:
+        file = open(full_path, 'rb')
+        if byte_range:
+            file.seek(start)
+            response = FileResponse(RangeFile(file, length), status=206)
+        else:
+            response = FileResponse(file)
+    if byte_range:
+        response.headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response.headers['Content-Length'] = str(length)
+    return response
+
+
+def serve(request, path):
+    full_path = resolve(path)
+    stat = os.stat(full_path)
+    etag, last_modified, cache_control = validators(path, stat)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        if settings.MEDIA_SERVE_MODE:
+            response = accel_response(full_path, path)
+        else:
+            response = file_response(request, full_path, stat, etag, last_modified)
+    if response.status_code in (200, 206, 304):
+        if response.status_code != 304:
+            response.headers['Content-Type'] = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+            response.headers['Accept-Ranges'] = 'bytes'
+        response.headers['ETag'] = etag
+        response.headers['Last-Modified'] = http_date(last_modified)
+        response.headers['Cache-Control'] = cache_control
+    return response
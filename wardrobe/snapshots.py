@@ -0,0 +1,42 @@
+"""
+Прежние значения полей сохраняемой записи для приёмников post_save.
+
+Подсистемы, которым нужно сравнить запись с её состоянием до сохранения
+(stats, rollups, autocomplete, thumbnails и media), объявляют нужные колонки
+через track(). Один приёмник pre_save читает их объединение одним запросом
+и кладёт словарь в instance._previous, откуда его берёт previous().
+
+Новые записи не читаются. При save(update_fields=...) читаются только
+попавшие в update_fields колонки: остальные не меняются, и в словаре
+у них текущее значение; если таких колонок нет, запроса нет вовсе.
+"""
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+
+# Модель → атрибуты полей (category_id, а не category), прежние значения которых нужны
+TRACKED = {}
+
+
+def track(model, *fields):
+    TRACKED.setdefault(model, set()).update(fields)
+
+
+def previous(instance):
+    """Словарь прежних значений или None: запись новая или её уже нет в базе."""
+    return getattr(instance, '_previous', None)
+
+
+@receiver(pre_save)
+def remember_previous(sender, instance, update_fields=None, **kwargs):
+    fields = TRACKED.get(sender)
+    if not fields or instance._state.adding:
+        return
+    read = fields
+    if update_fields is not None:
+        read = fields & {sender._meta.get_field(field).attname for field in update_fields}
+    # get_prep_value приводит значения к виду, в котором их отдаёт values(): FieldFile → имя файла
+    snapshot = {field: sender._meta.get_field(field).get_prep_value(getattr(instance, field)) for field in fields - read}
+    if read:
+        row = sender._default_manager.filter(pk=instance.pk).values(*read).first()
+        snapshot = None if row is None else {**snapshot, **row}
+    instance._previous = snapshot
@@ -0,0 +1,377 @@
+"""
+Сводная статистика для эндпоинтов stats.
+
+Счётчики лежат в StatCounter и обновляются сигналами при изменении данных,
+поэтому чтение stats — несколько запросов по индексу вместо агрегатов по
+целым таблицам. API (AtomicWriteMixin, функции wardrobe.orders) и админка
+сохраняют запись вместе со счётчиками в одной транзакции; сохранение вне
+транзакции (скрипты, shell) пишет счётчики отдельными запросами в autocommit. Если изменение нельзя учесть
+инкрементально (каскадное удаление, удаление queryset, bulk-операции,
+переименование покупателя), семейство счётчиков помечается устаревшим и
+пересчитывается с нуля при следующем чтении. Полный пересчёт по расписанию —
+команда reconcile_stats.
+"""
+import asyncio
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from wardrobe.models import Category, Customer, Order, Product, StatCounter, Store
+from wardrobe.snapshots import previous, track
+from wardrobe.versions import bulk_changed
+
+FAMILIES = {
+    'category': ('category.count', 'category.products'),
+    'store': ('store.count', 'store.orders'),
+    'product': ('product.count', 'product.price_sum', 'product.orders'),
+    'order': ('order.count', 'order.total_sum', 'customer.orders'),
+    'customer': ('user.count', 'user.admins'),
+}
+# Какие семейства устаревают при каскадном или массовом изменении модели
+AFFECTED_FAMILIES = {
+    Category: ('category', 'product', 'store', 'order'),
+    Store: ('store', 'product', 'category', 'order'),
+    Product: ('product', 'category', 'store', 'order'),
+    Order: ('order', 'product', 'store'),
+    Customer: ('order', 'product', 'store'),
+    User: ('customer', 'category', 'store', 'product', 'order'),
+}
+DIRTY = 'dirty'
+
+
+def add(name, delta, key=''):
+    if not delta:
+        return
+    if StatCounter.objects.filter(name=name, key=key).update(value=F('value') + delta):
+        return
+    try:
+        with transaction.atomic():
+            StatCounter.objects.create(name=name, key=key, value=delta)
+    except IntegrityError:
+        StatCounter.objects.filter(name=name, key=key).update(value=F('value') + delta)
+
+
+def mark_dirty(*families):
+    StatCounter.objects.filter(name=DIRTY, key__in=families).update(value=1)
+
+
+def group_rows(name, pairs):
+    return [StatCounter(name=name, key=str(key), value=value or 0) for key, value in pairs]
+
+
+def compute(family):
+    if family == 'category':
+        return [StatCounter(name='category.count', value=Category.objects.count())] + group_rows(
+            'category.products', Category.objects.annotate(c=Count('product')).values_list('pk', 'c'))
+    if family == 'store':
+        return [StatCounter(name='store.count', value=Store.objects.count())] + group_rows(
+            'store.orders', Store.objects.annotate(c=Count('product__order')).values_list('pk', 'c'))
+    if family == 'product':
+        totals = Product.objects.aggregate(count=Count('pk'), price_sum=Sum('price'))
+        return [
+            StatCounter(name='product.count', value=totals['count']),
+            StatCounter(name='product.price_sum', value=totals['price_sum'] or 0),
+        ] + group_rows('product.orders', Order.objects.values('product_id').annotate(c=Count('pk')).values_list('product_id', 'c'))
+    if family == 'order':
+        totals = Order.objects.aggregate(count=Count('pk'), total_sum=Sum('total_price'))
+        return [
+            StatCounter(name='order.count', value=totals['count']),
+            StatCounter(name='order.total_sum', value=totals['total_sum'] or 0),
+        ] + group_rows('customer.orders', Order.objects.values('customer__first_name').annotate(c=Count('pk'))
+                       .values_list('customer__first_name', 'c'))
+    if family == 'customer':
+        return [
+            StatCounter(name='user.count', value=User.objects.count()),
+            StatCounter(name='user.admins', value=User.objects.filter(is_superuser=True).count()),
+        ]
+    raise ValueError(family)
+
+
+@transaction.atomic
+def reconcile(*families):
+    for family in families or FAMILIES:
+        StatCounter.objects.filter(name__in=FAMILIES[family]).delete()
+        StatCounter.objects.bulk_create(compute(family), batch_size=1000)
+        StatCounter.objects.update_or_create(name=DIRTY, key=family, defaults={'value': 0})
+
+
+def counter_rows(family, names):
+    return StatCounter.objects.filter(name__in=names + (DIRTY,), key__in=('', family)).values_list('name', 'key', 'value')
+
+
+def counter_values(rows):
+    """Значения счётчиков; None, если семейство помечено устаревшим."""
+    values = {name: value for name, key, value in rows if key == '' or name == DIRTY}
+    return None if values.pop(DIRTY, 1) else values
+
+
+def read(family, *names):
+    values = counter_values(counter_rows(family, names))
+    if values is None:
+        reconcile(family)
+        return read(family, *names)
+    return values
+
+
+def top_row(name):
+    return StatCounter.objects.filter(name=name).order_by('-value').values_list('key', 'value')
+
+
+def top(name):
+    return top_row(name).first()
+
+
+def positive(row):
+    return row if row and row[1] > 0 else None
+
+
+def positive_top(name):
+    return positive(top(name))
+
+
+async def aread_top(family, names, top_name=None):
+    """
+    Асинхронно: счётчики семейства и лидер top_name. Запросы независимы и
+    запускаются одновременно; если семейство устарело, пересчитываем и
+    читаем снова.
+    """
+    while True:
+        queries = [alist(counter_rows(family, names))]
+        if top_name:
+            queries.append(top_row(top_name).afirst())
+        rows, *row = await asyncio.gather(*queries)
+        values = counter_values(rows)
+        if values is not None:
+            return values, row[0] if row else None
+        await sync_to_async(reconcile)(family)
+
+
+async def alist(queryset):
+    return [row async for row in queryset]
+
+
+def name_of(model, row):
+    return model.objects.filter(pk=row[0]).values_list('name', flat=True).first() if row else None
+
+
+async def aname_of(model, row):
+    return await model.objects.filter(pk=row[0]).values_list('name', flat=True).afirst() if row else None
+
+
+def category_result(values, name):
+    return {'count': int(values.get('category.count', 0)), 'top': name}
+
+
+def store_result(values, name):
+    return {'count': int(values.get('store.count', 0)), 'top': name}
+
+
+def product_result(values, row, name):
+    count = int(values.get('product.count', 0))
+    avg_price = values.get('product.price_sum', 0) / count if count else 0
+    most_ordered = {'product__id': int(row[0]), 'product__name': name, 'order_count': int(row[1])} if row else None
+    return {'count': count, 'avg_price': round(Decimal(avg_price), 2), 'most_ordered': most_ordered}
+
+
+def order_result(values, row):
+    top_customer = {'customer__first_name': row[0], 'order_count': int(row[1])} if row else None
+    return {'count': int(values.get('order.count', 0)), 'total_sum': values.get('order.total_sum', 0), 'topCustomer': top_customer}
+
+
+def customer_result(values):
+    total_users = int(values.get('user.count', 0))
+    total_admins = int(values.get('user.admins', 0))
+    return {'count': total_users, 'count_admins': total_admins, 'count_users': total_users - total_admins}
+
+
+def category_stats():
+    values = read('category', 'category.count')
+    return category_result(values, name_of(Category, top('category.products')))
+
+
+def store_stats():
+    values = read('store', 'store.count')
+    return store_result(values, name_of(Store, top('store.orders')))
+
+
+def product_stats():
+    values = read('product', 'product.count', 'product.price_sum')
+    row = positive_top('product.orders')
+    return product_result(values, row, name_of(Product, row))
+
+
+def order_stats():
+    return order_result(read('order', 'order.count', 'order.total_sum'), positive_top('customer.orders'))
+
+
+def customer_stats():
+    return customer_result(read('customer', 'user.count', 'user.admins'))
+
+
+async def acategory_stats():
+    values, row = await aread_top('category', ('category.count',), 'category.products')
+    return category_result(values, await aname_of(Category, row))
+
+
+async def astore_stats():
+    values, row = await aread_top('store', ('store.count',), 'store.orders')
+    return store_result(values, await aname_of(Store, row))
+
+
+async def aproduct_stats():
+    values, row = await aread_top('product', ('product.count', 'product.price_sum'), 'product.orders')
+    row = positive(row)
+    return product_result(values, row, await aname_of(Product, row))
+
+
+async def aorder_stats():
+    values, row = await aread_top('order', ('order.count', 'order.total_sum'), 'customer.orders')
+    return order_result(values, positive(row))
+
+
+async def acustomer_stats():
+    values, _ = await aread_top('customer', ('user.count', 'user.admins'))
+    return customer_result(values)
+
+
+track(Product, 'price', 'category_id', 'store_id')
+track(Order, 'total_price', 'product_id', 'customer_id')
+track(Customer, 'first_name')
+track(User, 'is_superuser')
+
+
+def product_store(product_id):
+    return Product.objects.filter(pk=product_id).values_list('store_id', flat=True).first()
+
+
+def customer_name(customer_id):
+    return Customer.objects.filter(pk=customer_id).values_list('first_name', flat=True).first()
+
+
+def count_order(order, sign, product_id=None, customer_id=None):
+    product_id = product_id or order.product_id
+    customer_id = customer_id or order.customer_id
+    if product_id == order.product_id and 'product' in order._state.fields_cache:
+        store_id = order.product.store_id
+    else:
+        store_id = product_store(product_id)
+    if customer_id == order.customer_id and 'customer' in order._state.fields_cache:
+        first_name = order.customer.first_name
+    else:
+        first_name = customer_name(customer_id)
+    add('product.orders', sign, product_id)
+    add('store.orders', sign, store_id)
+    add('customer.orders', sign, first_name)
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        add('product.count', 1)
+        add('product.price_sum', Decimal(instance.price))
+        add('category.products', 1, instance.category_id)
+        return
+    old = previous(instance)
+    if old is None:
+        return
+    add('product.price_sum', Decimal(instance.price) - old['price'])
+    if old['category_id'] != instance.category_id:
+        add('category.products', -1, old['category_id'])
+        add('category.products', 1, instance.category_id)
+    if old['store_id'] != instance.store_id:
+        mark_dirty('store')
+
+
+@receiver(post_save, sender=Order)
+def order_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        add('order.count', 1)
+        add('order.total_sum', Decimal(instance.total_price))
+        count_order(instance, 1)
+        return
+    old = previous(instance)
+    if old is None:
+        return
+    add('order.total_sum', Decimal(instance.total_price) - old['total_price'])
+    if old['product_id'] != instance.product_id or old['customer_id'] != instance.customer_id:
+        count_order(instance, -1, product_id=old['product_id'], customer_id=old['customer_id'])
+        count_order(instance, 1)
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        add('category.count', 1)
+        StatCounter.objects.get_or_create(name='category.products', key=str(instance.pk))
+
+
+@receiver(post_save, sender=Store)
+def store_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        add('store.count', 1)
+        StatCounter.objects.get_or_create(name='store.orders', key=str(instance.pk))
+
+
+@receiver(post_save, sender=Customer)
+def customer_saved(sender, instance, created, raw=False, **kwargs):
+    old = previous(instance)
+    if not created and old is not None and old['first_name'] != instance.first_name:
+        mark_dirty('order')
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        add('user.count', 1)
+        add('user.admins', int(instance.is_superuser))
+        return
+    old = previous(instance)
+    if old is not None and old['is_superuser'] != instance.is_superuser:
+        add('user.admins', 1 if instance.is_superuser else -1)
+
+
+@receiver(post_delete)
+def instance_deleted(sender, instance, origin=None, **kwargs):
+    if sender not in AFFECTED_FAMILIES:
+        return
+    if origin is not instance:
+        # Каскад или удаление queryset: инкрементально не считаем
+        mark_dirty(*AFFECTED_FAMILIES[sender])
+        return
+    if sender is Product:
+        add('product.count', -1)
+        add('product.price_sum', -instance.price)
+        add('category.products', -1, instance.category_id)
+        StatCounter.objects.filter(name='product.orders', key=str(instance.pk)).delete()
+    elif sender is Order:
+        add('order.count', -1)
+        add('order.total_sum', -instance.total_price)
+        count_order(instance, -1)
+    elif sender is Category:
+        add('category.count', -1)
+        StatCounter.objects.filter(name='category.products', key=str(instance.pk)).delete()
+    elif sender is Store:
+        add('store.count', -1)
+        StatCounter.objects.filter(name='store.orders', key=str(instance.pk)).delete()
+    elif sender is User:
+        add('user.count', -1)
+        add('user.admins', -int(instance.is_superuser))
+    elif sender is Customer:
+        mark_dirty('order')
+
+
+@receiver(bulk_changed)
+def bulk_change(sender, **kwargs):
+    if sender in AFFECTED_FAMILIES:
+        mark_dirty(*AFFECTED_FAMILIES[sender])
@@ -0,0 +1,60 @@
+"""
+Хранилище фотографий по содержимому: файл сохраняется под именем
+blobs/<первые 2 символа>/<sha256>.<расширение>, поэтому одинаковые загрузки
+ложатся в один файл, а имя меняется вместе с содержимым (его можно кэшировать
+навсегда). Учёт ссылок и удаление ненужных файлов — в wardrobe.media.
+"""
+import hashlib
+import os
+import tempfile
+from pathlib import PurePosixPath
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+BLOB_DIR = 'blobs'
+
+
+def blob_name(digest, extension):
+    return f'{BLOB_DIR}/{digest[:2]}/{digest}{extension}'
+
+
+def is_blob(name):
+    return bool(name) and name.startswith(f'{BLOB_DIR}/')
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    def get_available_name(self, name, max_length=None):
+        # Имя определяется содержимым в _save, переданное не используется
+        return name
+
+    def _save(self, name, content):
+        directory = self.path(BLOB_DIR)
+        os.makedirs(directory, exist_ok=True)
+        digest = hashlib.sha256()
+        # Хэш считается в том же проходе, что и запись во временный файл
+        with tempfile.NamedTemporaryFile(dir=directory, prefix='.upload-', delete=False) as temporary:
+            if hasattr(content, 'seek'):
+                content.seek(0)
+            for chunk in content.chunks():
+                digest.update(chunk)
+                temporary.write(chunk)
+        name = blob_name(digest.hexdigest(), PurePosixPath(name).suffix.lower())
+        path = self.path(name)
+        try:
+            if os.path.exists(path):
+                # Свежее время изменения защищает файл от сборки мусора, пока
+                # ссылка на него ещё не сохранена (wardrobe.media.GC_GRACE_SECONDS)
+                os.utime(path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.chmod(temporary.name, self.file_permissions_mode or 0o644)
+                os.replace(temporary.name, path)
+        finally:
+            if os.path.exists(temporary.name):
+                os.unlink(temporary.name)
+        return name
+
+
+blob_storage = ContentAddressedStorage()
@@ -0,0 +1,76 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from wardrobe.models import Category, Store, Product, Customer, Order
+
+
+class AnalyticsTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="admin", password="password123")
+        self.client.force_authenticate(self.user)
+        self.shoes = Category.objects.create(name="Обувь")
+        self.hats = Category.objects.create(name="Шапки")
+        store = Store.objects.create(name="Store1", address="Address1")
+        customer = Customer.objects.create(first_name="Ivan", store=store)
+        self.boots = Product.objects.create(name="Boots", category=self.shoes, store=store, size="M", price=10, quantity=5)
+        self.sneakers = Product.objects.create(name="Sneakers", category=self.shoes, store=store, size="L", price=50, quantity=0)
+        self.hat = Product.objects.create(name="Hat", category=self.hats, store=store, size="S", price=5, quantity=10)
+        today = timezone.localdate()
+        for product, quantity, status, age in [
+            (self.boots, 3, "sold", 1), (self.boots, 2, "pending", 40), (self.sneakers, 1, "sold", 2),
+            (self.hat, 1, "cancelled", 3), (self.hat, 2, "sold", 5),
+        ]:
+            Order.objects.create(product=product, customer=customer, quantity=quantity, status=status,
+                                 total_price=product.price * quantity, order_date=today - datetime.timedelta(days=age))
+
+    def get(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_inventory(self):
+        rows = {row["name"]: row for row in self.get("/api/products/inventory/")["results"]}
+        self.assertEqual(rows["Boots"], {"id": self.boots.id, "name": "Boots", "stock": 5, "units_sold": 3,
+                                         "sell_through": 0.375, "days_of_stock": 50.0})
+        self.assertEqual((rows["Sneakers"]["sell_through"], rows["Sneakers"]["days_of_stock"]), (1.0, 0.0))
+        self.assertEqual((rows["Hat"]["sell_through"], rows["Hat"]["days_of_stock"]), (0.1667, 150.0))
+        rows = self.get("/api/products/inventory/", days=90, category=self.shoes.id)["results"]
+        self.assertEqual([row["units_sold"] for row in rows], [5, 1])
+        self.assertEqual(self.client.get("/api/products/inventory/", {"days": "-1"}).status_code, 400)
+
+    def test_abc(self):
+        data = self.get("/api/products/abc/")
+        self.assertEqual([(row["name"], row["class"], row["revenue"]) for row in data["results"]],
+                         [("Boots", "A", 50.0), ("Sneakers", "A", 50.0), ("Hat", "B", 10.0)])
+        self.assertEqual(data["summary"]["A"], {"count": 2, "revenue": 100.0})
+        self.assertEqual(data["summary"]["C"], {"count": 0, "revenue": 0.0})
+
+    def test_pages(self):
+        data = self.get("/api/products/abc/", limit=2)
+        self.assertEqual(data["count"], 3)
+        self.assertEqual([row["name"] for row in data["results"]], ["Boots", "Sneakers"])
+        self.assertIsNone(data["previous"])
+        # Сводка по классам — по всем товарам, а не по странице
+        self.assertEqual(data["summary"]["B"], {"count": 1, "revenue": 10.0})
+        data = self.client.get(data["next"]).json()
+        self.assertEqual([row["name"] for row in data["results"]], ["Hat"])
+        self.assertIsNone(data["next"])
+        data = self.get("/api/products/inventory/", limit=1, offset=1)
+        self.assertEqual(([row["name"] for row in data["results"]], data["count"]), (["Sneakers"], 3))
+        self.assertIsNotNone(data["next"])
+
+    def test_size_curve(self):
+        rows = self.get("/api/products/size-curve/")["results"]
+        shoes = rows[0]
+        self.assertEqual((shoes["category_name"], shoes["units"]), ("Обувь", 6))
+        self.assertEqual({size["size"]: size["share"] for size in shoes["sizes"] if size["units"]}, {"M": 0.8333, "L": 0.1667})
+        self.assertEqual(rows[1]["sizes"][1], {"size": "S", "units": 2, "share": 1.0})
+
+    def test_benchmark_matches_naive_loop(self):
+        call_command("benchmark_analytics", orders=3000, products=100, stdout=open("/dev/null", "w"))
+        self.assertEqual(Order.objects.count(), 5)
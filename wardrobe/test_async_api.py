@@ -0,0 +1,73 @@
+import datetime
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.test import AsyncClient, TestCase, override_settings
+from rest_framework.test import APIClient
+from wardrobe.models import Category, Store, Product, Customer
+from wardrobe.orders import place_order
+from wardrobe.pagination import KeysetPagination
+
+
+@override_settings(ROOT_URLCONF="app.asgi_urls")
+class AsyncApiTestCase(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user = User.objects.create_user(username="admin", password="password123")
+            category = Category.objects.create(name="Обувь")
+            store = Store.objects.create(name="Store1", address="Address1")
+            customer = Customer.objects.create(first_name="Ivan", store=store)
+            products = [Product.objects.create(name=f"Boots {i}", category=category, store=store, price=10 + i, quantity=50) for i in range(7)]
+            for i, product in enumerate(products):
+                place_order(product, quantity=1 + i % 2, customer=customer, order_date=datetime.date(2025, 1, 1 + i))
+        # Тот же запрос через DRF под WSGI — эталон для сравнения ответов
+        self.sync_client = APIClient()
+        self.sync_client.force_authenticate(self.user)
+
+    async def get(self, url, params=None, **headers):
+        client = AsyncClient()
+        await client.aforce_login(self.user)
+        return await client.get(url, params or {}, headers=headers)
+
+    def sync_get(self, url, params=None):
+        with override_settings(ROOT_URLCONF="app.urls"):
+            return self.sync_client.get(url, params or {})
+
+    async def test_lists_and_stats_match_drf(self):
+        cases = [
+            ("/api/products/", {"page_size": 3}), ("/api/products/", {"page_size": 3, "ordering": "-price"}),
+            ("/api/products/", {"price_min": "12", "search": "Boots"}), ("/api/orders/", {"page_size": 2}),
+            ("/api/products/stats/", None), ("/api/orders/stats/", None), ("/api/categories/stats/", None),
+            ("/api/stores/stats/", None), ("/api/customers/stats/", None),
+        ]
+        for url, params in cases:
+            expected = await sync_to_async(self.sync_get)(url, params)
+            # Асинхронный путь не должен обращаться к синхронной пагинации DRF
+            with mock.patch.object(KeysetPagination, "paginate_queryset", side_effect=AssertionError):
+                response = await self.get(url, params)
+            self.assertEqual(response.status_code, 200, url)
+            self.assertEqual(response.json(), expected.json(), url)
+            self.assertEqual(response.headers["ETag"], expected.headers["ETag"], url)
+
+    async def test_cursor_pages_cover_all_rows(self):
+        ids, url, params = [], "/api/orders/", {"page_size": 3}
+        while url:
+            data = (await self.get(url, params)).json()
+            ids += [row["order_id"] for row in data["results"]]
+            url, params = data["next"], None
+        self.assertEqual(len(ids), 7)
+        self.assertEqual(ids, sorted(ids))
+
+    async def test_not_modified_and_auth(self):
+        response = await self.get("/api/products/")
+        self.assertEqual((await self.get("/api/products/", If_None_Match=response.headers["ETag"])).status_code, 304)
+        self.assertEqual((await AsyncClient().get("/api/products/")).status_code, 403)
+        info = (await AsyncClient().get("/api/userprofile/info/")).json()
+        self.assertFalse(info["is_authenticated"])
+        self.assertEqual((await self.get("/api/userprofile/info/")).json()["username"], "admin")
+
+    async def test_other_requests_fall_back_to_drf(self):
+        response = await self.get("/api/products/", {"limit": 2})
+        self.assertEqual(response.json()["count"], 7)
+        self.assertEqual((await self.get("/api/products/", {"price_min": "abc"})).status_code, 400)
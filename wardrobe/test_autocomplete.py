@@ -0,0 +1,68 @@
+import timeit
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+from wardrobe import autocomplete
+from wardrobe.autocomplete import PrefixIndex
+from wardrobe.models import Category, Store, Product
+
+
+class AutocompleteTestCase(TestCase):
+    def setUp(self):
+        # Индексы живут в процессе, а данные каждого теста откатываются
+        for index in autocomplete.INDEXES.values():
+            index.invalidate()
+        self.client = APIClient()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user = User.objects.create_user(username="admin", password="password123", first_name="Ирина")
+            category = Category.objects.create(name="Обувь")
+            self.store = Store.objects.create(name="Центральный", address="Address1")
+            self.other = Store.objects.create(name="Северный", address="Address2")
+            self.boots = Product.objects.create(name="Ботинки зимние", category=category, store=self.store, price=10)
+            Product.objects.create(name="Ёлочная игрушка", category=category, store=self.store, price=1)
+            Product.objects.create(name="Зимняя шапка", category=category, store=self.other, price=5)
+        self.client.force_authenticate(self.user)
+
+    def names(self, url, q, **params):
+        response = self.client.get(url, {"q": q, **params})
+        self.assertEqual(response.status_code, 200)
+        return [row["name"] for row in response.json()["results"]]
+
+    def test_prefix_word_and_group(self):
+        self.assertEqual(self.names("/api/products/autocomplete/", "бот"), ["Ботинки зимние"])
+        self.assertEqual(self.names("/api/products/autocomplete/", "ЗИМ"), ["Ботинки зимние", "Зимняя шапка"])
+        self.assertEqual(self.names("/api/products/autocomplete/", "ботинки зи"), ["Ботинки зимние"])
+        self.assertEqual(self.names("/api/products/autocomplete/", "елоч"), ["Ёлочная игрушка"])
+        self.assertEqual(self.names("/api/products/autocomplete/", "зим", store=self.other.id), ["Зимняя шапка"])
+        self.assertEqual(self.names("/api/products/autocomplete/", "зим", limit=1), ["Ботинки зимние"])
+        self.assertEqual(self.names("/api/stores/autocomplete/", "сев"), ["Северный"])
+        self.assertEqual(self.names("/api/customers/autocomplete/", "ири"), ["admin"])
+        self.assertEqual(self.names("/api/products/autocomplete/", ""), [])
+
+    def test_changes_invalidate_after_commit(self):
+        self.assertEqual(self.names("/api/products/autocomplete/", "сапог"), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.boots.name = "Сапоги"
+            self.boots.save()
+        self.assertEqual(self.names("/api/products/autocomplete/", "сапог"), ["Сапоги"])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other.delete()
+        self.assertEqual(self.names("/api/stores/autocomplete/", "сев"), [])
+        self.assertEqual(self.names("/api/products/autocomplete/", "шап"), [])
+
+    def test_unrelated_saves_keep_index(self):
+        self.names("/api/products/autocomplete/", "бот")
+        index = autocomplete.INDEXES["product"].index
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.boots.price = 12
+            self.boots.save()
+            self.user.save(update_fields=["last_login"])
+        self.assertFalse(any(isinstance(callback, autocomplete.PendingInvalidate) for callback in callbacks))
+        self.assertIs(autocomplete.INDEXES["product"].index, index)
+
+    def test_lookup_is_fast(self):
+        index = PrefixIndex((pk, f"Товар {pk} модель {pk * 7}", f"Товар {pk} модель {pk * 7}", pk % 10) for pk in range(1, 100001))
+        self.assertEqual(len(index.lookup("модель 7", 5)), 5)
+        seconds = min(timeit.repeat(lambda: index.lookup("товар 123", 10), number=100, repeat=3)) / 100
+        self.assertLess(seconds, 0.001)
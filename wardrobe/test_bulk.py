@@ -0,0 +1,77 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from wardrobe.models import Category, Store, Product, Customer, Order
+
+
+class BulkTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="admin", password="password123")
+        self.client.force_authenticate(self.user)
+        self.category = Category.objects.create(name="Cat")
+        self.store = Store.objects.create(name="Store", address="Address")
+        self.customer = Customer.objects.create(first_name="Ivan", store=self.store)
+
+    def product_item(self, i):
+        return {"name": f"SKU {i}", "category": self.category.id, "store": self.store.id, "price": "9.99", "quantity": 5}
+
+    def test_bulk_create_products_in_constant_queries(self):
+        items = [self.product_item(i) for i in range(2000)]
+        items[3]["category"] = 999999
+        # Строковый pk сериализатор принимает так же, как в обычном POST
+        items[5]["category"] = str(self.category.id)
+        items[7]["price"] = "abc"
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post("/api/products/bulk/", items, format="json")
+        self.assertEqual(response.status_code, 207)
+        data = response.json()
+        self.assertEqual(len(data["created"]), 1998)
+        self.assertEqual([error["index"] for error in data["errors"]], [3, 7])
+        self.assertIn("category", data["errors"][0]["errors"])
+        self.assertEqual(Product.objects.count(), 1998)
+        # SQLite ограничивает число параметров, поэтому INSERT идёт пачками по ~100 строк
+        # (товары и записи журнала изменений)
+        self.assertLess(len(ctx.captured_queries), 40)
+
+    def test_bulk_update_and_delete_products(self):
+        products = Product.objects.bulk_create([Product(name=f"P{i}", category=self.category, store=self.store) for i in range(3)])
+        response = self.client.patch("/api/products/bulk/", [
+            {"id": products[0].id, "price": "5.00"},
+            {"id": str(products[1].id), "quantity": 7},
+            {"id": 999999, "name": "missing"},
+        ], format="json")
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(str(Product.objects.get(pk=products[0].id).price), "5.00")
+        self.assertEqual(Product.objects.get(pk=products[1].id).quantity, 7)
+        self.assertEqual(response.json()["errors"][0]["index"], 2)
+
+        response = self.client.delete("/api/products/bulk/", {"ids": [products[0].id, str(products[1].id)]}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(Product.objects.values_list("id", flat=True)), [products[2].id])
+
+    def test_bulk_orders_respect_stock(self):
+        product = Product.objects.create(name="Boots", category=self.category, store=self.store, price=10, quantity=5)
+        item = {"product": product.id, "customer": self.customer.id, "order_date": "2025-01-01", "quantity": 2}
+        response = self.client.post("/api/orders/bulk/", [item, item, item], format="json")
+        self.assertEqual(response.status_code, 207)
+        data = response.json()
+        self.assertEqual(len(data["created"]), 2)
+        self.assertEqual(data["errors"][0]["index"], 2)
+        self.assertEqual(Product.objects.get(pk=product.pk).quantity, 1)
+        self.assertEqual(sorted(Order.objects.values_list("total_price", flat=True)), [20, 20])
+
+        first, second = [created["id"] for created in data["created"]]
+        response = self.client.patch("/api/orders/bulk/", [
+            {"order_id": first, "status": "cancelled"},
+            {"order_id": second, "quantity": 3},
+        ], format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Product.objects.get(pk=product.pk).quantity, 2)
+
+        response = self.client.delete("/api/orders/bulk/", {"ids": [first, second]}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Product.objects.get(pk=product.pk).quantity, 5)
+        self.assertFalse(Order.objects.exists())
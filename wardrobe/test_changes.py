@@ -0,0 +1,83 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from wardrobe.models import Category, Store, Product, Customer, ChangeLog
+
+
+class ChangesTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="admin", password="password123")
+        self.client.force_authenticate(self.user)
+        self.category = Category.objects.create(name="Обувь")
+        self.store = Store.objects.create(name="Store1", address="Address1")
+        self.customer = Customer.objects.create(first_name="Ivan", store=self.store)
+        self.boots = Product.objects.create(name="Boots", category=self.category, store=self.store, price=10, quantity=5)
+        self.hat = Product.objects.create(name="Hat", category=self.category, store=self.store, price=5, quantity=5)
+
+    def changes(self, url, since=None, **params):
+        if since is not None:
+            params["since"] = since
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_returns_only_changes_since_token(self):
+        data = self.changes("/api/products/changes/")
+        self.assertEqual([row["name"] for row in data["upserts"]], ["Boots", "Hat"])
+        self.assertFalse(data["has_more"])
+        token = data["next"]
+        self.assertEqual(self.changes("/api/products/changes/", token)["upserts"], [])
+
+        self.client.patch(f"/api/products/{self.boots.id}/", {"price": "12.00"})
+        self.client.delete(f"/api/products/{self.hat.id}/")
+        data = self.changes("/api/products/changes/", token)
+        self.assertEqual([row["price"] for row in data["upserts"]], ["12.00"])
+        self.assertEqual(data["deleted"], [self.hat.id])
+        # В журнале по одной записи на объект
+        self.assertEqual(ChangeLog.objects.filter(resource="product").count(), 2)
+
+        token = data["next"]
+        response = self.client.post("/api/orders/", {"product": self.boots.id, "customer": self.customer.id, "order_date": "2025-01-01"})
+        self.assertEqual(response.status_code, 201)
+        data = self.changes("/api/products/changes/", token)
+        self.assertEqual([(row["id"], row["quantity"]) for row in data["upserts"]], [(self.boots.id, 4)])
+        self.assertGreater(data["upserts"][0]["updated_at"], self.boots.updated_at.isoformat().replace("+00:00", "Z"))
+        self.assertEqual(len(self.changes("/api/orders/changes/", token)["upserts"]), 1)
+
+    def test_keyset_pages_and_bulk_changes(self):
+        token = self.changes("/api/products/changes/")["next"]
+        items = [{"name": f"SKU {i}", "category": self.category.id, "store": self.store.id, "price": "1.00"} for i in range(1200)]
+        self.client.post("/api/products/bulk/", items, format="json")
+        seen, pages = [], 0
+        while True:
+            with CaptureQueriesContext(connection) as ctx:
+                data = self.changes("/api/products/changes/", token, page_size=500)
+            self.assertLessEqual(len(ctx.captured_queries), 2)
+            seen += [row["name"] for row in data["upserts"]]
+            token = data["next"]
+            pages += 1
+            if not data["has_more"]:
+                break
+        self.assertEqual(pages, 3)
+        self.assertEqual(seen, [f"SKU {i}" for i in range(1200)])
+
+        before = Product.objects.get(name="SKU 0").updated_at
+        self.client.patch("/api/products/bulk/", [{"id": Product.objects.get(name="SKU 0").id, "price": "2.00"}], format="json")
+        data = self.changes("/api/products/changes/", token)
+        self.assertEqual([row["name"] for row in data["upserts"]], ["SKU 0"])
+        self.assertGreater(Product.objects.get(name="SKU 0").updated_at, before)
+
+    def test_customers_and_invalid_token(self):
+        token = self.changes("/api/customers/changes/")["next"]
+        other = User.objects.create_user(username="user", password="password123")
+        other.profile.age = 30
+        other.profile.save()
+        data = self.changes("/api/customers/changes/", token)
+        self.assertEqual([(row["username"], row["age"]) for row in data["upserts"]], [("user", 30)])
+        other_id = other.id
+        other.delete()
+        self.assertEqual(self.changes("/api/customers/changes/", data["next"])["deleted"], [other_id])
+        self.assertEqual(self.client.get("/api/products/changes/", {"since": "abc"}).status_code, 400)
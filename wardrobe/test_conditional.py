@@ -0,0 +1,62 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+from wardrobe.models import Category, Customer, Order, Store, Product
+
+
+class ConditionalGetTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="admin", password="password123")
+        self.client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category = Category.objects.create(name="Обувь")
+            self.store = Store.objects.create(name="Store1", address="Address1")
+            self.product = Product.objects.create(name="Boots", category=self.category, store=self.store, price=10)
+
+    def test_list_detail_and_stats_return_304_until_changed(self):
+        for url in ["/api/products/", f"/api/products/{self.product.id}/", "/api/products/stats/", "/api/categories/stats/"]:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            etag = response.headers["ETag"]
+            self.assertIn("no-cache", response.headers["Cache-Control"])
+            # Только запрос версий: ни выборки данных, ни агрегатов
+            with self.assertNumQueries(1):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304, url)
+            self.assertEqual(response.headers["ETag"], etag)
+            self.assertEqual(response.content, b"")
+
+        etag = self.client.get("/api/products/").headers["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f"/api/products/{self.product.id}/", {"price": "12.00"})
+        response = self.client.get("/api/products/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_related_resource_changes_invalidate(self):
+        etag = self.client.get("/api/products/").headers["ETag"]
+        stores_etag = self.client.get("/api/stores/").headers["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.filter(pk=self.category.pk).get().save()
+        self.assertEqual(self.client.get("/api/products/", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertEqual(self.client.get("/api/stores/", HTTP_IF_NONE_MATCH=stores_etag).status_code, 304)
+
+    def test_store_rename_invalidates_orders(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            customer = Customer.objects.create(first_name="Ivan", store=self.store)
+            Order.objects.create(product=self.product, customer=customer, order_date=datetime.date(2025, 1, 1), total_price=10)
+        etag = self.client.get("/api/orders/").headers["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f"/api/stores/{self.store.id}/", {"name": "Store2"})
+        response = self.client.get("/api/orders/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"][0]["store_name"], "Store2")
+
+    def test_last_modified(self):
+        response = self.client.get("/api/categories/")
+        last_modified = response.headers["Last-Modified"]
+        self.assertEqual(self.client.get("/api/categories/", HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+        self.assertNotIn("ETag", self.client.post("/api/categories/", {"name": "Шапки"}).headers)
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import tracemalloc
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.test import AsyncClient, SimpleTestCase, TestCase
+from wardrobe import events
+from wardrobe.models import Category, Store, Product
+
+
+class BrokerTestCase(SimpleTestCase):
+    async def test_publish_from_other_thread(self):
+        subscriber = events.broker.subscribe(["order"])
+        try:
+            thread = threading.Thread(target=events.broker.publish, args=({"type": "change", "resource": "order", "ids": [1], "deleted": []},))
+            thread.start()
+            thread.join()
+            event = await asyncio.wait_for(subscriber.queue.get(), 1)
+            self.assertEqual(event["ids"], [1])
+        finally:
+            events.broker.unsubscribe(subscriber)
+
+    async def test_filters_by_resource(self):
+        subscriber = events.broker.subscribe(["stock"])
+        try:
+            events.broker.publish({"type": "change", "resource": "order", "ids": [1], "deleted": []})
+            events.broker.publish({"type": "change", "resource": "stock", "ids": [2], "deleted": []})
+            event = await asyncio.wait_for(subscriber.queue.get(), 1)
+            self.assertEqual((event["resource"], event["ids"]), ("stock", [2]))
+            self.assertTrue(subscriber.queue.empty())
+        finally:
+            events.broker.unsubscribe(subscriber)
+
+    async def test_slow_subscriber_gets_resync(self):
+        subscriber = events.broker.subscribe(["order"], queue_size=3)
+        try:
+            for pk in range(10):
+                events.broker.publish({"type": "change", "resource": "order", "ids": [pk], "deleted": []})
+            await asyncio.sleep(0)
+            # Переполненная очередь не растёт: вместо пропущенных событий — resync
+            self.assertLessEqual(subscriber.queue.qsize(), 3)
+            received = [subscriber.queue.get_nowait() for _ in range(subscriber.queue.qsize())]
+            self.assertIn({"type": "resync"}, received)
+        finally:
+            events.broker.unsubscribe(subscriber)
+
+    async def test_stream_heartbeat_and_unsubscribe(self):
+        subscriber = events.broker.subscribe(["order"])
+        stream = events.stream(subscriber, heartbeat=0.01)
+        self.assertTrue((await anext(stream)).startswith("retry:"))
+        self.assertEqual(await anext(stream), ": ping\n\n")
+        await stream.aclose()
+        self.assertEqual(events.broker.count(), 0)
+
+    async def test_many_idle_subscribers_are_cheap(self):
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        subscribers = [events.broker.subscribe(["product"]) for _ in range(2000)]
+        per_subscriber = (tracemalloc.get_traced_memory()[0] - before) / len(subscribers)
+        tracemalloc.stop()
+        try:
+            events.broker.publish({"type": "change", "resource": "product", "ids": [1], "deleted": []})
+            await asyncio.sleep(0)
+            self.assertTrue(all(subscriber.queue.qsize() == 1 for subscriber in subscribers))
+            self.assertLess(per_subscriber, 4096)
+        finally:
+            for subscriber in subscribers:
+                events.broker.unsubscribe(subscriber)
+        self.assertEqual(events.broker.count(), 0)
+
+
+class ChangeEventsTestCase(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user = User.objects.create_user(username="admin", password="password123")
+            self.category = Category.objects.create(name="Обувь")
+            self.store = Store.objects.create(name="Store1", address="Address1")
+
+    def create_product(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Product.objects.create(name="Boots", category=self.category, store=self.store, price=10, quantity=5)
+
+    async def test_saved_product_is_published_after_commit(self):
+        subscriber = events.broker.subscribe(["product"])
+        try:
+            product = await sync_to_async(self.create_product)()
+            event = await asyncio.wait_for(subscriber.queue.get(), 1)
+            self.assertEqual(event, {"type": "change", "resource": "product", "ids": [product.id], "deleted": []})
+        finally:
+            events.broker.unsubscribe(subscriber)
+
+    async def test_stream_endpoint(self):
+        client = AsyncClient()
+        await client.aforce_login(self.user)
+        response = await client.get("/api/events/", {"resources": "order,stock"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        content = aiter(response.streaming_content)
+        self.assertTrue((await anext(content)).startswith(b"retry:"))
+        events.broker.publish({"type": "change", "resource": "stock", "ids": [7], "deleted": []})
+        chunk = await asyncio.wait_for(anext(content), 1)
+        self.assertTrue(chunk.startswith(b"event: change\ndata: "))
+        self.assertIn(b'"ids": [7]', chunk)
+        await content.aclose()
+
+    async def test_stream_requires_auth_and_known_resources(self):
+        client = AsyncClient()
+        self.assertEqual((await client.get("/api/events/")).status_code, 403)
+        await client.aforce_login(self.user)
+        self.assertEqual((await client.get("/api/events/", {"resources": "secrets"})).status_code, 400)
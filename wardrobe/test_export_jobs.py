@@ -0,0 +1,76 @@
+import os
+import tempfile
+import time
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+from wardrobe import export_jobs
+from wardrobe.models import Category
+
+
+class ExportJobTestCase(TransactionTestCase):
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media.name, EXPORT_ROOT=os.path.join(self.media.name, "private"))
+        self.settings_override.enable()
+        export_jobs.jobs.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="admin", password="password123", is_superuser=True)
+        self.client.force_authenticate(self.user)
+        Category.objects.create(name="Shoes")
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.media.cleanup()
+
+    def start(self, export_type="excel"):
+        response = self.client.get(f"/api/categories/export/?type={export_type}&mode=async")
+        self.assertEqual(response.status_code, 202)
+        return response.json()
+
+    def wait(self, job_id):
+        for _ in range(100):
+            data = self.client.get(f"/api/categories/export/{job_id}/").json()
+            if data["status"] in ("done", "failed"):
+                return data
+            time.sleep(0.05)
+        self.fail("export job did not finish")
+
+    def test_job_produces_file(self):
+        job = self.wait(self.start()["id"])
+        self.assertEqual(job["status"], "done")
+        self.assertEqual(job["rows"], 1)
+        self.assertTrue(job["url"].endswith(f"/api/categories/export/{job['id']}/download/"))
+        response = self.client.get(job["url"])
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(".xlsx", response["Content-Disposition"])
+        self.assertTrue(b"".join(response.streaming_content).startswith(b"PK"))
+        # Файл лежит вне MEDIA_ROOT и без входа не отдаётся
+        self.assertFalse(os.path.exists(os.path.join(self.media.name, "exports")))
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(job["url"]).status_code, 403)
+
+    def test_finished_jobs_expire(self):
+        job = self.wait(self.start()["id"])
+        with mock.patch.object(export_jobs, "JOB_TTL", -1):
+            self.assertIsNotNone(export_jobs.get_job(job["id"]))
+        self.assertNotIn(job["id"], export_jobs.jobs)
+        # Готовый файл по-прежнему находится на диске
+        self.assertEqual(self.client.get(f"/api/categories/export/{job['id']}/").json()["status"], "done")
+
+    def test_identical_request_reuses_artifact(self):
+        first = self.wait(self.start("csv")["id"])
+        second = self.start("csv")
+        self.assertEqual(second["id"], first["id"])
+        self.assertEqual(second["status"], "done")
+
+    def test_table_change_invalidates_artifact(self):
+        first = self.wait(self.start()["id"])
+        Category.objects.create(name="Shirts")
+        second = self.wait(self.start()["id"])
+        self.assertNotEqual(second["id"], first["id"])
+        self.assertEqual(second["rows"], 2)
+        response = self.client.get(f"/api/categories/export/{first['id']}/")
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,71 @@
+import csv
+import datetime
+import io
+import tracemalloc
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from openpyxl import load_workbook
+from rest_framework.test import APIClient
+from wardrobe.exports import EXPORT_CHUNK_SIZE
+from wardrobe.models import Category, Store, Product, Customer, Order
+
+
+class ExportTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="admin", password="password123", is_superuser=True)
+        self.client.force_authenticate(self.user)
+        self.category = Category.objects.create(name="Обувь", user=self.user)
+        self.store = Store.objects.create(name="Store1", address="Address1")
+        self.product = Product.objects.create(name="Ботинки", category=self.category, store=self.store, price="99.50", quantity=2)
+        self.customer = Customer.objects.create(first_name="Ivan", last_name="Petrov", store=self.store)
+
+    def add_orders(self, count):
+        Order.objects.bulk_create([
+            Order(product=self.product, customer=self.customer, order_date=datetime.date(2025, 1, 1), status="sold", total_price=10)
+            for _ in range(count)
+        ])
+
+    def download(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content)
+
+    def test_xlsx(self):
+        self.add_orders(3)
+        workbook = load_workbook(io.BytesIO(self.download("/api/orders/export/?type=excel")), read_only=True)
+        rows = list(workbook.active.iter_rows(values_only=True))
+        self.assertEqual(rows[0][:3], ("ID", "Product", "Customer"))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[1][1:3], ("Ботинки", "Ivan Petrov"))
+        self.assertEqual(rows[1][5], "Продано")
+
+    def test_csv(self):
+        content = self.download("/api/products/export/?type=csv").decode("utf-8-sig")
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[0], ["ID", "Name", "Category", "Store", "Size", "Price", "Color", "Available"])
+        self.assertEqual(rows[1][1:], ["Ботинки", "Обувь", "Store1", "M", "99.50", "", "Yes"])
+
+    def test_every_export(self):
+        for url in ["/api/categories/", "/api/stores/", "/api/products/", "/api/orders/", "/api/customers/"]:
+            for export_type in ["excel", "csv"]:
+                self.assertTrue(self.download(f"{url}export/?type={export_type}"))
+
+    def peak_memory(self, url):
+        tracemalloc.start()
+        response = self.client.get(url)
+        for _ in response.streaming_content:
+            pass
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak
+
+    def test_memory_does_not_grow_with_rows(self):
+        # Пик памяти ограничен размером чанка выборки, а не числом строк
+        self.add_orders(2 * EXPORT_CHUNK_SIZE)
+        small = {t: self.peak_memory(f"/api/orders/export/?type={t}") for t in ["excel", "csv"]}
+        self.add_orders(6 * EXPORT_CHUNK_SIZE)
+        large = {t: self.peak_memory(f"/api/orders/export/?type={t}") for t in ["excel", "csv"]}
+        for export_type in small:
+            self.assertLess(large[export_type], small[export_type] * 1.2, export_type)
@@ -0,0 +1,70 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from wardrobe.models import Category, Store, Product, Customer, Order, UserProfile
+
+
+class SparseFieldsTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="admin", password="password123", first_name="Ирина")
+        UserProfile.objects.filter(user=self.user).update(age=30)
+        category = Category.objects.create(name="Обувь")
+        store = Store.objects.create(name="Центральный", address="Address1")
+        self.product = Product.objects.create(name="Ботинки", category=category, store=store, price=10, quantity=5,
+                                              description="Тёплые")
+        customer = Customer.objects.create(first_name="Ivan", last_name="Petrov", store=store)
+        Order.objects.create(product=self.product, customer=customer, quantity=1, order_date=datetime.date(2025, 1, 10))
+        self.client.force_authenticate(self.user)
+
+    def get(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        # Последний запрос — выборка страницы
+        return response.json(), queries.captured_queries[-1]["sql"]
+
+    def test_summary_skips_joins_and_columns(self):
+        data, sql = self.get("/api/products/", view="summary")
+        self.assertEqual(data["results"], [{"id": self.product.id, "name": "Ботинки", "store": self.product.store_id,
+                                            "price": "10.00", "quantity": 5}])
+        self.assertNotIn("JOIN", sql)
+        self.assertNotIn("description", sql)
+
+        data, sql = self.get("/api/orders/", view="summary")
+        self.assertEqual(set(data["results"][0]), {"order_id", "product_name", "customer_name", "quantity",
+                                                   "total_price", "status", "order_date"})
+        self.assertNotIn("wardrobe_store", sql)
+        self.assertNotIn("auth_user", sql)
+
+    def test_fields_select_related_only_when_needed(self):
+        data, sql = self.get("/api/products/", fields="id,store_name")
+        self.assertEqual(data["results"], [{"id": self.product.id, "store_name": "Центральный"}])
+        self.assertIn("wardrobe_store", sql)
+        self.assertNotIn("wardrobe_category", sql)
+
+        data, _ = self.get(f"/api/products/{self.product.id}/", fields="name,category_name")
+        self.assertEqual(data, {"name": "Ботинки", "category_name": "Обувь"})
+        data, _ = self.get("/api/customers/", fields="username,age")
+        self.assertEqual(data["results"], [{"username": "admin", "age": 30}])
+        data, _ = self.get("/api/products/search/", q="бот", fields="id")
+        self.assertEqual(data["results"], [{"id": self.product.id}])
+
+    def test_ordering_and_errors(self):
+        Product.objects.create(name="Шапка", category=self.product.category, store=self.product.store, price=5)
+        data, _ = self.get("/api/products/", fields="id", ordering="-price", page_size=1)
+        self.assertEqual(data["results"], [{"id": self.product.id}])
+        # Версии для ETag и страница: цену для курсора не дочитываем отдельным запросом
+        with self.assertNumQueries(2):
+            self.assertEqual(len(self.client.get(data["next"]).json()["results"]), 1)
+
+        self.assertEqual(self.client.get("/api/products/", {"fields": "id,secret"}).status_code, 400)
+        self.assertEqual(self.client.get("/api/products/", {"view": "tiny"}).status_code, 400)
+        # Запись и прочие действия параметры не трогают
+        response = self.client.patch(f"/api/products/{self.product.id}/?fields=id", {"quantity": 7}, format="json")
+        self.assertEqual(response.json()["quantity"], 7)
+        self.assertIn("description", response.json())
@@ -0,0 +1,58 @@
+import datetime
+
+from django.test import TestCase
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from wardrobe.models import Category, Store, Product, Customer, Order
+
+
+class FilterTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="admin", password="password123")
+        self.client.force_authenticate(self.user)
+        self.shoes = Category.objects.create(name="Shoes")
+        self.shirts = Category.objects.create(name="Shirts")
+        self.store = Store.objects.create(name="Store1", address="Address1")
+        self.other_store = Store.objects.create(name="Store2", address="Address2")
+        self.boots = Product.objects.create(name="Boots", category=self.shoes, store=self.store, size="L", price=100, quantity=3)
+        self.sneakers = Product.objects.create(name="Sneakers", category=self.shoes, store=self.other_store, size="M", price=50, quantity=0)
+        self.shirt = Product.objects.create(name="Shirt", category=self.shirts, store=self.store, size="M", price=20, quantity=10)
+        self.customer = Customer.objects.create(first_name="Ivan", store=self.store)
+        self.other_customer = Customer.objects.create(first_name="Petr", store=self.store)
+        Order.objects.create(product=self.boots, customer=self.customer, order_date=datetime.date(2025, 1, 10), status="sold")
+        Order.objects.create(product=self.sneakers, customer=self.customer, order_date=datetime.date(2025, 2, 10), status="pending")
+        Order.objects.create(product=self.shirt, customer=self.other_customer, order_date=datetime.date(2025, 3, 10), status="sold")
+
+    def product_names(self, query):
+        response = self.client.get(f"/api/products/?{query}")
+        self.assertEqual(response.status_code, 200)
+        return sorted(p["name"] for p in response.json()["results"])
+
+    def order_ids(self, query):
+        response = self.client.get(f"/api/orders/?{query}")
+        self.assertEqual(response.status_code, 200)
+        return [o["order_id"] for o in response.json()["results"]]
+
+    def test_product_filters(self):
+        self.assertEqual(self.product_names(f"category={self.shoes.id}"), ["Boots", "Sneakers"])
+        self.assertEqual(self.product_names(f"store={self.store.id}"), ["Boots", "Shirt"])
+        self.assertEqual(self.product_names("size=M"), ["Shirt", "Sneakers"])
+        self.assertEqual(self.product_names("price_min=30&price_max=60"), ["Sneakers"])
+        self.assertEqual(self.product_names("in_stock=true"), ["Boots", "Shirt"])
+        self.assertEqual(self.product_names("in_stock=false"), ["Sneakers"])
+        self.assertEqual(self.product_names("search=sne"), ["Sneakers"])
+
+    def test_product_ordering(self):
+        response = self.client.get("/api/products/?ordering=-price")
+        self.assertEqual([p["name"] for p in response.json()["results"]], ["Boots", "Sneakers", "Shirt"])
+
+    def test_invalid_value(self):
+        response = self.client.get("/api/products/?price_min=abc")
+        self.assertEqual(response.status_code, 400)
+
+    def test_order_filters(self):
+        self.assertEqual(len(self.order_ids("status=sold")), 2)
+        self.assertEqual(len(self.order_ids("date_from=2025-02-01&date_to=2025-03-31")), 2)
+        self.assertEqual(len(self.order_ids(f"customer={self.customer.id}")), 2)
+        self.assertEqual(len(self.order_ids(f"store={self.other_store.id}")), 1)
@@ -0,0 +1,37 @@
+import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import Count, Sum
+from django.test import TestCase
+from django.utils import timezone
+from wardrobe import stats
+from wardrobe.models import ChangeLog, Order, Product, UserProfile, User
+
+
+class GenerateDataTestCase(TestCase):
+    def generate(self, seed):
+        call_command("generate_data", users=3, categories=5, stores=4, products=60, customers=30, orders=2000,
+                     days=120, seed=seed, batch_size=500, stdout=StringIO())
+
+    def test_volumes_and_derived_data(self):
+        self.generate(7)
+        self.assertEqual(Order.objects.count(), 2000)
+        self.assertEqual(UserProfile.objects.count(), User.objects.count())
+        self.assertEqual(ChangeLog.objects.filter(resource="order").count(), 2000)
+        self.assertEqual(stats.order_stats()["total_sum"], Order.objects.aggregate(total=Sum("total_price"))["total"])
+        self.assertEqual(stats.product_stats()["count"], 60)
+        # Популярные товары: на самый продаваемый приходится заметно больше среднего
+        counts = sorted(Order.objects.values("product").annotate(n=Count("order_id")).values_list("n", flat=True))
+        self.assertGreater(counts[-1], 5 * 2000 / 60)
+        old = timezone.localdate() - datetime.timedelta(days=15)
+        self.assertFalse(Order.objects.filter(status="pending", order_date__lt=old).exists())
+        for order in Order.objects.select_related("product")[:50]:
+            self.assertEqual(order.total_price, order.product.price * order.quantity)
+
+    def test_seed_is_reproducible(self):
+        self.generate(7)
+        first = list(Product.objects.order_by("pk").values_list("name", "price", "quantity"))
+        Product.objects.all().delete()
+        self.generate(7)
+        self.assertEqual(list(Product.objects.order_by("pk").values_list("name", "price", "quantity"))[-60:], first)
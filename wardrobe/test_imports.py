@@ -0,0 +1,96 @@
+import csv
+import io
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from openpyxl import Workbook
+from rest_framework.test import APIClient
+from wardrobe.models import Category, Store, Product
+
+PRODUCT_COLUMNS = ["ID", "Name", "Category", "Store", "Size", "Price", "Color", "Available"]
+
+
+class ImportTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="admin", password="password123", is_superuser=True)
+        self.client.force_authenticate(self.user)
+        self.category = Category.objects.create(name="Обувь")
+        self.store = Store.objects.create(name="Store1", address="Address1")
+
+    def csv_file(self, rows):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return SimpleUploadedFile("products.csv", buffer.getvalue().encode("utf-8-sig"), content_type="text/csv")
+
+    def xlsx_file(self, rows):
+        workbook = Workbook()
+        for row in rows:
+            workbook.active.append(row)
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+        return SimpleUploadedFile("products.xlsx", buffer.getvalue())
+
+    def upload(self, url, upload):
+        return self.client.post(url, {"file": upload}, format="multipart")
+
+    def test_export_round_trip_updates_rows(self):
+        product = Product.objects.create(name="Boots", category=self.category, store=self.store, price=10, quantity=3, description="Leather")
+        exported = b"".join(self.client.get("/api/products/export/?type=csv").streaming_content)
+        rows = list(csv.reader(io.StringIO(exported.decode("utf-8-sig"))))
+        rows[1][1] = "Winter boots"
+        rows[1][5] = "12.50"
+        response = self.upload("/api/products/import/", self.csv_file(rows))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["updated"], 1)
+        product.refresh_from_db()
+        self.assertEqual(product.name, "Winter boots")
+        self.assertEqual(str(product.price), "12.50")
+        self.assertEqual(product.description, "Leather")
+        self.assertEqual(product.quantity, 3)
+
+    def test_xlsx_import_creates_rows_and_reports_errors(self):
+        rows = [PRODUCT_COLUMNS]
+        rows += [[None, f"SKU {i}", "Обувь", "Store1", "M", 9.99, "red", "Yes"] for i in range(2500)]
+        rows.append([None, "Bad", "Нет такой", "Store1", "M", 1, None, "Yes"])
+        rows.append([None, "Bad size", "Обувь", "Store1", "XXXL", 1, None, "Yes"])
+        response = self.upload("/api/products/import/", self.xlsx_file(rows))
+        self.assertEqual(response.status_code, 207)
+        report = response.json()
+        self.assertEqual(report["created"], 2500)
+        self.assertEqual(report["error_count"], 2)
+        self.assertEqual([error["row"] for error in report["errors"]], [2502, 2503])
+        self.assertIn("category", report["errors"][0]["errors"])
+        self.assertIn("size", report["errors"][1]["errors"])
+        self.assertEqual(Product.objects.filter(category=self.category).count(), 2500)
+
+    def test_batches_commit_separately(self):
+        rows = [PRODUCT_COLUMNS] + [[None, f"SKU {i}", "Обувь", "Store1", "M", 1, None, "Yes"] for i in range(2500)]
+        # Сбой на второй пачке не откатывает первую
+        with mock.patch("wardrobe.imports.notify_bulk_change", side_effect=[None, RuntimeError]):
+            with self.assertRaises(RuntimeError):
+                self.upload("/api/products/import/", self.csv_file(rows))
+        self.assertEqual(Product.objects.count(), 1000)
+
+    def test_dry_run_does_not_write(self):
+        rows = [PRODUCT_COLUMNS, ["", "Boots", "Обувь", "Store1", "L", "5", "", "Yes"]]
+        response = self.upload("/api/products/import/?dry_run=1", self.csv_file(rows))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["created"], 1)
+        self.assertFalse(Product.objects.exists())
+
+    def test_missing_columns(self):
+        response = self.upload("/api/products/import/", self.csv_file([["ID", "Name"], ["", "Boots"]]))
+        self.assertEqual(response.status_code, 400)
+
+    def test_categories_and_stores(self):
+        response = self.upload("/api/categories/import/", self.csv_file([["ID", "Name", "User"], ["", "Сумки", "admin"]]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Category.objects.get(name="Сумки").user, self.user)
+        rows = [["ID", "Name", "Address", "User"], [self.store.id, "Store1", "New address", ""]]
+        response = self.upload("/api/stores/import/", self.csv_file(rows))
+        self.assertEqual(response.json()["updated"], 1)
+        self.store.refresh_from_db()
+        self.assertEqual(self.store.address, "New address")
@@ -0,0 +1,86 @@
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+from wardrobe.models import Category, Store, Product, MediaBlob
+
+
+def upload(name, color="red"):
+    buffer = BytesIO()
+    Image.new("RGB", (40, 30), color).save(buffer, "PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+
+class MediaTestCase(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.settings = override_settings(MEDIA_ROOT=self.media)
+        self.settings.enable()
+        self.user = User.objects.create_user(username="admin", password="password123")
+        self.category = Category.objects.create(name="Обувь")
+        self.store = Store.objects.create(name="Центральный", address="Address1")
+
+    def tearDown(self):
+        self.settings.disable()
+        shutil.rmtree(self.media)
+
+    def product(self, image):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Product.objects.create(name="Ботинки", category=self.category, store=self.store, image=image)
+
+    def age(self, name):
+        # Файл старше GC_GRACE_SECONDS
+        os.utime(os.path.join(self.media, name), (0, 0))
+
+    def test_identical_uploads_share_one_blob(self):
+        first = self.product(upload("boots.png"))
+        second = self.product(upload("Boots copy.PNG"))
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertRegex(first.image.name, r"^blobs/[0-9a-f]{2}/[0-9a-f]{64}\.png$")
+        self.assertEqual(MediaBlob.objects.get(name=first.image.name).refs, 2)
+        self.assertEqual(len(os.listdir(os.path.dirname(first.image.path))), 1)
+
+    def test_released_blob_is_collected(self):
+        first = self.product(upload("boots.png"))
+        second = self.product(upload("boots.png"))
+        name = first.image.name
+        self.age(name)
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(os.path.exists(second.image.path))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.image = upload("other.png", "blue")
+            second.save()
+        self.assertFalse(os.path.exists(os.path.join(self.media, name)))
+        self.assertFalse(MediaBlob.objects.filter(name=name).exists())
+        self.assertEqual(MediaBlob.objects.get(name=second.image.name).refs, 1)
+
+    def test_fresh_reupload_survives_until_collect(self):
+        product = self.product(upload("boots.png"))
+        name = product.image.name
+        with self.captureOnCommitCallbacks(execute=True):
+            product.delete()
+        # Только что записанный файл может быть чужой незавершённой загрузкой
+        self.assertTrue(os.path.exists(os.path.join(self.media, name)))
+        call_command("collect_media", grace=0, stdout=StringIO())
+        self.assertFalse(os.path.exists(os.path.join(self.media, name)))
+
+    def test_collect_media_rehashes_legacy_files(self):
+        for legacy in ("products/bird.png", "products/bird_3xjJMAw.png"):
+            os.makedirs(os.path.join(self.media, "products"), exist_ok=True)
+            with open(os.path.join(self.media, legacy), "wb") as file:
+                file.write(upload("bird.png").read())
+            Product.objects.filter(pk=self.product(None).pk).update(image=legacy)
+        call_command("collect_media", rehash=True, grace=0, stdout=StringIO())
+        names = set(Product.objects.values_list("image", flat=True))
+        self.assertEqual(len(names), 1)
+        self.assertTrue(names.pop().startswith("blobs/"))
+        self.assertEqual(os.listdir(os.path.join(self.media, "products")), [])
+        self.assertEqual(list(MediaBlob.objects.values_list("refs", flat=True)), [2])
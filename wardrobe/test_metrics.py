@@ -0,0 +1,102 @@
+import os
+import pstats
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from wardrobe import metrics
+from wardrobe.models import Category, Store, Product
+
+
+class MetricsTestCase(TestCase):
+    def setUp(self):
+        for metric in metrics.registry:
+            metric.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="admin", password="password123", is_superuser=True, is_staff=True)
+        self.client.force_authenticate(self.user)
+        # /metrics — обычное представление Django: ему нужна сессия
+        self.client.force_login(self.user)
+        category = Category.objects.create(name="Обувь", user=self.user)
+        store = Store.objects.create(name="Store1", address="Address1")
+        for name in ("Ботинки", "Кеды"):
+            Product.objects.create(name=name, category=category, store=store, price="99.50", quantity=2)
+
+    def sample(self, name, **labels):
+        """Значение строки name{labels} из вывода /metrics."""
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], metrics.CONTENT_TYPE)
+        selector = ",".join(f'{key}="{value}"' for key, value in labels.items())
+        for line in response.content.decode().splitlines():
+            if line.startswith(f"{name}{{{selector}}} "):
+                return float(line.rsplit(" ", 1)[1])
+        return None
+
+    def test_request_counts_queries_and_size(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/products/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(self.sample("wardrobe_http_requests_total", view="product-list", method="GET", status=200), 1)
+        self.assertEqual(self.sample("wardrobe_http_request_queries_sum", view="product-list"), 2)
+        self.assertEqual(self.sample("wardrobe_http_response_size_bytes_sum", view="product-list"), len(response.content))
+        self.assertGreater(self.sample("wardrobe_http_response_render_seconds_sum", view="product-list"), 0)
+        self.assertGreater(self.sample("wardrobe_http_response_serialize_seconds_sum", view="product-list"), 0)
+        self.assertEqual(self.sample("wardrobe_http_request_duration_seconds_bucket", view="product-list", method="GET", le="+Inf"), 1)
+
+    def test_streaming_export_is_measured_when_consumed(self):
+        response = self.client.get("/api/products/export/?type=csv")
+        self.assertIsNone(self.sample("wardrobe_http_response_size_bytes_count", view="product-export"))
+        content = b"".join(response.streaming_content)
+        self.assertEqual(self.sample("wardrobe_http_response_size_bytes_sum", view="product-export"), len(content))
+        self.assertGreater(self.sample("wardrobe_http_request_queries_sum", view="product-export"), 0)
+
+    def test_metrics_require_staff_or_token(self):
+        self.client.force_authenticate(None)
+        self.client.logout()
+        # Запрос через локальный прокси приходит с 127.0.0.1 и без прав
+        self.assertEqual(self.client.get("/metrics", REMOTE_ADDR="127.0.0.1").status_code, 403)
+        with override_settings(METRICS_TOKEN="secret"):
+            self.assertEqual(self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer wrong").status_code, 403)
+            self.assertEqual(self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer secret").status_code, 200)
+        self.client.force_login(User.objects.create_user(username="user", password="password123"))
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+
+
+class ProfilingTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username="admin", password="password123", is_superuser=True))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def profile(self, **settings):
+        with override_settings(PROFILE_DIR=self.directory, PROFILE_SAMPLE_RATE=1, PROFILE_INTERVAL_MS=1, **settings):
+            self.assertEqual(self.client.get("/api/categories/").status_code, 200)
+        return [os.path.join(self.directory, name) for name in os.listdir(self.directory)]
+
+    def test_fast_requests_are_not_saved(self):
+        self.assertEqual(self.profile(PROFILE_THRESHOLD_MS=10_000), [])
+
+    def test_cprofile_and_folded_stacks(self):
+        [path] = self.profile(PROFILE_MODE="cprofile", PROFILE_THRESHOLD_MS=0)
+        self.assertTrue(path.endswith(".prof"))
+        self.assertIn("category-list", path)
+        self.assertTrue(any(function[2] == "list" for function in pstats.Stats(path).stats))
+        os.remove(path)
+
+        [path] = self.profile(PROFILE_MODE="stacks", PROFILE_THRESHOLD_MS=0)
+        with open(path, encoding="utf-8") as file:
+            lines = file.read().splitlines()
+        # Свёрнутые стеки: "корень;…;функция (файл:строка) число"
+        for line in lines:
+            stack, count = line.rsplit(" ", 1)
+            self.assertGreater(int(count), 0)
+            self.assertIn("__call__ (middleware.py:", stack)
@@ -0,0 +1,51 @@
+import datetime
+import threading
+import time
+
+from django.db import connection
+from django.test import TransactionTestCase
+from wardrobe.models import Category, Store, Product, Customer, Order
+
+
+class OrderIdConcurrencyTestCase(TransactionTestCase):
+    threads = 8
+    per_thread = 50
+    min_orders_per_second = 50
+
+    def setUp(self):
+        category = Category.objects.create(name="Cat")
+        self.store = Store.objects.create(name="Store", address="Address")
+        self.product = Product.objects.create(name="Product", category=category, store=self.store, quantity=10)
+        self.customer = Customer.objects.create(first_name="Ivan", store=self.store)
+
+    def create_orders(self, errors):
+        try:
+            for _ in range(self.per_thread):
+                Order.objects.create(product=self.product, customer=self.customer, order_date=datetime.date(2025, 1, 1))
+        except Exception as error:
+            errors.append(error)
+        finally:
+            connection.close()
+
+    def test_concurrent_inserts_get_unique_ids(self):
+        errors = []
+        workers = [threading.Thread(target=self.create_orders, args=(errors,)) for _ in range(self.threads)]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+        self.assertEqual(errors, [])
+        ids = list(Order.objects.values_list("order_id", flat=True))
+        self.assertEqual(len(ids), self.threads * self.per_thread)
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertGreater(len(ids) / elapsed, self.min_orders_per_second)
+
+    def test_bulk_create_returns_database_ids(self):
+        orders = Order.objects.bulk_create([
+            Order(product=self.product, customer=self.customer, order_date=datetime.date(2025, 1, 1))
+            for _ in range(100)
+        ])
+        self.assertTrue(all(order.order_id for order in orders))
+        self.assertEqual(len({order.order_id for order in orders}), 100)
@@ -0,0 +1,109 @@
+import datetime
+import threading
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+from wardrobe.models import Category, Store, Product, Customer, Order
+from wardrobe.orders import place_order
+
+
+class OrderPlacementTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="admin", password="password123")
+        self.client.force_authenticate(self.user)
+        category = Category.objects.create(name="Cat")
+        self.store = Store.objects.create(name="Store", address="Address")
+        self.product = Product.objects.create(name="Boots", category=category, store=self.store, price="12.50", quantity=5)
+        self.other = Product.objects.create(name="Shirt", category=category, store=self.store, price="3.00", quantity=5)
+        self.customer = Customer.objects.create(first_name="Ivan", store=self.store)
+
+    def create(self, quantity, product=None):
+        return self.client.post("/api/orders/", {
+            "product": (product or self.product).id, "customer": self.customer.id,
+            "quantity": quantity, "order_date": "2025-01-01",
+        }, format="json")
+
+    def stock(self, product=None):
+        return Product.objects.get(pk=(product or self.product).pk).quantity
+
+    def test_create_reserves_stock_and_sets_total(self):
+        response = self.create(2)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Decimal(response.json()["total_price"]), Decimal("25.00"))
+        self.assertEqual(self.stock(), 3)
+
+    def test_create_rejects_when_out_of_stock(self):
+        response = self.create(6)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.stock(), 5)
+        self.assertFalse(Order.objects.exists())
+
+    def test_status_transitions(self):
+        order_id = self.create(2).json()["order_id"]
+        response = self.client.post(f"/api/orders/{order_id}/status/", {"status": "sold"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.stock(), 3)
+        response = self.client.post(f"/api/orders/{order_id}/status/", {"status": "returned"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.stock(), 5)
+        response = self.client.post(f"/api/orders/{order_id}/status/", {"status": "sold"}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.stock(), 5)
+
+    def test_cancel_restores_stock(self):
+        order_id = self.create(4).json()["order_id"]
+        self.client.patch(f"/api/orders/{order_id}/", {"status": "cancelled"}, format="json")
+        self.assertEqual(self.stock(), 5)
+
+    def test_changing_product_moves_reservation(self):
+        order_id = self.create(2).json()["order_id"]
+        response = self.client.patch(f"/api/orders/{order_id}/", {"product": self.other.id, "quantity": 3}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Decimal(response.json()["total_price"]), Decimal("9.00"))
+        self.assertEqual(self.stock(), 5)
+        self.assertEqual(self.stock(self.other), 2)
+
+    def test_deleting_pending_order_releases_stock(self):
+        order_id = self.create(2).json()["order_id"]
+        self.client.delete(f"/api/orders/{order_id}/")
+        self.assertEqual(self.stock(), 5)
+
+
+class ConcurrentPlacementTestCase(TransactionTestCase):
+    threads = 8
+    attempts = 10
+    stock = 30
+
+    def setUp(self):
+        category = Category.objects.create(name="Cat")
+        store = Store.objects.create(name="Store", address="Address")
+        self.product = Product.objects.create(name="Boots", category=category, store=store, price=10, quantity=self.stock)
+        self.customer = Customer.objects.create(first_name="Ivan", store=store)
+
+    def buy(self, results):
+        try:
+            for _ in range(self.attempts):
+                try:
+                    place_order(product=self.product, customer=self.customer, quantity=1, order_date=datetime.date(2025, 1, 1))
+                    results.append(True)
+                except ValidationError:
+                    results.append(False)
+        finally:
+            connection.close()
+
+    def test_stock_is_never_oversold(self):
+        results = []
+        workers = [threading.Thread(target=self.buy, args=(results,)) for _ in range(self.threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(len(results), self.threads * self.attempts)
+        self.assertEqual(results.count(True), self.stock)
+        self.assertEqual(Order.objects.count(), self.stock)
+        self.assertEqual(Product.objects.get(pk=self.product.pk).quantity, 0)
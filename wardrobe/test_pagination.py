@@ -0,0 +1,53 @@
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from wardrobe.models import Category, Store, Product, Customer, Order
+
+
+class PaginationTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="admin", password="password123", is_superuser=True)
+        self.client.force_authenticate(self.user)
+        self.category = Category.objects.create(name="Cat")
+        self.store = Store.objects.create(name="Store", address="Address")
+        self.customer = Customer.objects.create(first_name="Ivan", store=self.store)
+        Product.objects.bulk_create([
+            Product(name=f"Product {i}", category=self.category, store=self.store, price=10, quantity=5)
+            for i in range(7)
+        ])
+        product = Product.objects.first()
+        for _ in range(5):
+            Order.objects.create(product=product, customer=self.customer, order_date=timezone.now().date())
+
+    def test_cursor_walks_all_rows_in_pk_order(self):
+        ids = []
+        url = "/api/products/?page_size=3"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            self.assertNotIn("count", data)
+            ids.extend(p["id"] for p in data["results"])
+            url = data["next"]
+        self.assertEqual(ids, list(Product.objects.order_by("id").values_list("id", flat=True)))
+
+    def test_cursor_uses_order_id_for_orders(self):
+        response = self.client.get("/api/orders/?page_size=2")
+        data = response.json()
+        self.assertEqual(len(data["results"]), 2)
+        second = self.client.get(data["next"]).json()
+        self.assertGreater(second["results"][0]["order_id"], data["results"][-1]["order_id"])
+
+    def test_offset_mode(self):
+        response = self.client.get("/api/products/?limit=2&offset=4")
+        data = response.json()
+        self.assertEqual(data["count"], 7)
+        self.assertEqual(len(data["results"]), 2)
+
+    def test_every_viewset_is_paginated(self):
+        for url in ["/api/categories/", "/api/stores/", "/api/products/", "/api/orders/", "/api/customers/"]:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertIn("results", response.json())
@@ -0,0 +1,87 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from wardrobe.models import Category, Store, Product, Customer, Order, UserProfile
+
+
+class ListQueryCountTestCase(TestCase):
+    """Число запросов на страницу списка не зависит от количества строк."""
+
+    small = 10
+    large = 10_000
+    page_size = 500
+
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username="admin", password="password123")
+        self.client.force_authenticate(self.admin)
+
+    def seed(self, total):
+        start = Product.objects.count()
+        users = User.objects.bulk_create([User(username=f"user{i}") for i in range(start, total)])
+        UserProfile.objects.bulk_create([UserProfile(user=u, age=30) for u in users])
+        categories = Category.objects.bulk_create([Category(name=f"Cat {i}", user=u) for i, u in enumerate(users, start)])
+        stores = Store.objects.bulk_create([Store(name=f"Store {i}", address="Addr", user=u) for i, u in enumerate(users, start)])
+        products = Product.objects.bulk_create([
+            Product(name=f"Product {i}", category=c, store=s, price=10, quantity=1)
+            for i, (c, s) in enumerate(zip(categories, stores), start)
+        ])
+        customers = Customer.objects.bulk_create([Customer(first_name=f"Customer {i}", store=s) for i, s in enumerate(stores, start)])
+        Order.objects.bulk_create([
+            Order(product=p, customer=c, user=u, order_date=datetime.date(2025, 1, 1))
+            for p, c, u in zip(products, customers, users)
+        ])
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(f"{url}?page_size={self.page_size}")
+        self.assertEqual(response.status_code, 200)
+        self.assertGreaterEqual(len(response.json()["results"]), min(Product.objects.count(), self.page_size))
+        return len(ctx.captured_queries)
+
+    def test_query_count_is_constant(self):
+        urls = ["/api/categories/", "/api/stores/", "/api/products/", "/api/orders/", "/api/customers/"]
+        self.seed(self.small)
+        small_counts = {url: self.count_queries(url) for url in urls}
+        self.seed(self.large)
+        large_counts = {url: self.count_queries(url) for url in urls}
+        self.assertEqual(small_counts, large_counts)
+        for url, count in large_counts.items():
+            # Выборка страницы и запрос версий ресурсов для ETag
+            self.assertEqual(count, 2, url)
+
+
+class SaveQueryCountTestCase(TestCase):
+    """Прежние значения сохраняемой записи читаются одним запросом на все подсистемы."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username="admin", password="password123", is_superuser=True)
+        self.client.force_authenticate(self.admin)
+        self.store = Store.objects.create(name="Store1", address="Address1")
+        self.product = Product.objects.create(name="Boots", category=Category.objects.create(name="Обувь"), store=self.store, price=10)
+
+    def product_reads(self, queries):
+        return [query["sql"] for query in queries if query["sql"].startswith('SELECT "wardrobe_product".')]
+
+    def test_update_reads_previous_row_once(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.patch(f"/api/products/{self.product.id}/", {"price": "12.00", "name": "Winter boots"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        # get_object, снимок прежних значений и строка для поискового индекса
+        self.assertEqual(len(self.product_reads(ctx.captured_queries)), 3)
+
+    def test_update_fields_without_tracked_columns(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.product.quantity = 5
+            self.product.save(update_fields=["quantity"])
+        self.assertEqual(self.product_reads(ctx.captured_queries), [])
+        with CaptureQueriesContext(connection) as ctx:
+            self.product.price = 11
+            self.product.save(update_fields=["price"])
+        [read] = self.product_reads(ctx.captured_queries)
+        self.assertNotIn('"name"', read)
@@ -0,0 +1,99 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from wardrobe import rollups
+from wardrobe.models import Category, Store, Product, Customer, Order, SalesRollup
+
+
+class RollupTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="admin", password="password123")
+        self.client.force_authenticate(self.user)
+        self.shoes = Category.objects.create(name="Обувь")
+        self.hats = Category.objects.create(name="Шапки")
+        self.store = Store.objects.create(name="Store1", address="Address1")
+        self.other_store = Store.objects.create(name="Store2", address="Address2")
+        self.customer = Customer.objects.create(first_name="Ivan", store=self.store)
+        self.boots = Product.objects.create(name="Boots", category=self.shoes, store=self.store, price=10, quantity=100)
+        self.hat = Product.objects.create(name="Hat", category=self.hats, store=self.other_store, price=5, quantity=100)
+
+    def order(self, product, date, quantity=1):
+        response = self.client.post("/api/orders/", {"product": product.id, "customer": self.customer.id, "order_date": date, "quantity": quantity})
+        self.assertEqual(response.status_code, 201)
+        return response.json()["order_id"]
+
+    def rows(self):
+        return sorted(SalesRollup.objects.values_list("day", "store_id", "category_id", "status", "orders", "units", "revenue"))
+
+    def assert_matches_rebuild(self):
+        incremental = self.rows()
+        rollups.rebuild_all()
+        self.assertEqual(incremental, self.rows())
+
+    def analytics(self, **params):
+        response = self.client.get("/api/orders/analytics/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()["results"]
+
+    def test_changes_rebuild_only_touched_days(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            first = self.order(self.boots, "2025-01-05", 2)
+            self.order(self.hat, "2025-01-20")
+            self.order(self.hat, "2025-02-03", 3)
+        self.assertEqual(len(self.rows()), 3)
+        self.assert_matches_rebuild()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f"/api/orders/{first}/", {"order_date": "2025-02-10", "quantity": 1})
+            self.client.post(f"/api/orders/{first}/status/", {"status": "sold"})
+        self.assert_matches_rebuild()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f"/api/products/{self.hat.id}/", {"category": self.shoes.id})
+        self.assert_matches_rebuild()
+
+        item = {"product": self.boots.id, "customer": self.customer.id, "order_date": "2025-03-01"}
+        with self.captureOnCommitCallbacks(execute=True):
+            created = self.client.post("/api/orders/bulk/", [item, item], format="json").json()["created"]
+            self.client.patch("/api/orders/bulk/", [{"order_id": created[0]["id"], "order_date": "2025-03-02"}], format="json")
+        self.assert_matches_rebuild()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f"/api/products/{self.boots.id}/")
+        self.assert_matches_rebuild()
+        self.assertEqual({row[1:3] for row in self.rows()}, {(self.other_store.id, self.shoes.id)})
+
+    def test_analytics_groups_and_filters(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.order(self.boots, "2025-01-06", 2)
+            self.order(self.boots, "2025-01-07")
+            self.order(self.hat, "2025-01-20")
+            self.order(self.hat, "2025-02-03", 3)
+
+        self.assertEqual(self.analytics(), [
+            {"period": "2025-01-01", "orders": 3, "units": 4, "revenue": 35.0},
+            {"period": "2025-02-01", "orders": 1, "units": 3, "revenue": 15.0},
+        ])
+        by_store = self.analytics(group_by="store", date_from="2025-01-01", date_to="2025-01-31")
+        self.assertEqual([(row["store_name"], row["units"]) for row in by_store], [("Store1", 3), ("Store2", 1)])
+        by_category = self.analytics(period="year", group_by="category,status", category=self.hats.id)
+        self.assertEqual(by_category, [{"period": "2025-01-01", "category": self.hats.id, "category_name": "Шапки",
+                                        "status": "pending", "orders": 2, "units": 4, "revenue": 20.0}])
+        self.assertEqual(len(self.analytics(period="day")), 4)
+        self.assertEqual(len(self.analytics(period="week")), 3)
+        self.assertEqual(self.client.get("/api/orders/analytics/", {"period": "hour"}).status_code, 400)
+        self.assertEqual(self.client.get("/api/orders/analytics/", {"group_by": "color"}).status_code, 400)
+        self.assertEqual(self.client.get("/api/orders/analytics/", {"date_from": "январь"}).status_code, 400)
+
+    def test_analytics_does_not_read_orders(self):
+        Order.objects.bulk_create([Order(product=self.boots, customer=self.customer, order_date=f"2024-{m:02}-{d:02}", total_price=10)
+                                   for m in range(1, 13) for d in range(1, 29)])
+        rollups.rebuild_all()
+        with CaptureQueriesContext(connection) as ctx:
+            results = self.analytics(group_by="store")
+        self.assertEqual(len(results), 12)
+        self.assertEqual(sum(row["orders"] for row in results), 12 * 28)
+        self.assertFalse(any("wardrobe_order" in query["sql"] for query in ctx.captured_queries))
@@ -0,0 +1,72 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+from wardrobe.models import Category, Store, Product
+from wardrobe.search import rebuild_index
+
+
+class SearchTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="admin", password="password123")
+        self.client.force_authenticate(self.user)
+        self.shoes = Category.objects.create(name="Обувь")
+        self.hats = Category.objects.create(name="Головные уборы")
+        self.store = Store.objects.create(name="Центральный", address="Address1")
+        self.boots = Product.objects.create(name="Ботинки зимние", category=self.shoes, store=self.store, price=10, color="Чёрный")
+        self.sneakers = Product.objects.create(name="Sneakers Runner", category=self.shoes, store=self.store, price=20,
+                                               description="Лёгкие ботинки для бега")
+        self.hat = Product.objects.create(name="Шапка", category=self.hats, store=self.store, price=5, color="Red")
+
+    def search(self, q, **params):
+        response = self.client.get("/api/products/search/", {"q": q, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def names(self, q, **params):
+        return [row["name"] for row in self.search(q, **params)["results"]]
+
+    def test_prefix_ranking_and_fields(self):
+        # Совпадение в названии выше совпадения в описании
+        self.assertEqual(self.names("бот"), ["Ботинки зимние", "Sneakers Runner"])
+        self.assertEqual(self.names("SNEAK"), ["Sneakers Runner"])
+        self.assertEqual(self.names("черн"), ["Ботинки зимние"])
+        self.assertEqual(self.names("головные red"), ["Шапка"])
+        self.assertEqual(sorted(self.names("центр")), ["Sneakers Runner", "Ботинки зимние", "Шапка"])
+        self.assertEqual(self.names("бот бег"), ["Sneakers Runner"])
+        self.assertEqual(self.names('"OR*'), [])
+        self.assertEqual(self.names("бот", category=self.hats.id), [])
+
+    def test_index_follows_changes(self):
+        self.boots.name = "Сапоги"
+        self.boots.save()
+        self.assertEqual(self.names("бот"), ["Sneakers Runner"])
+        self.hats.name = "Кепки"
+        self.hats.save()
+        self.assertEqual(self.names("кепк"), ["Шапка"])
+        self.hat.delete()
+        self.assertEqual(self.names("кепк"), [])
+        self.client.patch("/api/products/bulk/", [{"id": self.sneakers.id, "name": "Кроссовки"}], format="json")
+        self.assertEqual(self.names("кросс"), ["Кроссовки"])
+        self.assertEqual(rebuild_index(), 2)
+        self.assertEqual(self.names("сапог"), ["Сапоги"])
+
+    def test_pagination(self):
+        for i in range(5):
+            Product.objects.create(name=f"Ботинки {i}", category=self.shoes, store=self.store, price=1)
+        data = self.search("ботинки", limit=4)
+        self.assertEqual(len(data["results"]), 4)
+        self.assertIsNone(data["previous"])
+        rest = self.client.get(data["next"]).json()
+        seen = [row["id"] for row in data["results"] + rest["results"]]
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(len(set(seen)), 7)
+        self.assertIsNone(rest["next"])
+        self.assertIsNotNone(rest["previous"])
+        # Листать можно только MAX_RESULTS результатов
+        with mock.patch("wardrobe.search.MAX_RESULTS", 5):
+            rest = self.client.get(data["next"]).json()
+        self.assertEqual(len(rest["results"]), 1)
+        self.assertIsNone(rest["next"])
@@ -0,0 +1,74 @@
+import os
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+from wardrobe.serving import parse_range
+
+DIGEST = "ab" + "0" * 62
+
+
+class ServeMediaTestCase(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.settings = override_settings(MEDIA_ROOT=self.media)
+        self.settings.enable()
+        self.content = bytes(range(256)) * 4
+        for name in (f"blobs/ab/{DIGEST}.jpg", "products/bird.jpg", ".secret"):
+            os.makedirs(os.path.dirname(os.path.join(self.media, name)), exist_ok=True)
+            with open(os.path.join(self.media, name), "wb") as file:
+                file.write(self.content)
+
+    def tearDown(self):
+        self.settings.disable()
+        shutil.rmtree(self.media)
+
+    def body(self, response):
+        return b"".join(response.streaming_content)
+
+    def test_full_file_and_cache_headers(self):
+        response = self.client.get(f"/media/blobs/ab/{DIGEST}.jpg")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), self.content)
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+        self.assertEqual(response["Content-Length"], "1024")
+        self.assertEqual(response["ETag"], f'"{DIGEST}"')
+        self.assertIn("immutable", response["Cache-Control"])
+
+        response = self.client.get("/media/products/bird.jpg")
+        self.assertEqual(response["Cache-Control"], "no-cache")
+        self.assertTrue(response["ETag"].startswith('W/"'))
+        self.assertEqual(self.client.get("/media/products/bird.jpg", HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+
+        self.assertEqual(self.client.get("/media/.secret").status_code, 404)
+        self.assertEqual(self.client.get("/media/../manage.py").status_code, 404)
+        self.assertEqual(self.client.get("/media/products/missing.jpg").status_code, 404)
+        self.assertEqual(self.client.post("/media/products/bird.jpg").status_code, 405)
+
+    def test_ranges(self):
+        url = f"/media/blobs/ab/{DIGEST}.jpg"
+        response = self.client.get(url, HTTP_RANGE="bytes=10-19")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], "bytes 10-19/1024")
+        self.assertEqual(self.body(response), self.content[10:20])
+
+        response = self.client.get(url, HTTP_RANGE="bytes=-4")
+        self.assertEqual(self.body(response), self.content[-4:])
+        response = self.client.get(url, HTTP_RANGE="bytes=2000-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */1024")
+        # If-Range с другим ETag — файл целиком
+        response = self.client.get(url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"other"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), self.content)
+
+        self.assertEqual(parse_range("bytes=0-1,5-6", 10), None)
+        self.assertEqual(parse_range("bytes=5-100", 10), (5, 9))
+        self.assertEqual(parse_range("items=0-1", 10), None)
+
+    @override_settings(MEDIA_SERVE_MODE="x-accel-redirect")
+    def test_accel_redirect(self):
+        response = self.client.get("/media/products/bird.jpg")
+        self.assertEqual(response["X-Accel-Redirect"], "/protected-media/products/bird.jpg")
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["Content-Type"], "image/jpeg")
@@ -0,0 +1,85 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import DatabaseError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from wardrobe import stats
+from wardrobe.models import Category, Store, Product, Customer, Order
+
+ENDPOINTS = ["/api/categories/stats/", "/api/stores/stats/", "/api/products/stats/", "/api/orders/stats/", "/api/customers/stats/"]
+
+
+class StatsTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="admin", password="password123", is_superuser=True)
+        self.client.force_authenticate(self.user)
+        self.category = Category.objects.create(name="Обувь")
+        self.store = Store.objects.create(name="Store1", address="Address1")
+        self.customer = Customer.objects.create(first_name="Ivan", store=self.store)
+
+    def snapshot(self):
+        return [self.client.get(url).json() for url in ENDPOINTS]
+
+    def assert_matches_rebuild(self):
+        incremental = self.snapshot()
+        stats.reconcile()
+        self.assertEqual(incremental, self.snapshot())
+        return incremental
+
+    def test_incremental_matches_rebuild(self):
+        self.snapshot()
+        other_store = Store.objects.create(name="Store2", address="Address2")
+        boots = Product.objects.create(name="Boots", category=self.category, store=self.store, price=10, quantity=10)
+        hat = Product.objects.create(name="Hat", category=self.category, store=other_store, price="3.50", quantity=10)
+        petr = Customer.objects.create(first_name="Petr", store=self.store)
+        for product, customer in [(boots, self.customer), (hat, petr), (hat, petr), (hat, self.customer)]:
+            response = self.client.post("/api/orders/", {"product": product.id, "customer": customer.id, "order_date": "2025-01-01", "quantity": 1})
+            self.assertEqual(response.status_code, 201)
+        order = Order.objects.filter(product=boots).get()
+        self.client.patch(f"/api/orders/{order.order_id}/", {"product": hat.id, "customer": petr.id, "quantity": 2})
+        self.client.patch(f"/api/products/{boots.id}/", {"price": "12.25"})
+        self.client.delete(f"/api/orders/{Order.objects.filter(customer=self.customer).get().order_id}/")
+        User.objects.create_user(username="user", password="password123")
+
+        categories, stores, products, orders, customers = self.assert_matches_rebuild()
+        self.assertEqual(products["count"], 2)
+        self.assertEqual(products["most_ordered"]["product__name"], "Hat")
+        self.assertEqual(products["most_ordered"]["order_count"], 3)
+        self.assertEqual(stores["top"], "Store2")
+        self.assertEqual(orders["count"], 3)
+        self.assertEqual(orders["topCustomer"], {"customer__first_name": "Petr", "order_count": 3})
+        self.assertEqual(customers, {"count": 2, "count_admins": 1, "count_users": 1})
+
+    def test_cascades_and_bulk_changes_trigger_rebuild(self):
+        product = Product.objects.create(name="Boots", category=self.category, store=self.store, price=10, quantity=10)
+        self.client.post("/api/orders/", {"product": product.id, "customer": self.customer.id, "order_date": "2025-01-01"})
+        self.snapshot()
+        self.client.post("/api/products/bulk/", [{"name": "Hat", "category": self.category.id, "store": self.store.id, "price": "1.00"}], format="json")
+        self.client.delete(f"/api/products/{product.id}/")
+        self.customer.first_name = "Ivan2"
+        self.customer.save()
+        categories, stores, products, orders, customers = self.assert_matches_rebuild()
+        self.assertEqual(products["count"], 1)
+        self.assertEqual(orders["count"], 0)
+        self.assertIsNone(orders["topCustomer"])
+
+    def test_failed_counter_update_rolls_back_save(self):
+        product = Product.objects.create(name="Boots", category=self.category, store=self.store, price=10, quantity=10)
+        with mock.patch("wardrobe.stats.add", side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                self.client.patch(f"/api/products/{product.id}/", {"price": "12.25"})
+        product.refresh_from_db()
+        self.assertEqual(product.price, 10)
+
+    def test_reads_do_not_scale_with_rows(self):
+        products = Product.objects.bulk_create([Product(name=f"P{i}", category=self.category, store=self.store, price=1) for i in range(300)])
+        Order.objects.bulk_create([Order(product=products[i % 300], customer=self.customer, order_date="2025-01-01", total_price=1) for i in range(3000)])
+        stats.reconcile()
+        for url in ENDPOINTS:
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.get(url)
+            self.assertLessEqual(len(ctx.captured_queries), 4, url)
+            self.assertFalse(any("GROUP BY" in query["sql"] for query in ctx.captured_queries), url)
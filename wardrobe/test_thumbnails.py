@@ -0,0 +1,101 @@
+import shutil
+import tempfile
+from concurrent.futures import wait
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+from wardrobe import media, thumbnails
+from wardrobe.models import Category, Store, Product
+
+
+def upload(name, size=(1200, 800)):
+    buffer = BytesIO()
+    Image.new("RGB", size, "red").save(buffer, "PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+
+class ThumbnailsTestCase(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.settings = override_settings(MEDIA_ROOT=self.media)
+        self.settings.enable()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="admin", password="password123")
+        self.category = Category.objects.create(name="Обувь")
+        self.store = Store.objects.create(name="Центральный", address="Address1")
+        self.client.force_authenticate(self.user)
+
+    def tearDown(self):
+        self.settings.disable()
+        shutil.rmtree(self.media)
+
+    def finish(self):
+        with thumbnails.pending_lock:
+            futures = list(thumbnails.pending.values())
+        wait(futures)
+
+    def size_of(self, name, size):
+        with Image.open(f"{self.media}/{thumbnails.thumbnail_name(name, size)}") as image:
+            return image.size
+
+    @mock.patch.object(media, "GC_GRACE_SECONDS", 0)
+    # Поток пула пишет флаги и версию в отдельной транзакции, а тест держит свою открытой
+    @mock.patch.object(thumbnails, "flush_version")
+    def test_upload_builds_thumbnails_after_commit(self, flush_version):
+        with mock.patch.object(thumbnails, "mark_ready") as mark_ready:
+            with self.captureOnCommitCallbacks(execute=True):
+                product = Product.objects.create(name="Ботинки", category=self.category, store=self.store, image=upload("boots.png"))
+            self.finish()
+        mark_ready.assert_called_with([product.image.name])
+        # Клиенты со списком без копий получат новый список, а не 304
+        flush_version.assert_called_with("product")
+        self.assertEqual(self.size_of(product.image.name, "small"), (96, 64))
+        self.assertEqual(self.size_of(product.image.name, "large"), (960, 640))
+
+        self.assertIsNone(self.client.get(f"/api/products/{product.id}/").json()["thumbnails"])
+        thumbnails.mark_ready([product.image.name])
+        # Готовность берётся из строки, хранилище при выдаче не опрашивается
+        with mock.patch.object(thumbnails, "is_ready") as is_ready:
+            urls = self.client.get(f"/api/products/{product.id}/").json()["thumbnails"]
+        is_ready.assert_not_called()
+        self.assertEqual(set(urls), set(thumbnails.SIZES))
+        self.assertTrue(urls["small"].endswith(f"-small.{thumbnails.EXTENSION}"))
+
+        # То же фото у другого товара: копии уже есть, строка сразу готова
+        with self.captureOnCommitCallbacks(execute=True):
+            other = Product.objects.create(name="Ботинки 2", category=self.category, store=self.store, image=product.image.name)
+            self.assertTrue(other.thumbnails_ready)
+            other.delete()
+
+        old = product.image.name
+        with mock.patch.object(thumbnails, "mark_ready"):
+            with self.captureOnCommitCallbacks(execute=True):
+                product.image = upload("boots2.png", (50, 40))
+                product.save()
+            self.finish()
+        product.refresh_from_db()
+        self.assertFalse(product.thumbnails_ready)
+        self.assertFalse(thumbnails.is_ready(old))
+        # Маленькие фото не увеличиваются
+        self.assertEqual(self.size_of(product.image.name, "large"), (50, 40))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            product.delete()
+        self.assertFalse(thumbnails.is_ready(product.image.name))
+
+    def test_backfill_command(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            product = Product.objects.create(name="Шапка", category=self.category, store=self.store, image=upload("hat.png"))
+        Product.objects.create(name="Без фото", category=self.category, store=self.store)
+        self.assertIsNone(self.client.get(f"/api/products/{product.id}/").json()["thumbnails"])
+        etag = self.client.get("/api/products/").headers["ETag"]
+        call_command("generate_thumbnails", stdout=StringIO())
+        self.assertTrue(thumbnails.is_ready(product.image.name))
+        self.assertIsNotNone(self.client.get(f"/api/products/{product.id}/").json()["thumbnails"])
+        self.assertEqual(self.client.get("/api/products/", HTTP_IF_NONE_MATCH=etag).status_code, 200)
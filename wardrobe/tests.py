@@ -1,48 +1,28 @@
+import datetime
+
+from django.contrib.auth.models import User
 from django.test import TestCase
 from rest_framework.test import APIClient
-from django.utils import timezone
-from wardrobe.models import Brand, Category, Item, Store, Purchase
+from wardrobe.models import Category, Customer, Order, Product, Store
+
 
-# -------------------- Brand --------------------
-class BrandViewSetTestCase(TestCase):
+class APITestCase(TestCase):
     def setUp(self):
         self.client = APIClient()
-        self.brand = Brand.objects.create(name="TestBrand", description="Desc")
-
-    def test_get_list(self):
-        response = self.client.get("/api/brands/")
-        self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.json()), 1)
-
-    def test_create(self):
-        data = {"name": "NewBrand", "description": "NewDesc"}
-        response = self.client.post("/api/brands/", data, format="json")
-        self.assertEqual(response.status_code, 201)
-        self.assertTrue(Brand.objects.filter(name="NewBrand").exists())
-
-    def test_update(self):
-        data = {"name": "UpdatedBrand"}
-        response = self.client.patch(f"/api/brands/{self.brand.id}/", data, format="json")
-        self.assertEqual(response.status_code, 200)
-        self.brand.refresh_from_db()
-        self.assertEqual(self.brand.name, "UpdatedBrand")
-
-    def test_delete(self):
-        response = self.client.delete(f"/api/brands/{self.brand.id}/")
-        self.assertEqual(response.status_code, 204)
-        self.assertFalse(Brand.objects.filter(id=self.brand.id).exists())
+        self.user = User.objects.create_user(username="admin", password="password123", is_superuser=True)
+        self.client.force_authenticate(self.user)
 
 
 # -------------------- Category --------------------
-class CategoryViewSetTestCase(TestCase):
+class CategoryViewSetTestCase(APITestCase):
     def setUp(self):
-        self.client = APIClient()
+        super().setUp()
         self.category = Category.objects.create(name="TestCategory")
 
     def test_get_list(self):
         response = self.client.get("/api/categories/")
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.json()), 1)
+        self.assertEqual(len(response.json()["results"]), 1)
 
     def test_create(self):
         data = {"name": "NewCategory"}
@@ -62,98 +42,96 @@ class CategoryViewSetTestCase(TestCase):
         self.assertEqual(response.status_code, 204)
         self.assertFalse(Category.objects.filter(id=self.category.id).exists())
 
+    def test_requires_authentication(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get("/api/categories/").status_code, 403)
+
 
-# -------------------- Item --------------------
-class ItemViewSetTestCase(TestCase):
+# -------------------- Store --------------------
+class StoreViewSetTestCase(APITestCase):
     def setUp(self):
-        self.client = APIClient()
-        self.brand = Brand.objects.create(name="Brand1", description="Desc1")
-        self.category = Category.objects.create(name="Cat1")
-        self.item = Item.objects.create(name="Item1", color="Red", brand=self.brand, category=self.category)
+        super().setUp()
+        self.store = Store.objects.create(name="Store1", address="Address1")
 
     def test_get_list(self):
-        response = self.client.get("/api/items/")
+        response = self.client.get("/api/stores/")
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.json()), 1)
+        self.assertEqual(len(response.json()["results"]), 1)
 
     def test_create(self):
-        data = {"name": "Item2", "color": "Blue", "brand": self.brand.id, "category": self.category.id}
-        response = self.client.post("/api/items/", data, format="json")
+        data = {"name": "Store2", "address": "Address2"}
+        response = self.client.post("/api/stores/", data, format="json")
         self.assertEqual(response.status_code, 201)
-        self.assertTrue(Item.objects.filter(name="Item2").exists())
+        self.assertTrue(Store.objects.filter(name="Store2").exists())
 
     def test_update(self):
-        data = {"name": "UpdatedItem"}
-        response = self.client.patch(f"/api/items/{self.item.id}/", data, format="json")
+        data = {"address": "NewAddress"}
+        response = self.client.patch(f"/api/stores/{self.store.id}/", data, format="json")
         self.assertEqual(response.status_code, 200)
-        self.item.refresh_from_db()
-        self.assertEqual(self.item.name, "UpdatedItem")
+        self.store.refresh_from_db()
+        self.assertEqual(self.store.address, "NewAddress")
 
     def test_delete(self):
-        response = self.client.delete(f"/api/items/{self.item.id}/")
+        response = self.client.delete(f"/api/stores/{self.store.id}/")
         self.assertEqual(response.status_code, 204)
-        self.assertFalse(Item.objects.filter(id=self.item.id).exists())
+        self.assertFalse(Store.objects.filter(id=self.store.id).exists())
 
 
-# -------------------- Store --------------------
-class StoreViewSetTestCase(TestCase):
+# -------------------- Product --------------------
+class ProductViewSetTestCase(APITestCase):
     def setUp(self):
-        self.client = APIClient()
+        super().setUp()
+        self.category = Category.objects.create(name="Cat1")
         self.store = Store.objects.create(name="Store1", address="Address1")
+        self.product = Product.objects.create(name="Item1", color="Red", category=self.category, store=self.store, price=10)
 
     def test_get_list(self):
-        response = self.client.get("/api/stores/")
+        response = self.client.get("/api/products/")
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.json()), 1)
+        self.assertEqual(len(response.json()["results"]), 1)
 
     def test_create(self):
-        data = {"name": "Store2", "address": "Address2"}
-        response = self.client.post("/api/stores/", data, format="json")
+        data = {"name": "Item2", "color": "Blue", "category": self.category.id, "store": self.store.id, "price": "5.00"}
+        response = self.client.post("/api/products/", data, format="json")
         self.assertEqual(response.status_code, 201)
-        self.assertTrue(Store.objects.filter(name="Store2").exists())
+        self.assertTrue(Product.objects.filter(name="Item2").exists())
 
     def test_update(self):
-        data = {"address": "NewAddress"}
-        response = self.client.patch(f"/api/stores/{self.store.id}/", data, format="json")
+        data = {"name": "UpdatedItem"}
+        response = self.client.patch(f"/api/products/{self.product.id}/", data, format="json")
         self.assertEqual(response.status_code, 200)
-        self.store.refresh_from_db()
-        self.assertEqual(self.store.address, "NewAddress")
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.name, "UpdatedItem")
 
     def test_delete(self):
-        response = self.client.delete(f"/api/stores/{self.store.id}/")
+        response = self.client.delete(f"/api/products/{self.product.id}/")
         self.assertEqual(response.status_code, 204)
-        self.assertFalse(Store.objects.filter(id=self.store.id).exists())
+        self.assertFalse(Product.objects.filter(id=self.product.id).exists())
 
 
-# -------------------- Purchase --------------------
-class PurchaseViewSetTestCase(TestCase):
+# -------------------- Order --------------------
+class OrderViewSetTestCase(APITestCase):
     def setUp(self):
-        self.client = APIClient()
-        self.brand = Brand.objects.create(name="BrandA", description="DescA")
-        self.category = Category.objects.create(name="CatA")
-        self.item = Item.objects.create(name="ItemA", color="Green", brand=self.brand, category=self.category)
+        super().setUp()
         self.store = Store.objects.create(name="StoreA", address="AddressA")
-        self.purchase = Purchase.objects.create(item=self.item, store=self.store, amount=5, date=timezone.now().date())
+        self.product = Product.objects.create(name="ItemA", category=Category.objects.create(name="CatA"),
+                                              store=self.store, price=10, quantity=20)
+        self.customer = Customer.objects.create(first_name="Ivan", store=self.store)
+        self.order = Order.objects.create(product=self.product, customer=self.customer, quantity=5,
+                                          order_date=datetime.date(2025, 10, 1), total_price=50)
 
     def test_get_list(self):
-        response = self.client.get("/api/purchases/")
+        response = self.client.get("/api/orders/")
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.json()), 1)
+        self.assertEqual(len(response.json()["results"]), 1)
 
     def test_create(self):
-        data = {"item": self.item.id, "store": self.store.id, "amount": 10, "date": "2025-10-01"}
-        response = self.client.post("/api/purchases/", data, format="json")
+        data = {"product": self.product.id, "customer": self.customer.id, "quantity": 10, "order_date": "2025-10-01"}
+        response = self.client.post("/api/orders/", data, format="json")
         self.assertEqual(response.status_code, 201)
-        self.assertTrue(Purchase.objects.filter(amount=10).exists())
-
-    def test_update(self):
-        data = {"amount": 20}
-        response = self.client.patch(f"/api/purchases/{self.purchase.id}/", data, format="json")
-        self.assertEqual(response.status_code, 200)
-        self.purchase.refresh_from_db()
-        self.assertEqual(self.purchase.amount, 20)
+        self.assertTrue(Order.objects.filter(quantity=10).exists())
 
     def test_delete(self):
-        response = self.client.delete(f"/api/purchases/{self.purchase.id}/")
+        response = self.client.delete(f"/api/orders/{self.order.order_id}/")
         self.assertEqual(response.status_code, 204)
-        self.assertFalse(Purchase.objects.filter(id=self.purchase.id).exists())
\ No newline at end of file
+        self.assertFalse(Order.objects.filter(order_id=self.order.order_id).exists())
@@ -0,0 +1,149 @@
+"""
+Уменьшенные копии фотографий товаров (Product.image) и покупателей (Customer.photo).
+
+После коммита загрузки пул потоков строит копии размеров SIZES (вписанные
+в квадрат, без увеличения) в WebP, или в JPEG, если Pillow собран без WebP.
+Имена производные от имени исходника: blobs/ab/ab….png →
+thumbs/blobs/ab/ab…-small.webp, поэтому URL известен без запросов к базе.
+Размеры пишутся от большего к меньшему, и каждый уменьшается из предыдущего;
+копия последнего размера появляется последней и служит признаком готовности.
+Построив копии, пул ставит флаг thumbnails_ready всем строкам с этим фото,
+и сериализатор берёт готовность из строки, не обращаясь к хранилищу.
+
+Пока копий нет, сериализатор отдаёт None, и клиент показывает исходник.
+Готовые копии увеличивают версию товаров: клиент, получивший список до
+них, по старому ETag получит новый список, а не 304.
+Одинаковые фото хранятся одним файлом (wardrobe.storage) с общими копиями;
+копии удаляются вместе с файлом, когда на него не остаётся ссылок (wardrobe.media).
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from PIL import Image, ImageOps, features
+
+from wardrobe.models import Customer, Product
+from wardrobe.snapshots import previous, track
+from wardrobe.versions import flush_version
+
+THUMBNAIL_DIR = 'thumbs'
+# Название размера → сторона квадрата, в который вписывается копия; от большего к меньшему
+SIZES = {'large': 960, 'medium': 320, 'small': 96}
+FORMAT, EXTENSION = ('WEBP', 'webp') if features.check('webp') else ('JPEG', 'jpg')
+QUALITY = 80
+IMAGE_FIELDS = {Product: 'image', Customer: 'photo'}
+# Ресурсы, в ответах которых есть ссылки на копии (ProductSerializer.thumbnails)
+THUMBNAIL_RESOURCES = ('product',)
+for model, field in IMAGE_FIELDS.items():
+    track(model, field)
+
+executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='thumbnail')
+pending = {}
+pending_lock = threading.Lock()
+
+
+def thumbnail_name(name, size):
+    path = PurePosixPath(name)
+    return str(PurePosixPath(THUMBNAIL_DIR, path.parent, f'{path.stem}-{size}.{EXTENSION}'))
+
+
+def is_ready(name, storage=default_storage):
+    return storage.exists(thumbnail_name(name, list(SIZES)[-1]))
+
+
+def thumbnail_urls(name, storage=default_storage):
+    """URL копий по размерам; готовы ли копии, показывает флаг thumbnails_ready строки."""
+    return {size: storage.url(thumbnail_name(name, size)) for size in SIZES}
+
+
+def mark_ready(names):
+    """Ставит thumbnails_ready строкам с фото из names; возвращает число изменённых строк."""
+    names = list(names)
+    return sum(model.objects.filter(**{f'{field}__in': names}, thumbnails_ready=False).update(thumbnails_ready=True)
+               for model, field in IMAGE_FIELDS.items())
+
+
+def encode(image):
+    if FORMAT == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    elif image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if image.has_transparency_data else 'RGB')
+    buffer = BytesIO()
+    image.save(buffer, FORMAT, quality=QUALITY)
+    return buffer.getvalue()
+
+
+def make_thumbnails(name, storage=default_storage):
+    with storage.open(name) as source, Image.open(source) as image:
+        # Для JPEG draft декодирует сразу в уменьшенном масштабе
+        image.draft('RGB', (max(SIZES.values()),) * 2)
+        image = ImageOps.exif_transpose(image)
+        for size, side in SIZES.items():
+            image.thumbnail((side, side), Image.Resampling.LANCZOS)
+            target = thumbnail_name(name, size)
+            storage.delete(target)
+            storage.save(target, ContentFile(encode(image)))
+
+
+def flush_thumbnail_versions():
+    for resource in THUMBNAIL_RESOURCES:
+        flush_version(resource)
+
+
+def build(name):
+    try:
+        make_thumbnails(name)
+        mark_ready([name])
+        flush_thumbnail_versions()
+    finally:
+        connections.close_all()
+
+
+def delete_thumbnails(name, storage=default_storage):
+    for size in reversed(SIZES):
+        storage.delete(thumbnail_name(name, size))
+
+
+def finished(name, future):
+    with pending_lock:
+        if pending.get(name) is future:
+            del pending[name]
+
+
+def schedule(name):
+    """Ставит построение копий в очередь пула; повторный вызов до завершения не дублирует работу."""
+    with pending_lock:
+        future = pending.get(name)
+        # Завершённая сборка могла отметить строки до коммита этой загрузки
+        if future is None or future.done():
+            future = pending[name] = executor.submit(build, name)
+            future.add_done_callback(partial(finished, name))
+        return future
+
+
+def previous_image(instance, field):
+    return (previous(instance) or {}).get(field) or ''
+
+
+@receiver(post_save)
+def image_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    field = IMAGE_FIELDS.get(sender)
+    if not field or raw or not (update_fields is None or field in update_fields):
+        return
+    name = getattr(instance, field).name or ''
+    if name == previous_image(instance, field):
+        return
+    # Одинаковые фото хранятся одним файлом: копии могут быть уже готовы
+    ready = bool(name) and is_ready(name)
+    if ready != instance.thumbnails_ready:
+        sender._default_manager.filter(pk=instance.pk).update(thumbnails_ready=ready)
+        instance.thumbnails_ready = ready
+    if name and not ready:
+        transaction.on_commit(partial(schedule, name))
@@ -0,0 +1,108 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from wardrobe.models import Category, Store, Product, Customer, Order, UserProfile, ResourceVersion
+
+RESOURCES = {
+    Category: 'category',
+    Store: 'store',
+    Product: 'product',
+    Customer: 'customer',
+    Order: 'order',
+    User: 'user',
+    UserProfile: 'user',
+}
+
+# bulk_create/bulk_update/queryset.update не отправляют post_save, поэтому
+# массовые операции сообщают об изменениях этим сигналом.
+# Аргументы: sender — модель, created/updated — списки объектов.
+# Удаление через queryset.delete() по-прежнему отправляет post_delete.
+bulk_changed = Signal()
+
+
+def flush_version(resource):
+    now = timezone.now()
+    updated = ResourceVersion.objects.filter(name=resource).update(version=F('version') + 1, updated_at=now)
+    if not updated:
+        ResourceVersion.objects.get_or_create(name=resource, defaults={'version': 1, 'updated_at': now})
+
+
+def find_pending(predicate):
+    """
+    Ещё не выполненный отложенный до коммита вызов, к которому можно
+    присоединиться. Вызовы из другой точки сохранения не подходят: её могут
+    откатить вместе с вызовом.
+    """
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        return None
+    savepoints = set(connection.savepoint_ids)
+    for sids, callback, _ in connection.run_on_commit:
+        if predicate(callback) and not getattr(callback, 'done', False) and sids <= savepoints:
+            return callback
+    return None
+
+
+class PendingBump:
+    done = False
+
+    def __init__(self, resource):
+        self.resource = resource
+
+    def __call__(self):
+        self.done = True
+        flush_version(self.resource)
+
+
+def bump_version(resource):
+    # Версия увеличивается один раз на транзакцию после коммита,
+    # сколько бы строк ресурса в ней ни изменилось.
+    if find_pending(lambda callback: isinstance(callback, PendingBump) and callback.resource == resource):
+        return
+    transaction.on_commit(PendingBump(resource))
+
+
+def get_versions(*resources):
+    versions = dict.fromkeys(resources, 0)
+    versions.update(ResourceVersion.objects.filter(name__in=resources).values_list('name', 'version'))
+    return versions
+
+
+def version_info(resources, rows):
+    versions = dict.fromkeys(resources, 0)
+    last_modified = None
+    for name, version, updated_at in rows:
+        versions[name] = version
+        if updated_at and (last_modified is None or updated_at > last_modified):
+            last_modified = updated_at
+    return versions, last_modified
+
+
+def version_rows(resources):
+    return ResourceVersion.objects.filter(name__in=resources).values_list('name', 'version', 'updated_at')
+
+
+def get_version_info(*resources):
+    """Версии ресурсов и время последнего изменения любого из них (None, если не менялись)."""
+    return version_info(resources, version_rows(resources))
+
+
+async def aget_version_info(*resources):
+    return version_info(resources, [row async for row in version_rows(resources)])
+
+
+def notify_bulk_change(model, created=(), updated=()):
+    bulk_changed.send(sender=model, created=list(created), updated=list(updated))
+
+
+@receiver(post_save)
+@receiver(post_delete)
+@receiver(bulk_changed)
+def bump_on_change(sender, **kwargs):
+    resource = RESOURCES.get(sender)
+    if resource:
+        bump_version(resource)
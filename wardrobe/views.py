@@ -1,4 +1,12 @@
+import hmac
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_safe
 from django.views.generic import TemplateView
+
+from wardrobe import events, metrics, serving
 from wardrobe.models import Category, Store, Product, Customer, Order
 
 class ShowWardrobeView(TemplateView):
@@ -11,4 +19,42 @@ class ShowWardrobeView(TemplateView):
         context["products"] = Product.objects.all().select_related("category", "store")
         context["customers"] = Customer.objects.all().select_related("user", "store")
         context["orders"] = Order.objects.all().select_related("product", "customer", "user")
-        return context
\ No newline at end of file
+        return context
+
+
+async def change_events(request):
+    """Поток Server-Sent Events об изменениях (?resources=order,product,stock)."""
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({'detail': 'Учетные данные не были предоставлены.'}, status=403)
+    if not isinstance(request, ASGIRequest):
+        # Под WSGI каждое открытое соединение занимало бы поток сервера
+        return JsonResponse({'detail': 'Поток событий доступен только при запуске через ASGI.'}, status=501)
+    resources = [resource for resource in request.GET.get('resources', '').split(',') if resource] or events.EVENT_RESOURCES
+    unknown = sorted(set(resources) - set(events.EVENT_RESOURCES))
+    if unknown:
+        return JsonResponse({'resources': f'Неизвестные ресурсы: {", ".join(unknown)}'}, status=400)
+    response = StreamingHttpResponse(events.stream(events.broker.subscribe(resources)), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """Файлы из MEDIA_ROOT с Range, ETag и долгим кэшированием (wardrobe.serving)."""
+    return serving.serve(request, path)
+
+
+def has_metrics_token(request):
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    return bool(settings.METRICS_TOKEN) and scheme.lower() == 'bearer' and hmac.compare_digest(token, settings.METRICS_TOKEN)
+
+
+@require_safe
+def prometheus_metrics(request):
+    """Метрики запросов этого процесса в текстовом формате Prometheus (wardrobe.metrics)."""
+    # Адресу клиента не доверяем: за локальным прокси все запросы приходят с 127.0.0.1
+    if not (request.user.is_staff or has_metrics_token(request)):
+        return HttpResponse(status=403)
+    return HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)